@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+
+from config.constants import DEFAULT_SCAN_WORKERS, SCRIPTS_DIR
+from data.models import Wallpaper
+from data.scanner import ProjectScanner
+from data.search_index import SearchIndex
+from data.wallpaper_data import WallpaperDataManager
+
+def make_fake_workshop(root: str, count: int) -> list:
+    """Create `count` fake workshop items with a project.json each"""
+    wallpaper_ids = []
+    for i in range(count):
+        wallpaper_id = str(1000000000 + i)
+        item_dir = os.path.join(root, wallpaper_id)
+        os.makedirs(item_dir)
+        project = {
+            "title": f"Benchmark Wallpaper {i}",
+            "type": ("video", "scene", "web")[i % 3],
+            "preview": "preview.gif",
+            "file": "scene.json",
+            "tags": ["Abstract", "Nature"],
+            "description": "Synthetic item created by benchmark.py " * 8,
+        }
+        with open(os.path.join(item_dir, "project.json"), 'w', encoding='utf-8') as f:
+            json.dump(project, f)
+        wallpaper_ids.append(wallpaper_id)
+    return wallpaper_ids
+
+def time_scan(scanner: ProjectScanner, wallpaper_dir: str, wallpaper_ids: list) -> float:
+    start = time.perf_counter()
+    for _ in scanner.scan(wallpaper_dir, wallpaper_ids):
+        pass
+    return time.perf_counter() - start
+
+def bench_scan(args) -> None:
+    root = tempfile.mkdtemp(prefix="hyprwpe-bench-")
+    try:
+        wallpaper_ids = make_fake_workshop(root, args.items)
+        print(f"Scanning {args.items} fake workshop items (best of {args.repeat})")
+        print("Note: the page cache is warm; a cold-cache scan benefits more from parallelism.")
+        runs = [
+            ("serial", ProjectScanner(1)),
+            (f"threads x{args.workers}", ProjectScanner(args.workers)),
+            (f"processes x{args.workers}", ProjectScanner(args.workers, use_processes=True)),
+        ]
+        baseline = None
+        for label, scanner in runs:
+            best = min(time_scan(scanner, root, wallpaper_ids) for _ in range(args.repeat))
+            baseline = baseline or best
+            print(f"  {label:<16} {best * 1000:9.1f} ms  ({baseline / best:4.2f}x)")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+WORDS = ("abstract", "anime", "city", "night", "rain", "forest", "mountain", "ocean", "space", "galaxy",
+         "sunset", "neon", "cyberpunk", "retro", "pixel", "minimal", "nature", "winter", "autumn", "lofi",
+         "girl", "car", "dragon", "castle", "waterfall", "aurora", "sakura", "samurai", "planet", "storm")
+
+def make_fake_wallpapers(count: int, seed: int = 0) -> list:
+    """Synthetic catalog: a few common words plus a long tail of rare ones, like real titles"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary = list(WORDS) + ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(5000)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    wallpapers = []
+    for i in range(count):
+        title = " ".join(rng.choices(vocabulary, weights, k=3)) + f" {i}"
+        wallpapers.append(Wallpaper(
+            id=str(1000000000 + i),
+            title=title,
+            type=("video", "scene", "web")[i % 3],
+            preview_path="",
+            title_lower=title.lower(),
+            tags=[w.capitalize() for w in rng.sample(WORDS, 2)],
+            description=" ".join(rng.choices(vocabulary, weights, k=12)),
+        ))
+    return wallpapers
+
+def bench_search(args) -> None:
+    wallpapers = make_fake_wallpapers(args.items)
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.build(wallpapers)
+    print(f"Indexed {args.items} wallpapers in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rare_word = wallpapers[-1].title.split()[0]
+    queries = ("mountain", "moun", "mountian", "neon city", "cyberpunk rain night", "sak", rare_word)
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = index.search(query)
+        per_query = (time.perf_counter() - start) / args.repeat
+        print(f"  {query!r:<24} {per_query * 1e6:9.1f} us  ({len(results)} results)")
+
+    start = time.perf_counter()
+    for wallpaper in wallpapers[:100]:
+        index.add(wallpaper)
+    print(f"Re-indexing one wallpaper: {(time.perf_counter() - start) / 100 * 1e6:.1f} us")
+
+def bench_lookup(args) -> None:
+    wallpapers = make_fake_wallpapers(args.items)
+    # The catalog cache is only opened by scans, so nothing here touches the disk
+    data_manager = WallpaperDataManager(tempfile.gettempdir(),
+                                        cache_path=os.path.join(tempfile.gettempdir(), "hyprwpe-bench-catalog.db"))
+    data_manager.add_wallpapers(wallpapers)
+    rng = random.Random(1)
+    wanted = [rng.choice(wallpapers).id for _ in range(args.lookups)]
+
+    def linear(wallpaper_id):
+        # What get_wallpaper_by_id did before the id index
+        for wp in data_manager.all_wallpapers:
+            if wp.id == wallpaper_id:
+                return wp
+        return None
+
+    print(f"{args.lookups} random id lookups over {args.items} wallpapers")
+    for label, lookup in (("linear scan", linear), ("dict index", data_manager.get_wallpaper_by_id)):
+        start = time.perf_counter()
+        for wallpaper_id in wanted:
+            lookup(wallpaper_id)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<12} {args.lookups / elapsed:14,.0f} lookups/s")
+
+def make_fake_scene(count: int, textures: int, seed: int = 0) -> list:
+    """scene.json objects for `count` image layers drawn from `textures` blocks of one texture each"""
+    rng = random.Random(seed)
+    return [{
+        "type": "imagelayer",
+        "asset": f"texture{i * textures // count}",
+        "pos": f"{rng.uniform(-900, 900):.1f} {rng.uniform(-500, 500):.1f} 0",
+        "scale": f"{rng.uniform(0.1, 1):.2f} {rng.uniform(0.1, 1):.2f} 1",
+        "angle": f"{rng.uniform(0, 360):.1f}",
+    } for i in range(count)]
+
+def headless_window(width: int, height: int):
+    """Hidden pyglet window on an EGL context, or None if OpenGL 3.3 is unavailable"""
+    try:
+        import scene_renderer # Switches pyglet to headless mode first
+        import pyglet
+        config = pyglet.gl.Config(major_version=3, minor_version=3, forward_compatible=True)
+        window = pyglet.window.Window(width, height, visible=False, config=config)
+        window.switch_to()
+        return window
+    except Exception as e:
+        print(f"No headless OpenGL context ({e}); timing layer parsing only.")
+        return None
+
+def bench_scene(args) -> None:
+    # The viewer modules import their siblings directly, as they do when run as scripts
+    sys.path.insert(0, SCRIPTS_DIR)
+    from scene_renderer import compile_render_list, layer_instances
+    width, height = 1920, 1080
+    window = headless_window(width, height)
+    if window:
+        import pyglet
+        from pyglet.gl import glFinish
+        from scene_renderer import SceneRenderer, upload_texture
+        print(f"Renderer: {pyglet.gl.gl_info.get_renderer()}")
+        if "llvmpipe" in pyglet.gl.gl_info.get_renderer():
+            print("Note: llvmpipe rasterizes on the CPU, so draw time also grows with the pixels covered.")
+    print(f"Per-frame CPU at {width}x{height} with {args.textures} texture(s), mean of {args.frames} frames")
+    print(f"  {'layers':>7}  {'parse per frame':>15}  {'draw from render list':>21}")
+    for count in args.layers:
+        objects = make_fake_scene(count, args.textures)
+        sizes = {f"texture{i}": (256, 256) for i in range(args.textures)}
+
+        # What rendering cost before the render list: re-parsing every layer on every frame
+        start = time.perf_counter()
+        for _ in range(args.frames):
+            layer_instances(compile_render_list(objects), sizes, width, height)
+        parse = (time.perf_counter() - start) / args.frames
+        draw = "-"
+        if window:
+            image = pyglet.image.SolidColorImagePattern((255, 255, 255, 128)).create_image(256, 256)
+            renderer = SceneRenderer(compile_render_list(objects), {name: upload_texture(image) for name in sizes}, sizes)
+            renderer.draw(width, height) # Uploads the instance buffer
+            elapsed = 0.0
+            for _ in range(args.frames):
+                start = time.perf_counter()
+                renderer.draw(width, height)
+                elapsed += time.perf_counter() - start
+                glFinish() # Keep GPU (or llvmpipe) work out of the next frame's timing
+            renderer.delete()
+            draw = f"{elapsed / args.frames * 1e6:.1f} us"
+        print(f"  {count:>7}  {parse * 1e6:12.1f} us  {draw:>21}")
+    if window:
+        window.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for HyprWpE.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    scan_parser = subparsers.add_parser('scan', help='Serial vs. parallel project.json scanning.')
+    scan_parser.add_argument('--items', type=int, default=4000, help='Number of fake workshop items.')
+    scan_parser.add_argument('--workers', type=int, default=DEFAULT_SCAN_WORKERS, help='Worker pool size.')
+    scan_parser.add_argument('--repeat', type=int, default=3, help='Runs per configuration.')
+    scan_parser.set_defaults(func=bench_scan)
+
+    search_parser = subparsers.add_parser('search', help='Search index build and query latency.')
+    search_parser.add_argument('--items', type=int, default=10000, help='Number of synthetic wallpapers.')
+    search_parser.add_argument('--repeat', type=int, default=200, help='Runs per query.')
+    search_parser.set_defaults(func=bench_search)
+
+    lookup_parser = subparsers.add_parser('lookup', help='Wallpaper lookup by id: linear scan vs. dict index.')
+    lookup_parser.add_argument('--items', type=int, default=10000, help='Number of synthetic wallpapers.')
+    lookup_parser.add_argument('--lookups', type=int, default=2000, help='Number of lookups to time.')
+    lookup_parser.set_defaults(func=bench_lookup)
+
+    scene_parser = subparsers.add_parser('scene', help='Scene renderer per-frame CPU against layer count.')
+    scene_parser.add_argument('--layers', type=lambda v: [int(n) for n in v.split(',')], default=[1, 10, 100, 1000, 10000],
+                              help='Comma-separated layer counts.')
+    scene_parser.add_argument('--textures', type=int, default=4, help='Distinct textures shared by the layers.')
+    scene_parser.add_argument('--frames', type=int, default=200, help='Frames timed per layer count.')
+    scene_parser.set_defaults(func=bench_scene)
+
+    args = parser.parse_args()
+    args.func(args)
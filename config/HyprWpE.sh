@@ -11,6 +11,10 @@ YAML_FILE="~/.config/HyprWpE/wallpapers.yaml"
 PROPERTIES_FILE="~/.config/HyprWpE/properties.yaml"
 # Temporary directory for unpacking
 TMP_DIR="/tmp/HyprWpE"
+# Socket of the wallpaper daemon (see managers/wallpaper_daemon.py)
+DAEMON_SOCKET="${XDG_RUNTIME_DIR:-/tmp}/HyprWpE.sock"
+# Repository root, needed to run the Python modules
+REPO_DIR="$(cd "$(dirname "$0")/.." && pwd)"
 
 # Use argument for monitor if provided, else default
 MONITOR="${2:-$DEFAULT_MONITOR}"
@@ -23,6 +27,15 @@ LOCK_FILE="/tmp/HyprWpE-${MONITOR}.lock"
 
 # --- Functions ---
 
+# Forward a command to the wallpaper daemon; fails if it cannot be reached
+daemon_client() {
+    ( cd "$REPO_DIR" && python -m managers.daemon_client "$@" )
+}
+
+daemon_running() {
+    [ -S "$DAEMON_SOCKET" ]
+}
+
 write_pid() {
     ( flock -x 200; echo "$1" > "$PID_FILE"; ) 200>"$LOCK_FILE"
 }
@@ -94,7 +107,7 @@ set_wallpaper() {
             
             scale=$(echo "$scale" | tr '[:upper:]' '[:lower:]')
             if [ "$scale" = "cover" ]; then opts_array+=("--panscan=1.0"); fi
-            if [ "$scale" = "fill" ]; then opts_array+=("--video-aspect-method=stretch"); fi
+            if [ "$scale" = "fill" ]; then opts_array+=("--no-keepaspect"); fi
             
             extra_opts=$(IFS=' '; echo "${opts_array[*]}")
         else
@@ -163,14 +176,23 @@ check_yq() {
 case "$1" in
     --load-config)
         check_yq; load_config "$2"; exit 0 ;;
+    daemon)
+        cd "$REPO_DIR" && exec python -m managers.wallpaper_daemon ;;
+    status)
+        daemon_client status; exit $? ;;
+    restore)
+        shift; cd "$REPO_DIR" && exec python -m managers.restore "$@" ;;
     stop)
+        if daemon_running && daemon_client stop > /dev/null; then exit 0; fi
         stop_all_wallpapers; exit 0 ;;
     ""|--help|-h)
-        echo "Usage: $0 <ID> [MONITOR] | stop | --load-config [FILE]"
+        echo "Usage: $0 <ID> [MONITOR] | stop | status | daemon | restore [--config FILE] [--measure] | --load-config [FILE]"
         echo "No args given, loading default config from $YAML_FILE..."
         check_yq; load_config; exit 0 ;;
     *)
         if ! [[ "$1" =~ ^[0-9]+$ ]]; then echo "Error: Invalid wallpaper ID '$1'"; exit 1; fi
+        # With the daemon running, it owns the renderers and this is just a client
+        if daemon_running && daemon_client apply "$1" "$MONITOR" > /dev/null; then exit 0; fi
         if ! command -v jq &> /dev/null; then echo "Error: 'jq' not installed."; exit 1; fi
         check_yq
         set_wallpaper "$1" ;;
@@ -58,6 +58,14 @@ class ConfigManager:
         self.properties = props
         return self.properties
 
+    def properties_version(self):
+        """(mtime, size) of properties.yaml, to tell whether it changed since it was loaded"""
+        try:
+            stat_result = os.stat(PROPERTIES_FILE)
+        except OSError:
+            return None
+        return stat_result.st_mtime_ns, stat_result.st_size
+
     def save_properties(self, properties: dict) -> None:
         try:
             with open(PROPERTIES_FILE, 'w') as f:
@@ -3,12 +3,53 @@ import os
 # Constants that will be moved here:
 DEFAULT_WALLPAPER_DIR = os.path.expanduser("~/.steam/steam/steamapps/workshop/content/431960")
 SCRIPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "HyprWpE.sh")
+SCRIPTS_DIR = os.path.dirname(SCRIPT_PATH)
+REPO_DIR = os.path.dirname(SCRIPTS_DIR)
 CONFIG_DIR = os.path.expanduser("~/.config/HyprWpE")
 YAML_FILE = os.path.join(CONFIG_DIR, "wallpapers.yaml")
 PROPERTIES_FILE = os.path.join(CONFIG_DIR, "properties.yaml")
+CATALOG_CACHE_FILE = os.path.join(CONFIG_DIR, "catalog.sqlite3")
+CACHE_DIR = os.path.expanduser("~/.cache/HyprWpE")
+THUMBNAIL_CACHE_DIR = os.path.join(CACHE_DIR, "thumbnails")
+MONITOR_CACHE_FILE = os.path.join(CACHE_DIR, "monitors.json")
+MEDIA_CACHE_DIR = os.path.join(CACHE_DIR, "media")
+TEXTURE_CACHE_DIR = os.path.join(CACHE_DIR, "textures")
 
 # New constants to add:
 WALLPAPER_WIDGET_WIDTH = 160
 WALLPAPER_WIDGET_HEIGHT = 205
 IMAGE_FRAME_WIDTH = 150
 IMAGE_FRAME_HEIGHT = 100
+SEARCH_DEBOUNCE_MS = 200
+
+# Catalog scanning
+DEFAULT_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+CATALOG_BATCH_SIZE = 64
+WATCH_DEBOUNCE_MS = 500
+WATCH_SETUP_BATCH = 200
+
+# Grid previews
+PREVIEW_WORKERS = 2
+DEFAULT_PREVIEW_CACHE_MB = 64
+MAX_ANIMATED_PREVIEWS = 4
+
+# Wallpaper daemon and renderers
+RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR", "/tmp")
+DAEMON_SOCKET = os.path.join(RUNTIME_DIR, "HyprWpE.sock")
+DAEMON_START_TIMEOUT = 5.0
+UNPACK_DIR = "/tmp/HyprWpE"
+LAYER_SHELL_PRELOAD = "/usr/lib/libgtk4-layer-shell.so"
+# Longest a restore waits for a renderer to report its first frame
+FIRST_FRAME_TIMEOUT = 5.0
+# How often the GUI collects renderers it launched itself that have exited
+RENDERER_REAP_INTERVAL_S = 2
+# Quiet period after a burst of window events before occlusion is re-checked
+OCCLUSION_DEBOUNCE_S = 0.1
+# Frame-rate governor: where power supplies are read and how often they are re-checked
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+THERMAL_DIR = "/sys/class/thermal"
+GOVERNOR_INTERVAL_S = 10.0
+# Longest wait between attempts to push a frame rate to a renderer that keeps refusing it
+FPS_RETRY_MAX_S = 30.0
+# Seconds between attempts to reconnect to Hyprland's event socket
+HOTPLUG_RECONNECT_DELAY = 2.0
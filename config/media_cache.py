@@ -0,0 +1,200 @@
+import os
+import hashlib
+import threading
+import subprocess
+from typing import Optional, Tuple
+
+# Set by RendererLauncher so the viewers (standalone scripts) find the same cache
+MEDIA_CACHE_ENV = "HYPRWPE_MEDIA_CACHE"
+MEDIA_SIZE_ENV = "HYPRWPE_MEDIA_SIZE"
+
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.mov', '.avi')
+
+# Least recently used entries are removed once the cache grows past this
+DEFAULT_MEDIA_CACHE_MB = 4096
+
+class MediaCache:
+    """On-disk cache of video and image assets downscaled to the largest monitor.
+
+    Entries are keyed by the source's path, mtime and size plus the target
+    resolution, so plugging in a bigger monitor or updating a workshop item
+    simply misses the cache. Sources that already fit are never copied, and
+    a video ffmpeg could not transcode gets a `.failed` marker so it is not
+    retried until the source (or the resolution) changes. Entries are
+    touched when used, and the least recently used ones are removed once
+    the cache grows past `max_bytes`.
+    """
+    def __init__(self, cache_dir: str, width: int, height: int,
+                 max_bytes: int = DEFAULT_MEDIA_CACHE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.width = width
+        self.height = height
+        self.max_bytes = max_bytes
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional['MediaCache']:
+        cache_dir = os.environ.get(MEDIA_CACHE_ENV)
+        size = os.environ.get(MEDIA_SIZE_ENV, "")
+        try:
+            width, height = (int(v) for v in size.split("x"))
+        except ValueError:
+            return None
+        return cls(cache_dir, width, height) if cache_dir else None
+
+    def env(self) -> dict:
+        return {MEDIA_CACHE_ENV: self.cache_dir, MEDIA_SIZE_ENV: f"{self.width}x{self.height}"}
+
+    def cache_path(self, source_path: str, extension: str) -> Optional[str]:
+        try:
+            stat_result = os.stat(source_path)
+        except OSError:
+            return None
+        key = f"{source_path}|{stat_result.st_mtime_ns}|{stat_result.st_size}|{self.width}x{self.height}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + extension)
+
+    def fits(self, width: int, height: int) -> bool:
+        return width <= self.width and height <= self.height
+
+    def lookup(self, source_path: str) -> str:
+        """Return the cached downscaled copy of `source_path`, or the source itself"""
+        extension = ".mp4" if source_path.lower().endswith(VIDEO_EXTENSIONS) else ".png"
+        cached = self.cache_path(source_path, extension)
+        return cached if cached and self._touch(cached) else source_path
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Mark an entry as recently used for evict(); False if it does not exist"""
+        try:
+            os.utime(path)
+            return True
+        except OSError:
+            return False
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        entries, total = [], 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if ".tmp" in name: # Still being written
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat_result = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat_result.st_mtime, stat_result.st_size, entry_path))
+            total += stat_result.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        # The newest entry is the one just written; keep it even if it alone is over budget
+        for _, size, entry_path in entries[:-1]:
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # --- Video ---
+
+    def probe_video_size(self, source_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height",
+                 "-of", "csv=p=0:s=x", source_path],
+                capture_output=True, text=True, check=True, timeout=10)
+            width, height = result.stdout.strip().split("x")[:2]
+            return int(width), int(height)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return None
+
+    def transcode_video(self, source_path: str) -> Optional[str]:
+        """Downscale a video with ffmpeg; blocking, returns the cached path or None if not needed"""
+        cached = self.cache_path(source_path, ".mp4")
+        if not cached:
+            return None
+        if self._touch(cached):
+            return cached
+        failed_marker = cached + ".failed"
+        if os.path.exists(failed_marker):
+            return None
+        size = self.probe_video_size(source_path)
+        if size is None or self.fits(*size):
+            return None
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp.mp4"
+        scale = (f"scale=w={self.width}:h={self.height}"
+                 ":force_original_aspect_ratio=decrease:force_divisible_by=2")
+        # Audio is re-encoded: not every source codec (e.g. Vorbis in .webm) can be copied into MP4
+        command = ["nice", "-n", "19", "ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", source_path,
+                   "-vf", scale, "-c:v", "libx264", "-preset", "veryfast", "-crf", "20",
+                   "-pix_fmt", "yuv420p", "-c:a", "aac", "-b:a", "160k", tmp_path]
+        try:
+            subprocess.run(command, check=True, capture_output=True)
+            os.replace(tmp_path, cached)
+            print(f"Cached {size[0]}x{size[1]} video at {self.width}x{self.height}: {source_path}")
+            self.evict()
+            return cached
+        except (OSError, subprocess.SubprocessError) as e:
+            stderr = getattr(e, 'stderr', None)
+            reason = stderr.decode('utf-8', 'replace').strip() if stderr else str(e)
+            print(f"Could not transcode {source_path}: {reason}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            # 127 from `nice` means ffmpeg is missing, which says nothing about this video
+            if isinstance(e, subprocess.CalledProcessError) and e.returncode != 127:
+                try:
+                    with open(failed_marker, 'w') as f:
+                        f.write(reason + "\n")
+                except OSError:
+                    pass
+            return None
+
+    def transcode_video_async(self, source_path: str) -> None:
+        """Start a background transcode so the next launch of this video uses the smaller copy"""
+        with self.lock:
+            if source_path in self.pending:
+                return
+            self.pending.add(source_path)
+
+        def run():
+            try:
+                self.transcode_video(source_path)
+            finally:
+                with self.lock:
+                    self.pending.discard(source_path)
+        threading.Thread(target=run, name="media-transcode", daemon=True).start()
+
+    # --- Images ---
+
+    def scale_image(self, source_path: str) -> str:
+        """Return a downscaled copy of an image, creating it on first use"""
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf
+        cached = self.cache_path(source_path, ".png")
+        if not cached:
+            return source_path
+        if self._touch(cached):
+            return cached
+        try:
+            _, width, height = GdkPixbuf.Pixbuf.get_file_info(source_path)
+            if self.fits(width, height):
+                return source_path
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(source_path, self.width, self.height, True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+            pixbuf.savev(tmp_path, "png", [], [])
+            os.replace(tmp_path, cached)
+            self.evict()
+            return cached
+        except Exception as e:
+            print(f"Could not downscale {source_path}: {e}")
+            return source_path
@@ -0,0 +1,97 @@
+import os
+import json
+import socket
+from typing import Any, Callable, Dict
+
+# Set by RendererLauncher to the Unix socket a web/scene viewer should listen on
+CONTROL_SOCKET_ENV = "HYPRWPE_CONTROL_SOCKET"
+
+class RendererControlError(Exception):
+    pass
+
+class RendererControlServer:
+    """Control socket for a viewer, served from the GTK main loop.
+
+    Speaks one JSON object per line, e.g. {"cmd": "pause"}, and answers
+    each with {"ok": true, ...}. Handlers run on the main thread, so they
+    may touch widgets directly.
+    """
+    def __init__(self, handlers: Dict[str, Callable[[dict], dict]]):
+        self.handlers = handlers
+        self.socket_path = os.environ.get(CONTROL_SOCKET_ENV)
+        self.service = None
+        self.connections = set()
+
+    def start(self) -> bool:
+        if not self.socket_path:
+            return False
+        from gi.repository import Gio
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.service = Gio.SocketService()
+        self.service.add_address(Gio.UnixSocketAddress.new(self.socket_path), Gio.SocketType.STREAM,
+                                 Gio.SocketProtocol.DEFAULT, None)
+        self.service.connect("incoming", self.on_incoming)
+        self.service.start()
+        return True
+
+    def stop(self) -> None:
+        if self.service:
+            self.service.stop()
+            self.service.close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def on_incoming(self, service, connection, source_object):
+        from gi.repository import Gio
+        reader = Gio.DataInputStream.new(connection.get_input_stream())
+        self.connections.add(connection)
+        reader.read_line_async(0, None, self.on_line, connection)
+        return True
+
+    def on_line(self, reader, result, connection):
+        try:
+            line, _ = reader.read_line_finish_utf8(result)
+        except Exception:
+            line = None
+        if line is None:
+            self.connections.discard(connection)
+            connection.close(None)
+            return
+        if line.strip():
+            response = self.dispatch(line)
+            connection.get_output_stream().write_all((json.dumps(response) + "\n").encode('utf-8'), None)
+        reader.read_line_async(0, None, self.on_line, connection)
+
+    def dispatch(self, line: str) -> dict:
+        try:
+            request = json.loads(line)
+            handler = self.handlers.get(request.get('cmd'))
+            if not handler:
+                return {'ok': False, 'error': f"Unknown command: {request.get('cmd')}"}
+            return dict(handler(request) or {}, ok=True)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+class RendererControlClient:
+    """Sends one command per connection to a viewer's control socket"""
+    def __init__(self, socket_path: str, timeout: float = 1.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def command(self, cmd: str, **args) -> Dict[str, Any]:
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall((json.dumps(dict(args, cmd=cmd)) + "\n").encode('utf-8'))
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError as e:
+            raise RendererControlError(f"Renderer control at {self.socket_path} failed: {e}") from e
+        if not line:
+            raise RendererControlError("Renderer closed the control connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise RendererControlError(response.get('error', 'Unknown renderer error'))
+        return response
@@ -0,0 +1,16 @@
+import os
+
+# Set by RendererLauncher to the write end of a pipe; the launcher measures
+# time-to-first-frame by waiting for a byte on the read end.
+READY_FD_ENV = "HYPRWPE_READY_FD"
+
+def notify_first_frame():
+    """Tell the launcher this renderer has drawn its first frame. Safe to call repeatedly."""
+    fd = os.environ.pop(READY_FD_ENV, None)
+    if fd is None:
+        return
+    try:
+        os.write(int(fd), b"1")
+        os.close(int(fd))
+    except (OSError, ValueError):
+        pass
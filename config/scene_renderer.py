@@ -0,0 +1,320 @@
+import math
+import ctypes
+from array import array
+from typing import List, NamedTuple, Optional, Tuple
+import pyglet
+pyglet.options['headless'] = True # Render through EGL rather than a pyglet window
+from pyglet.gl import *
+from scene_textures import DecodedTexture, RGBA8, DXT1, DXT3, DXT5, RG8, R8, TEX_FLAG_NO_INTERPOLATION
+
+VERTEX_SHADER = """#version 330 core
+layout(location = 0) in vec2 corner;
+layout(location = 1) in vec4 rect;   // centre x, y and half width, height in pixels
+layout(location = 2) in float angle; // radians, counter-clockwise
+uniform vec2 viewport;
+uniform vec4 uv_rect; // texture coordinates of the bottom-left and top-right corners
+out vec2 uv;
+
+void main() {
+    vec2 offset = corner * rect.zw;
+    float c = cos(angle), s = sin(angle);
+    vec2 position = rect.xy + vec2(c * offset.x - s * offset.y, s * offset.x + c * offset.y);
+    gl_Position = vec4(position / viewport * 2.0 - 1.0, 0.0, 1.0);
+    uv = mix(uv_rect.xy, uv_rect.zw, corner * 0.5 + 0.5);
+}
+"""
+
+FRAGMENT_SHADER = """#version 330 core
+in vec2 uv;
+uniform sampler2D image;
+out vec4 colour;
+
+void main() {
+    colour = texture(image, uv);
+}
+"""
+
+# Unit quad as a triangle strip, shared by every layer
+QUAD = (-1.0, -1.0, 1.0, -1.0, -1.0, 1.0, 1.0, 1.0)
+# Per-layer instance data: centre x, y, half width, half height, angle
+INSTANCE_FLOATS = 5
+INSTANCE_STRIDE = INSTANCE_FLOATS * ctypes.sizeof(GLfloat)
+
+class ShaderError(Exception):
+    pass
+
+class GLTexture(NamedTuple):
+    id: int
+    uv_rect: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 1.0)
+
+def _compile_shader(kind, source: str) -> int:
+    shader = glCreateShader(kind)
+    source_p = ctypes.c_char_p(source.encode('utf-8'))
+    glShaderSource(shader, 1, ctypes.cast(ctypes.pointer(source_p), ctypes.POINTER(ctypes.POINTER(GLchar))), None)
+    glCompileShader(shader)
+    status = GLint()
+    glGetShaderiv(shader, GL_COMPILE_STATUS, ctypes.byref(status))
+    if not status.value:
+        length = GLint()
+        glGetShaderiv(shader, GL_INFO_LOG_LENGTH, ctypes.byref(length))
+        log = ctypes.create_string_buffer(max(length.value, 1))
+        glGetShaderInfoLog(shader, length, None, log)
+        glDeleteShader(shader)
+        raise ShaderError(log.value.decode('utf-8', 'replace'))
+    return shader
+
+def compile_program(vertex_source: str, fragment_source: str) -> int:
+    shaders = [_compile_shader(GL_VERTEX_SHADER, vertex_source),
+               _compile_shader(GL_FRAGMENT_SHADER, fragment_source)]
+    program = glCreateProgram()
+    for shader in shaders:
+        glAttachShader(program, shader)
+    glLinkProgram(program)
+    for shader in shaders:
+        glDetachShader(program, shader)
+        glDeleteShader(shader)
+    status = GLint()
+    glGetProgramiv(program, GL_LINK_STATUS, ctypes.byref(status))
+    if not status.value:
+        length = GLint()
+        glGetProgramiv(program, GL_INFO_LOG_LENGTH, ctypes.byref(length))
+        log = ctypes.create_string_buffer(max(length.value, 1))
+        glGetProgramInfoLog(program, length, None, log)
+        glDeleteProgram(program)
+        raise ShaderError(log.value.decode('utf-8', 'replace'))
+    return program
+
+def upload_texture(image) -> GLTexture:
+    """Uploads a pyglet image as an RGBA texture.
+
+    pyglet's own get_texture() relies on glPushClientAttrib, which a core
+    profile context does not have.
+    """
+    data = image.get_image_data().get_data('RGBA', image.width * 4)
+    texture = GLuint()
+    glGenTextures(1, ctypes.byref(texture))
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    glTexImage2D(GL_TEXTURE_2D, 0, GL_RGBA8, image.width, image.height, 0, GL_RGBA, GL_UNSIGNED_BYTE, data)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return GLTexture(texture.value)
+
+# Internal format, pixel format and swizzle for each scene_textures format; None means block-compressed
+UPLOAD_FORMATS = {
+    RGBA8: (GL_RGBA8, GL_RGBA, None),
+    DXT1: (GL_COMPRESSED_RGBA_S3TC_DXT1_EXT, None, None),
+    DXT3: (GL_COMPRESSED_RGBA_S3TC_DXT3_EXT, None, None),
+    DXT5: (GL_COMPRESSED_RGBA_S3TC_DXT5_EXT, None, None),
+    RG8: (GL_RG8, GL_RG, (GL_RED, GL_RED, GL_RED, GL_GREEN)),
+    R8: (GL_R8, GL_RED, (GL_RED, GL_RED, GL_RED, GL_ONE)),
+}
+SWIZZLE_PARAMETERS = (GL_TEXTURE_SWIZZLE_R, GL_TEXTURE_SWIZZLE_G, GL_TEXTURE_SWIZZLE_B, GL_TEXTURE_SWIZZLE_A)
+
+def upload_decoded(tex: DecodedTexture) -> GLTexture:
+    """Uploads a texture from scene_textures with its whole mip chain"""
+    internal_format, pixel_format, swizzle = UPLOAD_FORMATS[tex.format]
+    texture = GLuint()
+    glGenTextures(1, ctypes.byref(texture))
+    glBindTexture(GL_TEXTURE_2D, texture)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    for level, (width, height, data) in enumerate(tex.levels):
+        pixels = (GLubyte * len(data)).from_buffer_copy(data)
+        if pixel_format is None:
+            glCompressedTexImage2D(GL_TEXTURE_2D, level, internal_format, width, height, 0, len(data), pixels)
+        else:
+            glTexImage2D(GL_TEXTURE_2D, level, internal_format, width, height, 0, pixel_format,
+                         GL_UNSIGNED_BYTE, pixels)
+    # .tex mip chains may stop before 1x1
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAX_LEVEL, len(tex.levels) - 1)
+    nearest = tex.flags & TEX_FLAG_NO_INTERPOLATION
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST if nearest else GL_LINEAR_MIPMAP_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST if nearest else GL_LINEAR)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+    for parameter, source in zip(SWIZZLE_PARAMETERS, swizzle or ()):
+        glTexParameteri(GL_TEXTURE_2D, parameter, source)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return GLTexture(texture.value, tex.uv_rect())
+
+class ImageLayer(NamedTuple):
+    """An image layer with its transform already parsed from scene.json"""
+    asset: str
+    x: float
+    y: float
+    scale_x: float
+    scale_y: float
+    angle: float # Radians, counter-clockwise
+
+def _vector(value, default: str) -> List[float]:
+    return [float(component) for component in str(value if value is not None else default).split()]
+
+def compile_render_list(objects: list) -> Tuple[ImageLayer, ...]:
+    """Parses a scene's image layers once, at load time, in drawing order"""
+    layers = []
+    for obj in objects:
+        if obj.get("type") != "imagelayer" or not obj.get("asset"):
+            continue
+        try:
+            pos = _vector(obj.get("pos"), "0 0 0")
+            scale = _vector(obj.get("scale"), "1 1 1")
+            layers.append(ImageLayer(obj["asset"], pos[0], pos[1], scale[0], scale[1],
+                                     math.radians(float(obj.get("angle", 0)))))
+        except (ValueError, IndexError, TypeError) as e:
+            print(f"Skipping layer {obj.get('name', obj['asset'])}: {e}")
+    return tuple(layers)
+
+def layer_instances(layers: Tuple[ImageLayer, ...], sizes: dict, width: int, height: int) -> list:
+    """Groups consecutive image layers that share a texture.
+
+    Returns [(asset name, array of instance data)] in drawing order. Only
+    consecutive layers are merged so that blending still happens back to
+    front.
+    """
+    runs = []
+    for layer in layers:
+        size = sizes.get(layer.asset)
+        if size is None:
+            continue
+        # Scene positions are relative to the centre of the screen, with Y pointing down
+        instance = (width / 2 + layer.x, height / 2 - layer.y,
+                    size[0] * layer.scale_x / 2, size[1] * layer.scale_y / 2, layer.angle)
+        if runs and runs[-1][0] == layer.asset:
+            runs[-1][1].extend(instance)
+        else:
+            runs.append((layer.asset, array('f', instance)))
+    return runs
+
+class SceneRenderer:
+    """Draws a scene's image layers with an OpenGL 3.3 core shader.
+
+    Layer transforms live in an instance buffer that is only rebuilt when
+    the viewport size changes, and each run of layers sharing a texture is
+    one instanced draw, so a frame costs a few GL calls per texture rather
+    than per layer. It needs a current GL context but nothing from GTK, so
+    it runs the same in a Gtk.GLArea and on a headless EGL context.
+    """
+    def __init__(self, layers: Tuple[ImageLayer, ...], textures: Optional[dict] = None,
+                 sizes: Optional[dict] = None):
+        self.layers = layers
+        # name -> GLTexture, owned by the renderer from here on; sizes are the
+        # original asset sizes used for layout. Layers without a texture yet are skipped.
+        self.textures = dict(textures or {})
+        self.sizes = dict(sizes or {})
+        self.runs = []
+        self.viewport = None
+        # Change tracking: a frame is only drawn when something marked the scene damaged
+        self.damaged = True
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+        self.program = compile_program(VERTEX_SHADER, FRAGMENT_SHADER)
+        self.viewport_location = glGetUniformLocation(self.program, b"viewport")
+        self.uv_rect_location = glGetUniformLocation(self.program, b"uv_rect")
+        glUseProgram(self.program)
+        glUniform1i(glGetUniformLocation(self.program, b"image"), 0)
+
+        self.vao = GLuint()
+        glGenVertexArrays(1, ctypes.byref(self.vao))
+        glBindVertexArray(self.vao)
+
+        self.quad_buffer = GLuint()
+        glGenBuffers(1, ctypes.byref(self.quad_buffer))
+        glBindBuffer(GL_ARRAY_BUFFER, self.quad_buffer)
+        quad = (GLfloat * len(QUAD))(*QUAD)
+        glBufferData(GL_ARRAY_BUFFER, ctypes.sizeof(quad), quad, GL_STATIC_DRAW)
+        glEnableVertexAttribArray(0)
+        glVertexAttribPointer(0, 2, GL_FLOAT, GL_FALSE, 0, None)
+
+        self.instance_buffer = GLuint()
+        glGenBuffers(1, ctypes.byref(self.instance_buffer))
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        for location in (1, 2):
+            glEnableVertexAttribArray(location)
+            glVertexAttribDivisor(location, 1)
+        glBindVertexArray(0)
+
+    @property
+    def animated(self) -> bool:
+        """Whether the output changes over time on its own.
+
+        Image layers only have static transforms so far, so a scene looks
+        the same until it is damaged.
+        """
+        return False
+
+    def damage(self) -> None:
+        self.damaged = True
+
+    def set_texture(self, name: str, texture: GLTexture, size: Tuple[int, int]) -> None:
+        """Add a texture that finished loading; layers using it appear on the next frame"""
+        old = self.textures.get(name)
+        if old:
+            glDeleteTextures(1, ctypes.byref(GLuint(old.id)))
+        self.textures[name] = texture
+        self.sizes[name] = size
+        self.viewport = None # Rebuild the instance buffer
+        self.damage()
+
+    def needs_redraw(self) -> bool:
+        """Called once per frame slot; counts the slot as skipped if nothing changed"""
+        if self.damaged or self.animated:
+            return True
+        self.frames_skipped += 1
+        return False
+
+    def upload(self, width: int, height: int) -> None:
+        runs = [(asset_name, instances)
+                for asset_name, instances in layer_instances(self.layers, self.sizes, width, height)
+                if asset_name in self.textures]
+        data = array('f')
+        self.runs = []
+        for asset_name, instances in runs:
+            # Layers start at this byte offset in the instance buffer
+            offset = len(data) * data.itemsize
+            data.extend(instances)
+            self.runs.append((self.textures[asset_name], offset, len(instances) // INSTANCE_FLOATS))
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        if data:
+            glBufferData(GL_ARRAY_BUFFER, len(data) * data.itemsize, data.buffer_info()[0], GL_STATIC_DRAW)
+        self.viewport = (width, height)
+
+    def draw(self, width: int, height: int) -> None:
+        if self.viewport != (width, height):
+            self.upload(width, height)
+
+        glViewport(0, 0, width, height)
+        glClearColor(0.0, 0.0, 0.0, 1.0)
+        glClear(GL_COLOR_BUFFER_BIT)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+
+        glUseProgram(self.program)
+        glUniform2f(self.viewport_location, width, height)
+        glBindVertexArray(self.vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        glActiveTexture(GL_TEXTURE0)
+        for texture, offset, count in self.runs:
+            glBindTexture(GL_TEXTURE_2D, texture.id)
+            glUniform4f(self.uv_rect_location, *texture.uv_rect)
+            # GL 3.3 has no base instance, so point the instance attributes at this run instead
+            glVertexAttribPointer(1, 4, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, offset)
+            glVertexAttribPointer(2, 1, GL_FLOAT, GL_FALSE, INSTANCE_STRIDE, offset + 4 * ctypes.sizeof(GLfloat))
+            glDrawArraysInstanced(GL_TRIANGLE_STRIP, 0, 4, count)
+        glBindVertexArray(0)
+        glUseProgram(0)
+        self.damaged = False
+        self.frames_rendered += 1
+
+    def delete(self) -> None:
+        glDeleteBuffers(1, ctypes.byref(self.quad_buffer))
+        glDeleteBuffers(1, ctypes.byref(self.instance_buffer))
+        glDeleteVertexArrays(1, ctypes.byref(self.vao))
+        glDeleteProgram(self.program)
+        if self.textures:
+            textures = (GLuint * len(self.textures))(*(texture.id for texture in self.textures.values()))
+            glDeleteTextures(len(self.textures), textures)
+        self.textures = {}
@@ -0,0 +1,330 @@
+import os
+import struct
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Set by RendererLauncher; the scene viewer falls back to the same default when started by hand
+TEXTURE_CACHE_ENV = "HYPRWPE_TEXTURE_CACHE"
+DEFAULT_TEXTURE_CACHE_DIR = os.path.expanduser("~/.cache/HyprWpE/textures")
+# Least recently used entries are removed once the cache grows past this
+DEFAULT_TEXTURE_CACHE_MB = 1024
+
+# Pixel formats, as stored in cache entries
+RGBA8 = 0
+DXT1 = 1
+DXT3 = 2
+DXT5 = 3
+RG8 = 4 # Luminance + alpha
+R8 = 5
+
+# Wallpaper Engine .tex format codes
+TEX_FORMATS = {0: RGBA8, 4: DXT5, 6: DXT3, 7: DXT1, 8: RG8, 9: R8}
+TEX_FLAG_NO_INTERPOLATION = 1
+TEX_FLAG_CLAMP_UVS = 2
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tex')
+
+# Bump when the decoded layout changes so old cache entries miss
+CACHE_VERSION = 1
+CACHE_MAGIC = b"HWTX"
+CACHE_HEADER = struct.Struct("<4sHHIIIIII")
+LEVEL_HEADER = struct.Struct("<III")
+
+class TextureError(Exception):
+    pass
+
+@dataclass
+class DecodedTexture:
+    """Pixel data ready for upload, rows top to bottom, with its mip chain.
+
+    `width`/`height` are the stored size; Wallpaper Engine pads textures to
+    powers of two, and `image_width`/`image_height` is the part holding the
+    picture (and the size used for layout).
+    """
+    format: int
+    width: int
+    height: int
+    image_width: int
+    image_height: int
+    # (width, height, data) from the full size down
+    levels: List[Tuple[int, int, bytes]] = field(default_factory=list)
+    flags: int = 0
+
+    def uv_rect(self) -> Tuple[float, float, float, float]:
+        """Texture coordinates of the picture's bottom-left and top-right corners"""
+        return (0.0, self.image_height / self.height, self.image_width / self.width, 0.0)
+
+# --- LZ4 ---
+
+def lz4_block_decompress(data: bytes, size: int) -> bytes:
+    """Decompress a raw LZ4 block, as used inside .tex files"""
+    try:
+        import lz4.block
+        return lz4.block.decompress(data, uncompressed_size=size)
+    except ImportError:
+        pass
+    out = bytearray()
+    i, end = 0, len(data)
+    while i < end:
+        token = data[i]
+        i += 1
+        length = token >> 4
+        if length == 15:
+            while True:
+                extra = data[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        out += data[i:i + length]
+        i += length
+        if i >= end:
+            break # The last sequence has literals only
+        offset = data[i] | data[i + 1] << 8
+        i += 2
+        if offset == 0 or offset > len(out):
+            raise TextureError("Corrupt LZ4 block")
+        length = token & 15
+        if length == 15:
+            while True:
+                extra = data[i]
+                i += 1
+                length += extra
+                if extra != 255:
+                    break
+        length += 4
+        start = len(out) - offset
+        if length <= offset:
+            out += out[start:start + length]
+        else:
+            # Overlapping match: the last `offset` bytes repeat
+            pattern = bytes(out[start:])
+            out += (pattern * (length // offset + 1))[:length]
+    if len(out) != size:
+        raise TextureError(f"LZ4 block decompressed to {len(out)} bytes, expected {size}")
+    return bytes(out)
+
+# --- Decoding ---
+
+def _pixbuf_levels(pixbuf) -> List[Tuple[int, int, bytes]]:
+    """RGBA mip chain of a GdkPixbuf, each level half the size of the one before"""
+    GdkPixbuf = _gdk_pixbuf()
+    if not pixbuf.get_has_alpha():
+        pixbuf = pixbuf.add_alpha(False, 0, 0, 0)
+    levels = []
+    while True:
+        width, height, stride = pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride()
+        pixels = pixbuf.get_pixels()
+        if stride != width * 4:
+            pixels = b"".join(pixels[row * stride:row * stride + width * 4] for row in range(height))
+        levels.append((width, height, bytes(pixels)))
+        if width == 1 and height == 1:
+            return levels
+        pixbuf = pixbuf.scale_simple(max(1, width // 2), max(1, height // 2), GdkPixbuf.InterpType.BILINEAR)
+
+def _gdk_pixbuf():
+    import gi
+    gi.require_version('GdkPixbuf', '2.0')
+    from gi.repository import GdkPixbuf
+    return GdkPixbuf
+
+def decode_image(path: str) -> DecodedTexture:
+    """Decode a PNG/JPEG/... with GdkPixbuf, which is safe off the main thread"""
+    pixbuf = _gdk_pixbuf().Pixbuf.new_from_file(path)
+    levels = _pixbuf_levels(pixbuf)
+    width, height = levels[0][:2]
+    return DecodedTexture(RGBA8, width, height, width, height, levels)
+
+def _decode_embedded(data: bytes, tex: DecodedTexture) -> None:
+    """Some .tex files wrap a plain PNG/JPEG instead of raw pixels"""
+    loader = _gdk_pixbuf().PixbufLoader()
+    loader.write(data)
+    loader.close()
+    tex.format = RGBA8
+    tex.levels = _pixbuf_levels(loader.get_pixbuf())
+    tex.width, tex.height = tex.levels[0][:2]
+
+def read_tex(path: str) -> DecodedTexture:
+    """Read a Wallpaper Engine .tex container (TEXV0005/TEXI0001/TEXBxxxx).
+
+    Only the first image is used, so animated (GIF) textures show their
+    first frame. Video textures are not supported.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    position = 0
+
+    def read(fmt: str):
+        nonlocal position
+        values = struct.unpack_from(fmt, data, position)
+        position += struct.calcsize(fmt)
+        return values
+
+    def magic() -> str:
+        nonlocal position
+        value = data[position:position + 8].decode('ascii', 'replace')
+        position += 9 # Eight characters and a NUL
+        return value
+
+    try:
+        if magic() != "TEXV0005" or magic() != "TEXI0001":
+            raise TextureError("Not a Wallpaper Engine texture")
+        tex_format, flags, width, height, image_width, image_height, _ = read("<7i")
+        container = magic()
+        if container not in ("TEXB0001", "TEXB0002", "TEXB0003", "TEXB0004"):
+            raise TextureError(f"Unsupported texture container {container}")
+        version = int(container[-1])
+        image_count, = read("<i")
+        embedded_format = -1 # FreeImage format of an embedded file; -1 means raw pixels
+        if version >= 3:
+            embedded_format, = read("<i")
+        if version == 4:
+            is_video, = read("<i")
+            if is_video:
+                raise TextureError("Video textures are not supported")
+        if image_count < 1:
+            raise TextureError("Texture has no images")
+        if embedded_format == -1 and tex_format not in TEX_FORMATS:
+            raise TextureError(f"Unsupported texture format {tex_format}")
+
+        tex = DecodedTexture(TEX_FORMATS.get(tex_format, RGBA8), width, height, image_width, image_height, [], flags)
+        mip_count, = read("<i")
+        for _ in range(mip_count):
+            mip_width, mip_height = read("<2i")
+            compressed, decompressed_size = read("<2i") if version >= 2 else (0, 0)
+            size, = read("<i")
+            level = data[position:position + size]
+            position += size
+            if len(level) != size:
+                raise TextureError("Texture is truncated")
+            if compressed:
+                level = lz4_block_decompress(level, decompressed_size)
+            if embedded_format != -1:
+                _decode_embedded(level, tex)
+                break # The embedded file is the full-size image; mips are made from it
+            tex.levels.append((mip_width, mip_height, level))
+    except struct.error as e:
+        raise TextureError(f"Texture is truncated: {e}") from e
+    if not tex.levels:
+        raise TextureError("Texture has no mipmaps")
+    return tex
+
+def decode_texture(path: str) -> DecodedTexture:
+    if path.lower().endswith('.tex'):
+        return read_tex(path)
+    return decode_image(path)
+
+# --- Cache ---
+
+class TextureCache:
+    """On-disk cache of decoded textures, keyed by the source's path, mtime and size.
+
+    Entries hold exactly what gets uploaded: the full mip chain, with
+    block-compressed (DXT) .tex data kept compressed. Loading one is a
+    stat and a single read with no decoding. Entries are touched when
+    used, and the least recently used ones are removed once the cache
+    grows past `max_bytes`.
+    """
+    def __init__(self, cache_dir: str = DEFAULT_TEXTURE_CACHE_DIR,
+                 max_bytes: int = DEFAULT_TEXTURE_CACHE_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls) -> 'TextureCache':
+        return cls(os.environ.get(TEXTURE_CACHE_ENV) or DEFAULT_TEXTURE_CACHE_DIR)
+
+    def cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.v{CACHE_VERSION}.hwtx")
+
+    @staticmethod
+    def source_key(path: str) -> str:
+        stat_result = os.stat(path)
+        key = f"{os.path.abspath(path)}|{stat_result.st_mtime_ns}|{stat_result.st_size}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def load_entry(self, key: str) -> Optional[DecodedTexture]:
+        try:
+            with open(self.cache_path(key), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            magic, version, tex_format, flags, width, height, image_width, image_height, level_count = \
+                CACHE_HEADER.unpack_from(data, 0)
+            if magic != CACHE_MAGIC or version != CACHE_VERSION:
+                return None
+            tex = DecodedTexture(tex_format, width, height, image_width, image_height, [], flags)
+            position = CACHE_HEADER.size
+            view = memoryview(data)
+            for _ in range(level_count):
+                level_width, level_height, size = LEVEL_HEADER.unpack_from(data, position)
+                position += LEVEL_HEADER.size
+                tex.levels.append((level_width, level_height, view[position:position + size]))
+                position += size
+            if position != len(data):
+                return None
+        except struct.error:
+            return None
+        try:
+            os.utime(self.cache_path(key)) # Mark as recently used for evict()
+        except OSError:
+            pass
+        return tex
+
+    def save_entry(self, key: str, tex: DecodedTexture) -> None:
+        path = self.cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, tex.format, tex.flags, tex.width, tex.height,
+                                          tex.image_width, tex.image_height, len(tex.levels)))
+                for level_width, level_height, level in tex.levels:
+                    f.write(LEVEL_HEADER.pack(level_width, level_height, len(level)))
+                    f.write(level)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache texture {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in max_bytes"""
+        entries, total = [], 0
+        for directory, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".tmp"): # Being written by another viewer
+                    continue
+                entry_path = os.path.join(directory, name)
+                try:
+                    stat_result = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append((stat_result.st_mtime, stat_result.st_size, entry_path))
+                total += stat_result.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        # The newest entry is the one just written; keep it even if it alone is over budget
+        for _, size, entry_path in entries[:-1]:
+            try:
+                os.unlink(entry_path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def load(self, path: str) -> DecodedTexture:
+        """Decoded texture for `path`, from the cache when possible; blocking, run it off the GL thread"""
+        key = self.source_key(path)
+        tex = self.load_entry(key)
+        if tex is None:
+            tex = decode_texture(path)
+            self.save_entry(key, tex)
+        return tex
@@ -1,15 +1,22 @@
 import gi
 gi.require_version('Gtk', '4.0')
 gi.require_version('Gtk4LayerShell', '1.0')
-from gi.repository import Gtk, Gdk, GLib, Gtk4LayerShell
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import Gtk, Gdk, GLib, GdkPixbuf, Gtk4LayerShell
 import pyglet
 pyglet.options['headless'] = True # Prevent pyglet from creating its own window
 from pyglet.gl import *
 import sys
 import os
 import json
-import math
+import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from renderer_ready import notify_first_frame
+from media_cache import MediaCache
+from renderer_control import RendererControlServer
+from scene_renderer import SceneRenderer, compile_render_list, upload_decoded
+from scene_textures import IMAGE_EXTENSIONS, TextureCache
 
 # --- Added configuration paths ---
 CONFIG_DIR = os.path.expanduser("~/.config/HyprWpE")
@@ -30,6 +37,8 @@ class Scene:
     def __init__(self, scene_dir):
         self.directory = scene_dir
         self.objects = []
+        # Image layers parsed once here, so rendering never touches the JSON again
+        self.layers = ()
         self.assets = {}
         self.general_info = {}
 
@@ -53,6 +62,7 @@ class Scene:
         
         self.general_info = scene_data.get("general", {})
         self.objects = scene_data.get("objects", [])
+        self.layers = compile_render_list(self.objects)
         self.assets = {asset['name']: os.path.join(self.directory, asset['file']) for asset in scene_data.get("assets", [])}
 
 class SceneViewerWindow(Gtk.ApplicationWindow):
@@ -61,17 +71,37 @@ class SceneViewerWindow(Gtk.ApplicationWindow):
         self.scene_dir = scene_dir
         self.monitor_name = monitor_name
         self.scene = None
-        self.textures = {}
+        self.renderer = None
+        self.media_cache = MediaCache.from_env()
+        self.texture_cache = TextureCache.from_env()
+        self.decoder = None
+        # Textures queued for decoding that have not been uploaded (or failed) yet
+        self.pending_textures = 0
+        # Animation is timed from the frame clock, in seconds
         self.animation_time = 0.0
+        self.tick_id = None
+        self.last_frame_time = None
+        self.frame_interval = 0.0 # Seconds between frames under the daemon's cap; 0 renders every refresh
+        self.refresh_interval = 1 / 60 # Updated from the frame clock
+        self.paused = False
+        # Set while the timer is stopped because nothing on screen would change
+        self.idle_since = None
+        self.idle_frames_skipped = 0
 
         self.set_decorated(False)
         
         self.gl_area = Gtk.GLArea()
         self.gl_area.set_required_version(3, 3)
+        if hasattr(self.gl_area, "set_allowed_apis"): # GTK 4.12+; the shaders are desktop GLSL
+            self.gl_area.set_allowed_apis(Gdk.GLAPI.GL)
+        # Only render when queue_render() is called or the area is resized
+        self.gl_area.set_auto_render(False)
         self.set_child(self.gl_area)
 
         self.gl_area.connect("realize", self.on_realize)
+        self.gl_area.connect("unrealize", self.on_unrealize)
         self.gl_area.connect("render", self.on_render)
+        self.gl_area.connect("resize", self.on_resize)
 
         self.setup_layer_shell()
         
@@ -81,6 +111,12 @@ class SceneViewerWindow(Gtk.ApplicationWindow):
             print(f"Error loading scene: {e}")
             self.close()
 
+        self.control = RendererControlServer({'pause': self.on_pause, 'resume': self.on_resume,
+                                              'set_fps': self.on_set_fps, 'stats': self.on_stats,
+                                              'reload_properties': self.on_reload_properties})
+        self.control.start()
+        self.connect("destroy", lambda window: self.control.stop())
+
     def setup_layer_shell(self):
         Gtk4LayerShell.init_for_window(self)
         if self.monitor_name:
@@ -93,6 +129,14 @@ class SceneViewerWindow(Gtk.ApplicationWindow):
         Gtk4LayerShell.set_layer(self, Gtk4LayerShell.Layer.BACKGROUND)
         Gtk4LayerShell.set_keyboard_mode(self, Gtk4LayerShell.KeyboardMode.NONE)
 
+        self.apply_panel_margins()
+
+        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.TOP, True)
+        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.BOTTOM, True)
+        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.LEFT, True)
+        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.RIGHT, True)
+
+    def apply_panel_margins(self):
         # --- The Fix: Load and apply panel margins from the config file ---
         props = load_properties()
         margins = props.get("panel_margins", {})
@@ -100,92 +144,165 @@ class SceneViewerWindow(Gtk.ApplicationWindow):
         Gtk4LayerShell.set_margin(self, Gtk4LayerShell.Edge.BOTTOM, margins.get("bottom", 0))
         Gtk4LayerShell.set_margin(self, Gtk4LayerShell.Edge.LEFT, margins.get("left", 0))
         Gtk4LayerShell.set_margin(self, Gtk4LayerShell.Edge.RIGHT, margins.get("right", 0))
-        
-        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.TOP, True)
-        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.BOTTOM, True)
-        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.LEFT, True)
-        Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.RIGHT, True)
 
     def on_realize(self, area):
         area.make_current()
-        self.load_textures()
-        GLib.timeout_add(16, self.tick) # ~60 FPS
+        if area.get_error() is not None:
+            print(f"Error creating OpenGL context: {area.get_error().message}")
+            return
+        if self.scene:
+            try:
+                self.renderer = SceneRenderer(self.scene.layers)
+            except Exception as e:
+                print(f"Error setting up scene renderer: {e}")
+                return
+            self.load_textures()
+        self.start_ticking()
+
+    def on_unrealize(self, area):
+        if self.decoder:
+            self.decoder.shutdown(wait=False, cancel_futures=True)
+            self.decoder = None
+        area.make_current()
+        if self.renderer:
+            self.renderer.delete()
+            self.renderer = None
+
+    def on_resize(self, area, width, height):
+        # GLArea renders by itself after a resize; just make sure that frame is drawn
+        if self.renderer:
+            self.renderer.damage()
+
+    def start_ticking(self):
+        if self.tick_id is None and not self.paused:
+            self.end_idle()
+            # Time spent idle or paused does not advance the animation
+            self.last_frame_time = None
+            self.tick_id = self.gl_area.add_tick_callback(self.on_tick)
+
+    def stop_ticking(self):
+        if self.tick_id is not None:
+            self.gl_area.remove_tick_callback(self.tick_id)
+            self.tick_id = None
+
+    def idle_frames(self):
+        """Frame slots that passed since the frame clock callback was removed"""
+        if self.idle_since is None:
+            return 0
+        return int((time.monotonic() - self.idle_since) / max(self.frame_interval, self.refresh_interval))
+
+    def end_idle(self):
+        """Count the frame slots that passed while idle as skipped"""
+        self.idle_frames_skipped += self.idle_frames()
+        self.idle_since = None
+
+    def damage(self):
+        """Redraw once because something changed the output"""
+        if self.renderer:
+            self.renderer.damage()
+            self.gl_area.queue_render()
+
+    def on_set_fps(self, request):
+        fps = request.get('fps') or 0
+        idle = self.idle_since is not None
+        self.end_idle()
+        self.frame_interval = 1 / fps if fps > 0 else 0.0
+        if idle:
+            self.idle_since = time.monotonic()
+        return {'fps': fps}
+
+    def on_pause(self, request):
+        """Stop animating while the wallpaper is covered; the last frame stays up"""
+        self.paused = True
+        self.stop_ticking()
+        return {'paused': True}
+
+    def on_resume(self, request):
+        self.paused = False
+        if self.gl_area.get_realized():
+            self.start_ticking()
+        return {'paused': False}
+
+    def on_reload_properties(self, request):
+        self.apply_panel_margins()
+        self.damage()
+        return {}
+
+    def on_stats(self, request):
+        if not self.renderer:
+            return {'frames_rendered': 0, 'frames_skipped': 0, 'animated': False}
+        skipped = self.renderer.frames_skipped + self.idle_frames_skipped + self.idle_frames()
+        return {'frames_rendered': self.renderer.frames_rendered, 'frames_skipped': skipped,
+                'animated': self.renderer.animated}
 
     def load_textures(self):
-        if not self.scene: return
+        """Decode assets on worker threads; each one is uploaded and drawn as soon as it is ready"""
+        self.decoder = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="texture-decode")
         for name, path in self.scene.assets.items():
-            if os.path.exists(path) and path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-                try:
-                    image = pyglet.image.load(path)
-                    self.textures[name] = image.get_texture()
-                except Exception as e:
-                    print(f"Failed to load texture {name}: {e}")
-
-    def tick(self):
-        self.animation_time += 0.016
-        self.gl_area.queue_draw()
-        return True # Keep the timeout running
+            if os.path.exists(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                self.pending_textures += 1
+                future = self.decoder.submit(self.decode_texture, path)
+                future.add_done_callback(lambda future, name=name: GLib.idle_add(self.on_texture_decoded, name, future))
 
-    def on_render(self, area, ctx):
-        if not self.scene: return
-        width = self.get_width()
-        height = self.get_height()
-
-        glViewport(0, 0, width, height)
-        glClearColor(0.0, 0.0, 0.0, 1.0)
-        glClear(GL_COLOR_BUFFER_BIT)
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
-        
-        glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        glOrtho(0, width, 0, height, -1, 1)
-        glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        
-        for obj in self.scene.objects:
-            if obj.get("type") == "imagelayer":
-                self.render_image_layer(obj, width, height)
-                
-        return True
+    def decode_texture(self, path):
+        """Runs on a decoder thread; returns the texture and the size to lay it out at"""
+        texture_path = path
+        if self.media_cache and not path.lower().endswith('.tex'):
+            texture_path = self.media_cache.scale_image(path)
+        texture = self.texture_cache.load(texture_path)
+        if texture_path == path:
+            return texture, (texture.image_width, texture.image_height)
+        # Layout uses the original asset size even when a downscaled copy is uploaded
+        _, width, height = GdkPixbuf.Pixbuf.get_file_info(path)
+        return texture, (width, height)
 
-    def render_image_layer(self, layer_obj, width, height):
-        asset_name = layer_obj.get("asset")
-        if not asset_name or asset_name not in self.textures:
-            return
+    def on_texture_decoded(self, name, future):
+        if not self.renderer or future.cancelled():
+            return GLib.SOURCE_REMOVE
+        self.pending_textures -= 1
+        try:
+            texture, size = future.result()
+            self.gl_area.make_current()
+            self.renderer.set_texture(name, upload_decoded(texture), size)
+        except Exception as e:
+            print(f"Failed to load texture {name}: {e}")
+            if self.pending_textures:
+                return GLib.SOURCE_REMOVE
+            # That was the last one, so draw anyway: the first frame is reported from on_render
+        self.gl_area.queue_render()
+        return GLib.SOURCE_REMOVE
 
-        texture = self.textures[asset_name]
-        
-        pos = layer_obj.get("pos", "0 0 0").split()
-        x, y = float(pos[0]), float(pos[1])
-        scale = layer_obj.get("scale", "1 1 1").split()
-        sx, sy = float(scale[0]), float(scale[1])
-        angle_deg = float(layer_obj.get("angle", 0))
-
-        draw_width = texture.width * sx
-        draw_height = texture.height * sy
-        draw_x = (width / 2) + x - (draw_width / 2)
-        draw_y = (height / 2) - y - (draw_height / 2) # Y is inverted
-
-        glPushMatrix()
-        glTranslatef(draw_x + draw_width/2, draw_y + draw_height/2, 0)
-        glRotatef(angle_deg, 0, 0, 1)
-        glTranslatef(-(draw_x + draw_width/2), -(draw_y + draw_height/2), 0)
-        
-        glEnable(GL_TEXTURE_2D)
-        glBindTexture(GL_TEXTURE_2D, texture.id)
-        glColor4f(1.0, 1.0, 1.0, 1.0)
-        
-        pyglet.graphics.draw(4, GL_QUADS,
-            ('v2f', [draw_x, draw_y,
-                     draw_x + draw_width, draw_y,
-                     draw_x + draw_width, draw_y + draw_height,
-                     draw_x, draw_y + draw_height]),
-            ('t2f', [0, 0, 1, 0, 1, 1, 0, 1])
-        )
-        
-        glDisable(GL_TEXTURE_2D)
-        glPopMatrix()
+    def on_tick(self, widget, frame_clock):
+        """Runs once per monitor refresh, before GTK paints"""
+        frame_time = frame_clock.get_frame_time()
+        refresh_interval, _ = frame_clock.get_refresh_info(frame_time)
+        if refresh_interval > 0:
+            self.refresh_interval = refresh_interval / 1e6
+        now = frame_time / 1e6
+        if self.last_frame_time is None:
+            self.last_frame_time = now
+        elapsed = now - self.last_frame_time
+        # Under a cap, wait for the refresh closest to the next frame's due time
+        if elapsed + self.refresh_interval / 2 < self.frame_interval:
+            return GLib.SOURCE_CONTINUE
+        if not (self.renderer and self.renderer.needs_redraw()):
+            # Nothing will change until the scene is damaged, so stop waking up every frame
+            self.tick_id = None
+            self.idle_since = time.monotonic()
+            return GLib.SOURCE_REMOVE
+        # Real elapsed time, so dropped frames do not slow the animation down
+        self.animation_time += elapsed
+        self.last_frame_time = now
+        self.gl_area.queue_render()
+        return GLib.SOURCE_CONTINUE
+
+    def on_render(self, area, ctx):
+        if not self.renderer: return
+        self.renderer.draw(self.get_width(), self.get_height())
+        # A frame with textures still loading is not what the wallpaper looks like yet
+        if not self.pending_textures:
+            notify_first_frame()
+        return True
 
 class SceneViewerApp(Gtk.Application):
     def __init__(self, scene_dir, monitor_name, *args, **kwargs):
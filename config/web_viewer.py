@@ -6,6 +6,44 @@ from gi.repository import Gtk, WebKit, Gtk4LayerShell, Gdk, Gio
 import sys
 import os
 import yaml
+from renderer_ready import notify_first_frame
+from renderer_control import RendererControlServer
+
+# Media the page was playing when paused is tagged so resume only restarts those
+PAUSE_MEDIA_JS = """document.querySelectorAll('video, audio').forEach(function (m) {
+    if (!m.paused) { m.dataset.hyprwpePaused = '1'; m.pause(); }
+});"""
+RESUME_MEDIA_JS = """document.querySelectorAll('[data-hyprwpe-paused]').forEach(function (m) {
+    delete m.dataset.hyprwpePaused; m.play();
+});"""
+
+# Throttles requestAnimationFrame to window.__hyprwpeFps. Callbacks queued for the
+# same frame share its timestamp, so they all run together or wait together.
+FPS_THROTTLE_JS = """(function () {
+    window.__hyprwpeFps = %d;
+    if (window.__hyprwpeRaf) return;
+    var raf = window.__hyprwpeRaf = window.requestAnimationFrame.bind(window);
+    var cancel = window.cancelAnimationFrame.bind(window);
+    var last = -Infinity, nextId = 1, pending = {};
+    window.requestAnimationFrame = function (callback) {
+        var id = nextId++;
+        var frame = function (t) {
+            var fps = window.__hyprwpeFps;
+            if (fps > 0 && t !== last && t - last < 1000 / fps - 1) {
+                pending[id] = raf(frame);
+                return;
+            }
+            delete pending[id];
+            last = t;
+            callback(t);
+        };
+        pending[id] = raf(frame);
+        return id;
+    };
+    window.cancelAnimationFrame = function (id) {
+        if (id in pending) { cancel(pending[id]); delete pending[id]; }
+    };
+})();"""
 
 CONFIG_DIR = os.path.expanduser("~/.config/HyprWpE")
 PROPERTIES_FILE = os.path.join(CONFIG_DIR, "properties.yaml")
@@ -34,6 +72,7 @@ class WebWallpaperWindow(Gtk.ApplicationWindow):
             print("Warning: Could not set all media properties. Autoplay may not work.")
 
         self.set_child(self.webview)
+        self.webview.connect("load-changed", self.on_load_changed)
         
         Gtk4LayerShell.init_for_window(self)
 
@@ -61,6 +100,38 @@ class WebWallpaperWindow(Gtk.ApplicationWindow):
         Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.LEFT, True)
         Gtk4LayerShell.set_anchor(self, Gtk4LayerShell.Edge.RIGHT, True)
 
+        self.control = RendererControlServer({'pause': self.on_pause, 'resume': self.on_resume,
+                                              'set_fps': self.on_set_fps})
+        self.control.start()
+        self.connect("destroy", lambda window: self.control.stop())
+
+    def on_pause(self, request):
+        """Hide the view so WebKit treats the page as hidden and stops painting and rAF"""
+        self.webview.evaluate_javascript(PAUSE_MEDIA_JS, -1, None, None, None, None, None)
+        self.webview.set_visible(False)
+        return {'paused': True}
+
+    def on_resume(self, request):
+        self.webview.set_visible(True)
+        self.webview.evaluate_javascript(RESUME_MEDIA_JS, -1, None, None, None, None, None)
+        return {'paused': False}
+
+    def on_set_fps(self, request):
+        """Throttle the page's animation loop; 0 lifts the cap"""
+        script = FPS_THROTTLE_JS % int(request.get('fps') or 0)
+        # Apply now and to every page load that follows
+        content_manager = self.webview.get_user_content_manager()
+        content_manager.remove_all_scripts()
+        content_manager.add_script(WebKit.UserScript.new(
+            script, WebKit.UserContentInjectedFrames.ALL_FRAMES,
+            WebKit.UserScriptInjectionTime.START, None, None))
+        self.webview.evaluate_javascript(script, -1, None, None, None, None, None)
+        return {'fps': request.get('fps') or 0}
+
+    def on_load_changed(self, webview, event):
+        if event == WebKit.LoadEvent.FINISHED:
+            notify_first_frame()
+
     def load_uri(self, uri):
         self.webview.load_uri(uri)
 
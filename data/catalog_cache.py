@@ -0,0 +1,77 @@
+import os
+import json
+import sqlite3
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable
+from data.models import Wallpaper
+
+# Bump whenever the stored Wallpaper layout changes; old caches are dropped.
+SCHEMA_VERSION = 2
+
+@dataclass
+class CatalogEntry:
+    path: str
+    mtime_ns: int
+    size: int
+    wallpaper: Wallpaper
+
+    def matches(self, path: str, stat_result: os.stat_result) -> bool:
+        return (self.path == path and
+                self.mtime_ns == stat_result.st_mtime_ns and
+                self.size == stat_result.st_size)
+
+class CatalogCache:
+    """Persistent catalog of parsed project.json files.
+
+    Entries are keyed by wallpaper id and validated against the path, mtime
+    and size of the project.json they were parsed from.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS wallpapers")
+            conn.execute("CREATE TABLE wallpapers ("
+                         "id TEXT PRIMARY KEY, path TEXT, mtime_ns INTEGER, size INTEGER, data TEXT)")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+        return conn
+
+    def load(self) -> Dict[str, CatalogEntry]:
+        """Return every cached entry, or an empty catalog if the cache is unreadable"""
+        entries = {}
+        try:
+            conn = self._connect()
+            try:
+                for wallpaper_id, path, mtime_ns, size, data in conn.execute(
+                        "SELECT id, path, mtime_ns, size, data FROM wallpapers"):
+                    entries[wallpaper_id] = CatalogEntry(path, mtime_ns, size, Wallpaper(**json.loads(data)))
+            finally:
+                conn.close()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Could not read catalog cache, rebuilding: {e}")
+            return {}
+        return entries
+
+    def update(self, changed: Dict[str, CatalogEntry], removed: Iterable[str]) -> None:
+        """Write new/changed entries and drop removed ones in a single transaction"""
+        removed = list(removed)
+        if not changed and not removed:
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO wallpapers (id, path, mtime_ns, size, data) VALUES (?, ?, ?, ?, ?)",
+                        [(wallpaper_id, entry.path, entry.mtime_ns, entry.size, json.dumps(asdict(entry.wallpaper)))
+                         for wallpaper_id, entry in changed.items()])
+                    conn.executemany("DELETE FROM wallpapers WHERE id = ?",
+                                     [(wallpaper_id,) for wallpaper_id in removed])
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Could not update catalog cache: {e}")
@@ -9,8 +9,21 @@ class Wallpaper:
     type: str
     preview_path: str
     title_lower: str
+    tags: List[str] = field(default_factory=list)
+    description: str = ""
     properties: dict = field(default_factory=dict)
 
+@dataclass
+class CatalogDiff:
+    """Changes between two versions of the catalog"""
+    added: List[Wallpaper] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[Wallpaper] = field(default_factory=list)
+    unchanged: int = 0
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
 @dataclass
 class WallpaperProperties:
     audio: bool = False
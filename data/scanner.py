@@ -0,0 +1,62 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+from config.constants import DEFAULT_SCAN_WORKERS
+from data.models import Wallpaper
+
+def parse_project_json(wallpaper_dir: str, wallpaper_id: str) -> Optional[Wallpaper]:
+    """Parse a single workshop item's project.json into a Wallpaper.
+
+    Kept at module level so it can be pickled into a process pool.
+    """
+    wallpaper_path = os.path.join(wallpaper_dir, wallpaper_id)
+    project_json_path = os.path.join(wallpaper_path, "project.json")
+    try:
+        with open(project_json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        title = data.get('title', 'No Title')
+        wp_type = data.get('type', 'unknown').lower()
+        preview_file = data.get('preview', 'preview.gif')
+        tags = data.get('tags') or []
+        
+        return Wallpaper(
+            id=wallpaper_id,
+            title=title,
+            type=wp_type,
+            preview_path=os.path.join(wallpaper_path, preview_file),
+            title_lower=title.lower(),
+            tags=[str(tag) for tag in tags] if isinstance(tags, list) else [],
+            description=str(data.get('description') or ""),
+        )
+    except Exception as e:
+        print(f"Could not parse project.json for {wallpaper_id}: {e}")
+        return None
+
+class ProjectScanner:
+    """Reads and parses project.json files on a worker pool.
+
+    Results are yielded in the same order as the ids passed in, as soon as
+    each one (and every one before it) is ready.
+    """
+    def __init__(self, workers: int = DEFAULT_SCAN_WORKERS, use_processes: bool = False):
+        self.workers = max(1, int(workers))
+        self.use_processes = use_processes
+
+    def scan(self, wallpaper_dir: str, wallpaper_ids: List[str]) -> Iterator[Tuple[str, Optional[Wallpaper]]]:
+        if self.workers == 1 or len(wallpaper_ids) < 2:
+            for wallpaper_id in wallpaper_ids:
+                yield wallpaper_id, parse_project_json(wallpaper_dir, wallpaper_id)
+            return
+
+        if self.use_processes:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+            chunksize = max(1, len(wallpaper_ids) // (self.workers * 4))
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan")
+            chunksize = 1
+        with executor:
+            results = executor.map(parse_project_json, [wallpaper_dir] * len(wallpaper_ids),
+                                   wallpaper_ids, chunksize=chunksize)
+            yield from zip(wallpaper_ids, results)
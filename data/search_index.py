@@ -0,0 +1,191 @@
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Set, Tuple
+from data.models import Wallpaper
+
+TOKEN_RE = re.compile(r"\w+")
+
+# How much a match in each project.json field counts towards the rank
+FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'type': 1.5, 'description': 1.0}
+
+# How much each kind of term match counts
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+FUZZY_MATCH = 0.3
+
+# Shorter terms are too ambiguous for typo tolerance
+MIN_FUZZY_LENGTH = 4
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+def _deletions(token: str) -> Set[str]:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+class SearchIndex:
+    """In-memory inverted index over title, tags, description and type.
+
+    Query terms match index tokens exactly, by prefix, or with a single
+    typo (via a deletion-neighbourhood table). Every term must match for a
+    wallpaper to be returned; results are ranked by the summed weight of
+    the fields each term matched in.
+    """
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.documents: Dict[str, Dict[str, float]] = {}
+        self.sorted_tokens: List[str] = []
+        self.deletes: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _document_tokens(wallpaper: Wallpaper) -> Dict[str, float]:
+        fields = {
+            'title': wallpaper.title,
+            'tags': " ".join(wallpaper.tags),
+            'type': wallpaper.type,
+            'description': wallpaper.description,
+        }
+        tokens = {}
+        for field_name, text in fields.items():
+            weight = FIELD_WEIGHTS[field_name]
+            for token in tokenize(text):
+                if tokens.get(token, 0.0) < weight:
+                    tokens[token] = weight
+        return tokens
+
+    def build(self, wallpapers: Iterable[Wallpaper]) -> None:
+        self.clear()
+        for wallpaper in wallpapers:
+            self._index(wallpaper)
+        # One sort at the end instead of an insort per new token
+        self.sorted_tokens.extend(self.postings)
+        self.sorted_tokens.sort()
+
+    def clear(self) -> None:
+        self.postings.clear()
+        self.documents.clear()
+        self.sorted_tokens.clear()
+        self.deletes.clear()
+
+    def add(self, wallpaper: Wallpaper) -> None:
+        """Index a wallpaper, replacing any previous version with the same id"""
+        if wallpaper.id in self.documents:
+            self.remove(wallpaper.id)
+        for token in self._index(wallpaper):
+            insort(self.sorted_tokens, token)
+
+    def _index(self, wallpaper: Wallpaper) -> List[str]:
+        """Add a wallpaper's postings; returns the tokens that are new to the index"""
+        tokens = self._document_tokens(wallpaper)
+        self.documents[wallpaper.id] = tokens
+        new_tokens = []
+        for token, weight in tokens.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                new_tokens.append(token)
+                if len(token) >= MIN_FUZZY_LENGTH - 1:
+                    for variant in _deletions(token):
+                        self.deletes.setdefault(variant, set()).add(token)
+            posting[wallpaper.id] = weight
+        return new_tokens
+
+    def remove(self, wallpaper_id: str) -> None:
+        tokens = self.documents.pop(wallpaper_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            posting = self.postings[token]
+            del posting[wallpaper_id]
+            if posting:
+                continue
+            del self.postings[token]
+            del self.sorted_tokens[bisect_left(self.sorted_tokens, token)]
+            if len(token) >= MIN_FUZZY_LENGTH - 1:
+                for variant in _deletions(token):
+                    variants = self.deletes.get(variant)
+                    if variants is not None:
+                        variants.discard(token)
+                        if not variants:
+                            del self.deletes[variant]
+
+    def _expand_term(self, term: str) -> Dict[str, float]:
+        """Map every index token the term matches to the quality of that match"""
+        matches = {}
+        if term in self.postings:
+            matches[term] = EXACT_MATCH
+        sorted_tokens = self.sorted_tokens
+        # Walk by index; slicing would copy the whole tail of the token list
+        for i in range(bisect_left(sorted_tokens, term), len(sorted_tokens)):
+            token = sorted_tokens[i]
+            if not token.startswith(term):
+                break
+            if token != term:
+                matches[token] = PREFIX_MATCH
+        if len(term) >= MIN_FUZZY_LENGTH:
+            term_deletions = _deletions(term)
+            candidates = set(self.deletes.get(term, ()))
+            for variant in term_deletions:
+                candidates.update(self.deletes.get(variant, ()))
+                if variant in self.postings:
+                    candidates.add(variant)
+            for token in candidates:
+                matches.setdefault(token, FUZZY_MATCH)
+        return matches
+
+    def search(self, query: str) -> List[Tuple[str, float]]:
+        """Return (wallpaper_id, score) pairs, best match first"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        scores = None
+        for term in terms:
+            term_scores: Dict[str, float] = {}
+            # Seed from the largest posting, so the per-id loop below runs over the small ones
+            expanded = sorted(self._expand_term(term).items(), key=lambda match: len(self.postings[match[0]]),
+                              reverse=True)
+            for token, quality in expanded:
+                posting = self.postings[token]
+                if not term_scores:
+                    if quality == 1.0:
+                        term_scores = posting.copy()
+                    else:
+                        term_scores = {wallpaper_id: weight * quality for wallpaper_id, weight in posting.items()}
+                    continue
+                for wallpaper_id, weight in posting.items():
+                    score = weight * quality
+                    if term_scores.get(wallpaper_id, 0.0) < score:
+                        term_scores[wallpaper_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                if len(term_scores) < len(scores):
+                    scores, term_scores = term_scores, scores
+                scores = {wallpaper_id: score + term_scores[wallpaper_id]
+                          for wallpaper_id, score in scores.items() if wallpaper_id in term_scores}
+            if not scores:
+                return []
+        # Two stable sorts: best score first, ties in id order
+        ranked = sorted(scores)
+        ranked.sort(key=scores.__getitem__, reverse=True)
+        return list(zip(ranked, map(scores.__getitem__, ranked)))
+
+    @staticmethod
+    def matches(query: str, wallpaper: Wallpaper) -> bool:
+        """Check one wallpaper against a query without touching the index"""
+        terms = tokenize(query)
+        if not terms:
+            return True
+        tokens = SearchIndex._document_tokens(wallpaper)
+        for term in terms:
+            if term in tokens or any(token.startswith(term) for token in tokens):
+                continue
+            if len(term) < MIN_FUZZY_LENGTH:
+                return False
+            term_variants = _deletions(term) | {term}
+            if not any(token_variants & term_variants
+                       for token_variants in (_deletions(token) | {token} for token in tokens)):
+                return False
+        return True
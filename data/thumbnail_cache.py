@@ -0,0 +1,67 @@
+import os
+import hashlib
+import threading
+from typing import Optional
+import gi
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import GdkPixbuf
+from config.constants import THUMBNAIL_CACHE_DIR, IMAGE_FRAME_WIDTH, IMAGE_FRAME_HEIGHT
+from data.models import Wallpaper
+
+class ThumbnailCache:
+    """On-disk cache of previews pre-scaled to the grid's image frame.
+
+    Thumbnails are small PNGs keyed by the preview's path, mtime and size.
+    generate() is meant to run on a worker (see ui.preview_loader) so the
+    main loop never decodes the original (often multi-MB GIF) preview.
+    """
+    def __init__(self, cache_dir: str = THUMBNAIL_CACHE_DIR, width: int = IMAGE_FRAME_WIDTH,
+                 height: int = IMAGE_FRAME_HEIGHT):
+        self.cache_dir = cache_dir
+        self.width = width
+        self.height = height
+
+    @staticmethod
+    def resolve_preview_path(wallpaper: Wallpaper) -> Optional[str]:
+        """Return the preview file to show for a wallpaper, if there is one"""
+        if os.path.exists(wallpaper.preview_path):
+            return wallpaper.preview_path
+        # Check for preview.gif as fallback for scene wallpapers
+        preview_gif_path = os.path.join(os.path.dirname(wallpaper.preview_path), "preview.gif")
+        if wallpaper.type.lower() == "scene" and os.path.exists(preview_gif_path):
+            return preview_gif_path
+        return None
+
+    def thumbnail_path(self, source_path: str) -> Optional[str]:
+        try:
+            stat_result = os.stat(source_path)
+        except OSError:
+            return None
+        key = f"{source_path}|{stat_result.st_mtime_ns}|{stat_result.st_size}|{self.width}x{self.height}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".png")
+
+    def lookup(self, source_path: str) -> Optional[str]:
+        """Return the cached thumbnail for `source_path` if it is already on disk"""
+        thumbnail_path = self.thumbnail_path(source_path)
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            return thumbnail_path
+        return None
+
+    def generate(self, source_path: str) -> Optional[str]:
+        """Decode, downscale and store a thumbnail; safe to call off the main thread"""
+        thumbnail_path = self.thumbnail_path(source_path)
+        if not thumbnail_path:
+            return None
+        if os.path.exists(thumbnail_path):
+            return thumbnail_path
+        try:
+            # For GIFs this decodes just the first frame
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(source_path, self.width, self.height, True)
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{thumbnail_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            pixbuf.savev(tmp_path, "png", ["compression"], ["9"])
+            os.replace(tmp_path, thumbnail_path)
+            return thumbnail_path
+        except Exception as e:
+            print(f"Could not create thumbnail for {source_path}: {e}")
+            return None
@@ -1,86 +1,225 @@
 import os
-import json
-from typing import List, Optional
-from data.models import Wallpaper
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from config.constants import CATALOG_CACHE_FILE, DEFAULT_SCAN_WORKERS
+from data.models import Wallpaper, CatalogDiff
+from data.catalog_cache import CatalogCache, CatalogEntry
+from data.scanner import ProjectScanner
+from data.search_index import SearchIndex
 
 class WallpaperDataManager:
-    def __init__(self, wallpaper_dir: str):
+    def __init__(self, wallpaper_dir: str, cache_path: str = CATALOG_CACHE_FILE,
+                 scan_workers: int = DEFAULT_SCAN_WORKERS):
         self.wallpaper_dir = wallpaper_dir
+        self.catalog_cache = CatalogCache(cache_path)
+        self.scanner = ProjectScanner(scan_workers)
+        self.search_index = SearchIndex()
+        self.cache_hits = 0
         self.all_wallpapers: List[Wallpaper] = []
+        # id -> Wallpaper, kept in step with all_wallpapers for O(1) lookups
+        self.wallpapers_by_id: Dict[str, Wallpaper] = {}
         self.filtered_wallpapers: List[Wallpaper] = []
         self.search_term = ""
         self.type_filters = {"video": True, "scene": True, "web": True}
     
     def load_wallpaper_data(self) -> List[Wallpaper]:
         """Load wallpaper metadata from the wallpaper directory"""
+        self.clear_wallpapers()
+        self.add_wallpapers(list(self.iter_wallpaper_data()))
+        return self.all_wallpapers
+
+    def iter_wallpaper_data(self, on_total: Optional[Callable[[int], None]] = None) -> Iterator[Wallpaper]:
+        """Yield wallpaper metadata in id order without touching all_wallpapers.
+
+        Safe to run on a background thread. `on_total` is called with the
+        number of candidate items once the directory has been listed.
+        """
         print(f"Loading wallpaper data from: {self.wallpaper_dir}")
         
-        self.all_wallpapers.clear()
-        
         if not self.wallpaper_dir or not os.path.isdir(self.wallpaper_dir):
             print("Wallpaper directory not found or invalid")
-            return []
+            if on_total:
+                on_total(0)
+            return
             
-        wallpaper_count = 0
-        for wallpaper_id in os.listdir(self.wallpaper_dir):
-            wallpaper_path = os.path.join(self.wallpaper_dir, wallpaper_id)
-            project_json_path = os.path.join(wallpaper_path, "project.json")
+        cached_entries = self.catalog_cache.load()
+        changed_entries = {}
+        ordered = []
+        stale_ids = []
+        cache_hits = 0
+        for wallpaper_id in sorted(os.listdir(self.wallpaper_dir)):
+            project_json_path = os.path.join(self.wallpaper_dir, wallpaper_id, "project.json")
             
-            if os.path.isdir(wallpaper_path) and os.path.exists(project_json_path):
-                try:
-                    with open(project_json_path, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    title = data.get('title', 'No Title')
-                    wp_type = data.get('type', 'unknown').lower()
-                    preview_file = data.get('preview', 'preview.gif')
-                    
-                    wallpaper_data = Wallpaper(
-                        id=wallpaper_id,
-                        title=title,
-                        type=wp_type,
-                        preview_path=os.path.join(wallpaper_path, preview_file),
-                        title_lower=title.lower(),
-                    )
-                    
-                    self.all_wallpapers.append(wallpaper_data)
-                    wallpaper_count += 1
-                    
-                except Exception as e:
-                    print(f"Could not parse project.json for {wallpaper_id}: {e}")
+            # A stat is much cheaper than opening and parsing the file
+            try:
+                stat_result = os.stat(project_json_path)
+            except OSError:
+                continue
+            
+            cached = cached_entries.get(wallpaper_id)
+            if cached and cached.matches(project_json_path, stat_result):
+                ordered.append((wallpaper_id, cached.wallpaper))
+                cache_hits += 1
+            else:
+                ordered.append((wallpaper_id, None))
+                stale_ids.append(wallpaper_id)
+                changed_entries[wallpaper_id] = (project_json_path, stat_result)
+        
+        if on_total:
+            on_total(len(ordered))
+        
+        # Only new or changed entries are parsed, fanned out over the worker pool
+        parsed = self.scanner.scan(self.wallpaper_dir, stale_ids)
+        loaded_ids = set()
+        examples = []
+        for wallpaper_id, wallpaper_data in ordered:
+            if wallpaper_data is None:
+                _, wallpaper_data = next(parsed)
+                if wallpaper_data is None:
+                    del changed_entries[wallpaper_id]
+                    continue
+                project_json_path, stat_result = changed_entries[wallpaper_id]
+                changed_entries[wallpaper_id] = CatalogEntry(
+                    project_json_path, stat_result.st_mtime_ns, stat_result.st_size, wallpaper_data)
+            loaded_ids.add(wallpaper_id)
+            if len(examples) < 3:
+                examples.append(wallpaper_data)
+            yield wallpaper_data
+        
+        removed_ids = [wallpaper_id for wallpaper_id in cached_entries if wallpaper_id not in loaded_ids]
+        self.catalog_cache.update(changed_entries, removed_ids)
+        self.cache_hits = cache_hits
                     
-        print(f"Successfully loaded {wallpaper_count} wallpapers")
+        print(f"Successfully loaded {len(loaded_ids)} wallpapers "
+              f"({cache_hits} cache hits, {len(changed_entries)} parsed, {len(removed_ids)} removed)")
         
         # Show some examples
-        for i, wp in enumerate(self.all_wallpapers[:3]):
+        for i, wp in enumerate(examples):
             print(f"  [{i+1}] ID: {wp.id}, Type: {wp.type}, Title: '{wp.title}'")
+
+    def clear_wallpapers(self) -> None:
+        self.all_wallpapers.clear()
+        self.wallpapers_by_id.clear()
+        self.search_index.clear()
+
+    def add_wallpapers(self, wallpapers: List[Wallpaper]) -> None:
+        """Append a batch produced by iter_wallpaper_data (main thread only)"""
+        self.all_wallpapers.extend(wallpapers)
+        for wp in wallpapers:
+            self.wallpapers_by_id[wp.id] = wp
+            self.search_index.add(wp)
+
+    def snapshot(self, wallpaper_ids: Iterable[str]) -> Dict[str, Optional[Wallpaper]]:
+        """Current entries for the given ids, for handing to scan_ids (main thread only)"""
+        return {wallpaper_id: self.wallpapers_by_id.get(wallpaper_id) for wallpaper_id in wallpaper_ids}
+
+    def scan_ids(self, known: Dict[str, Optional[Wallpaper]]) -> CatalogDiff:
+        """Re-read only the given workshop items and report how they changed.
+
+        `known` is a snapshot() of the items taken on the main thread; the
+        in-memory catalog is not read or modified, so this can run on a
+        worker thread. Pass the result to apply_diff on the main thread.
+        """
+        diff = CatalogDiff()
+        changed_entries = {}
+        stats = {}
+        for wallpaper_id in sorted(known):
+            project_json_path = os.path.join(self.wallpaper_dir, wallpaper_id, "project.json")
+            try:
+                stats[wallpaper_id] = (project_json_path, os.stat(project_json_path))
+            except OSError:
+                if known[wallpaper_id]:
+                    diff.removed.append(wallpaper_id)
         
-        return self.all_wallpapers
+        for wallpaper_id, wallpaper_data in self.scanner.scan(self.wallpaper_dir, list(stats)):
+            old_data = known[wallpaper_id]
+            if wallpaper_data is None:
+                if old_data:
+                    diff.removed.append(wallpaper_id)
+                continue
+            project_json_path, stat_result = stats[wallpaper_id]
+            changed_entries[wallpaper_id] = CatalogEntry(
+                project_json_path, stat_result.st_mtime_ns, stat_result.st_size, wallpaper_data)
+            if old_data is None:
+                diff.added.append(wallpaper_data)
+            elif old_data != wallpaper_data:
+                diff.changed.append(wallpaper_data)
+            else:
+                diff.unchanged += 1
+        
+        self.catalog_cache.update(changed_entries, diff.removed)
+        return diff
+
+    def diff_catalog(self, new_wallpapers: Iterable[Wallpaper]) -> CatalogDiff:
+        """Compare a freshly loaded catalog with the current one by id and metadata"""
+        diff = CatalogDiff()
+        new_ids = set()
+        for wp in new_wallpapers:
+            new_ids.add(wp.id)
+            old_data = self.wallpapers_by_id.get(wp.id)
+            if old_data is None:
+                diff.added.append(wp)
+            elif old_data != wp:
+                diff.changed.append(wp)
+            else:
+                diff.unchanged += 1
+        diff.removed = [wallpaper_id for wallpaper_id in list(self.wallpapers_by_id) if wallpaper_id not in new_ids]
+        return diff
+
+    def reconcile_diff(self, diff: CatalogDiff) -> None:
+        """Re-sort a diff computed against an older catalog by what is loaded now.
+
+        A rescan may finish after another one (or a refresh) has already
+        applied some of the same items, so "added" ids can already exist and
+        "changed" or "removed" ones can be gone.
+        """
+        current = self.wallpapers_by_id
+        updated = diff.added + diff.changed
+        diff.added = [wp for wp in updated if wp.id not in current]
+        diff.changed = [wp for wp in updated if wp.id in current and current[wp.id] != wp]
+        diff.unchanged += len(updated) - len(diff.added) - len(diff.changed)
+        diff.removed = [wallpaper_id for wallpaper_id in diff.removed if wallpaper_id in current]
+
+    def apply_diff(self, diff: CatalogDiff) -> None:
+        """Apply a CatalogDiff to the in-memory catalog (main thread only)"""
+        removed_ids = set(diff.removed)
+        for wallpaper_id in removed_ids:
+            self.wallpapers_by_id.pop(wallpaper_id, None)
+            self.search_index.remove(wallpaper_id)
+        for wp in diff.changed + diff.added:
+            self.wallpapers_by_id[wp.id] = wp
+            self.search_index.add(wp)
+        if removed_ids or diff.changed or diff.added:
+            # Keep all_wallpapers in id order, like a full load
+            self.all_wallpapers[:] = sorted(self.wallpapers_by_id.values(), key=lambda wp: wp.id)
+
+    def matches_filters(self, wallpaper: Wallpaper) -> bool:
+        """Check a single wallpaper against the last applied search and type filters"""
+        return self.type_filters.get(wallpaper.type, False) and \
+               SearchIndex.matches(self.search_term, wallpaper)
 
     def apply_filters(self, search_term: str, type_filters: dict) -> List[Wallpaper]:
+        """Return the wallpapers passing the filters, best search match first"""
         self.search_term = search_term
         self.type_filters = type_filters
         
-        search_term_lower = self.search_term.lower()
+        if not self.search_term.strip():
+            self.filtered_wallpapers = [wp for wp in self.all_wallpapers if self.type_filters.get(wp.type, False)]
+            return self.filtered_wallpapers
         
-        self.filtered_wallpapers = [
-            wp for wp in self.all_wallpapers
-            if (search_term_lower in wp.title_lower if search_term_lower else True) and \
-               (self.type_filters.get(wp.type, False))
-        ]
+        ranked = (self.wallpapers_by_id[wallpaper_id] for wallpaper_id, _ in self.search_index.search(self.search_term))
+        self.filtered_wallpapers = [wp for wp in ranked if self.type_filters.get(wp.type, False)]
         
         return self.filtered_wallpapers
 
     def get_wallpaper_by_id(self, wallpaper_id: str) -> Optional[Wallpaper]:
-        for wp in self.all_wallpapers:
-            if wp.id == wallpaper_id:
-                return wp
-        return None
+        return self.wallpapers_by_id.get(str(wallpaper_id))
 
     def validate_wallpaper_directory(self) -> bool:
         return os.path.isdir(self.wallpaper_dir)
         
-    def refresh_wallpapers(self) -> List[Wallpaper]:
-        """Reload wallpaper data from disk"""
+    def refresh_wallpapers(self) -> CatalogDiff:
+        """Reload wallpaper data from disk and apply only what changed"""
         print("Refreshing wallpaper data...")
-        return self.load_wallpaper_data()
+        diff = self.diff_catalog(self.iter_wallpaper_data())
+        self.apply_diff(diff)
+        return diff
@@ -6,6 +6,8 @@ import sys
 import yaml
 import argparse
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, Gio, Gdk, GLib
@@ -14,6 +16,7 @@ from config.constants import *
 from config.config_manager import ConfigManager
 from data.wallpaper_data import WallpaperDataManager
 from managers.monitor_manager import MonitorManager
+from managers.workshop_watcher import WorkshopWatcher
 from ui.ui_builder import UIBuilder, GridManager
 
 from ui.dialogs import OffsetDialog
@@ -31,15 +34,29 @@ class WallpaperSelectorApp(Gtk.Application):
         # self.current_wallpapers will now be managed by MonitorManager
         # self.current_wallpapers = self.config.get("wallpapers", {})
 
-        self.monitor_manager = MonitorManager()
-        self.monitors = self.monitor_manager.detect_monitors()
+        self.monitor_manager = MonitorManager(self.wallpaper_dir, self.config.get('media_cache', False))
+        # Cached layout; refreshed from hyprctl in the background once the UI is up
+        self.monitors = self.monitor_manager.get_monitor_list()
         self.wallpaper_properties = self.config_manager.load_properties()
 
-        self.data_manager = WallpaperDataManager(self.wallpaper_dir)
+        self.data_manager = WallpaperDataManager(
+            self.wallpaper_dir,
+            scan_workers=self.config.get('scan_workers', DEFAULT_SCAN_WORKERS)
+        )
         self.all_wallpapers = []
         self.search_term = ""
         self.type_filters = {"video": True, "scene": True, "web": True}
         
+        self.catalog_generation = 0
+        self.catalog_loading = False
+        self.catalog_refreshing = False
+        self.workshop_watcher = WorkshopWatcher(self.wallpaper_dir, self.on_workshop_changed)
+        self.deferred_changed_ids = set()
+        # One worker, so rescans run (and update the catalog cache) in the order they were queued
+        self.rescan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-rescan")
+        # Applying can block on the daemon or on unpacking; one worker keeps clicks in order
+        self.apply_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="apply")
+        
         self.current_monitor = "All Monitors"
         self.selected_wallpaper_id = None
         self.property_signal_handlers = {}
@@ -71,7 +88,11 @@ class WallpaperSelectorApp(Gtk.Application):
 
     def shutdown(self, *args):
         print("\nShutdown signal received. Stopping all wallpapers.")
-        self.on_stop_clicked(None)
+        self.workshop_watcher.stop()
+        self.rescan_executor.shutdown(wait=False, cancel_futures=True)
+        self.apply_executor.shutdown(wait=False, cancel_futures=True)
+        self.monitor_manager.stop_watching()
+        self.monitor_manager.stop_all_wallpapers()
         self.quit()
         return True
 
@@ -83,9 +104,13 @@ class WallpaperSelectorApp(Gtk.Application):
             self.win.set_decorated(False)
             self.win.set_opacity(0.95)
             self.build_ui()
-            self.apply_config_from_file(self.config_to_load_on_startup or YAML_FILE)
+            GLib.timeout_add_seconds(RENDERER_REAP_INTERVAL_S, self.reap_renderers)
         self.win.present()
 
+    def reap_renderers(self):
+        self.monitor_manager.reap()
+        return GLib.SOURCE_CONTINUE
+
     def build_ui(self):
         # Define callbacks for the UI builder
         callbacks = {
@@ -106,7 +131,7 @@ class WallpaperSelectorApp(Gtk.Application):
         # Get references to important widgets
         self.sidebar = sidebar
         self.prop_widgets_box = prop_widgets_box
-        self.monitor_combo = self.ui_builder.build_header_bar().get_last_child()  # Assuming monitor combo is the last child
+        self.monitor_combo = self.ui_builder.monitor_combo
         
         # Get sidebar widgets
         sidebar_widgets = self.ui_builder.get_sidebar_widgets()
@@ -122,24 +147,126 @@ class WallpaperSelectorApp(Gtk.Application):
         self.property_signal_handlers['scale'] = self.scale_combo.connect('changed', self.on_property_changed)
         
         # Initialize Grid Manager
-        self.grid_manager = GridManager(self.ui_builder.flowbox)
+        self.grid_manager = GridManager(
+            self.ui_builder.grid_view,
+            preview_cache_bytes=self.config.get('preview_cache_mb', DEFAULT_PREVIEW_CACHE_MB) * 1024 * 1024
+        )
         
-        # Load data and populate grid
-        self.all_wallpapers = self.data_manager.load_wallpaper_data()
         # Initialize current_wallpapers from config
         self.monitor_manager.current_wallpapers = self.config.get("wallpapers", {})
-        self.grid_manager.populate_grid(self.all_wallpapers, self.on_wallpaper_clicked)
         
-        # Apply initial filtering
+        # Apply initial filtering, then stream the catalog in the background.
+        # The saved setup is restored once every wallpaper type is known.
         self.type_filters = self.ui_builder.get_filter_states()
         self.apply_filters()
+        self.workshop_watcher.start()
+        self.monitor_manager.watch_hotplug(
+            lambda name: GLib.idle_add(self.on_monitor_added, name),
+            lambda name: GLib.idle_add(self.on_monitors_changed))
+        self.load_catalog_async(
+            on_loaded=lambda: self.apply_config_from_file(self.config_to_load_on_startup or YAML_FILE)
+        )
+
+    def load_catalog_async(self, on_loaded=None):
+        """Load the catalog on a worker thread and feed it to the grid in batches"""
+        self.catalog_generation += 1
+        generation = self.catalog_generation
+        self.catalog_loading = True
+        self.catalog_total = None
+        self.data_manager.clear_wallpapers()
+        self.all_wallpapers = self.data_manager.all_wallpapers
+        self.grid_manager.clear_grid()
+        self.ui_builder.set_load_progress(0, None)
+
+        def set_total(total):
+            GLib.idle_add(self.on_catalog_total, generation, total)
+
+        def worker():
+            batch = []
+            try:
+                for wp_data in self.data_manager.iter_wallpaper_data(on_total=set_total):
+                    batch.append(wp_data)
+                    if len(batch) >= CATALOG_BATCH_SIZE:
+                        GLib.idle_add(self.on_catalog_batch, generation, batch)
+                        batch = []
+            except Exception as e:
+                print(f"Error loading wallpaper data: {e}")
+            GLib.idle_add(self.on_catalog_batch, generation, batch)
+            GLib.idle_add(self.on_catalog_loaded, generation, on_loaded)
+
+        threading.Thread(target=worker, name="catalog-loader", daemon=True).start()
+
+    def on_catalog_total(self, generation, total):
+        if generation == self.catalog_generation:
+            self.catalog_total = total
+            self.ui_builder.set_load_progress(len(self.all_wallpapers), total)
+        return False
+
+    def on_catalog_batch(self, generation, batch):
+        # Batches from a superseded load (e.g. Refresh during startup) are dropped
+        if generation != self.catalog_generation or not batch:
+            return False
+        self.data_manager.add_wallpapers(batch)
+        self.grid_manager.append_wallpapers(batch, self.on_wallpaper_clicked, self.data_manager.matches_filters)
+        self.ui_builder.set_load_progress(len(self.all_wallpapers), self.catalog_total)
+        return False
+
+    def on_catalog_loaded(self, generation, on_loaded):
+        if generation != self.catalog_generation:
+            return False
+        self.catalog_loading = False
+        self.ui_builder.finish_load_progress()
+        print(f"Catalog loaded: {len(self.all_wallpapers)} wallpapers")
+        self.workshop_watcher.watch_items(list(self.data_manager.wallpapers_by_id))
+        if self.deferred_changed_ids:
+            changed_ids, self.deferred_changed_ids = self.deferred_changed_ids, set()
+            self.on_workshop_changed(changed_ids)
+        if on_loaded:
+            on_loaded()
+        return False
+
+    def on_workshop_changed(self, wallpaper_ids):
+        """Re-read only the workshop items the watcher reported"""
+        if self.catalog_loading:
+            # The running load may have listed the directory before the change
+            self.deferred_changed_ids.update(wallpaper_ids)
+            return
+        generation = self.catalog_generation
+        known = self.data_manager.snapshot(wallpaper_ids)
+
+        def worker():
+            try:
+                diff = self.data_manager.scan_ids(known)
+            except Exception as e:
+                print(f"Error rescanning wallpapers {sorted(known)}: {e}")
+                return
+            GLib.idle_add(self.on_catalog_diff, generation, diff)
+
+        self.rescan_executor.submit(worker)
+
+    def on_catalog_diff(self, generation, diff):
+        if generation != self.catalog_generation or self.catalog_loading:
+            return False
+        # Another rescan may have applied some of these items since this one started
+        self.data_manager.reconcile_diff(diff)
+        if diff.is_empty():
+            print(f"Catalog unchanged: {diff.unchanged} cells reused")
+            return False
+        self.data_manager.apply_diff(diff)
+        self.grid_manager.apply_diff(diff, self.data_manager.matches_filters)
+        self.workshop_watcher.watch_items([wp.id for wp in diff.added])
+        if self.search_term.strip():
+            # Re-rank so new or edited items land in the right place
+            self.apply_filters()
+        print(f"Catalog changed: {len(diff.added)} added, {len(diff.changed)} changed, {len(diff.removed)} removed")
+        return False
 
     def apply_filters(self):
         """Apply search and type filters to wallpapers"""
         # Get current filter states from UI Builder
         self.type_filters = self.ui_builder.get_filter_states()
         self.filtered_wallpapers = self.data_manager.apply_filters(self.search_term, self.type_filters)
-        self.grid_manager.apply_filters(self.filtered_wallpapers)
+        self.grid_manager.apply_filters(self.filtered_wallpapers, ranked=bool(self.search_term.strip()))
 
     def populate_sidebar_values(self):
         if not self.selected_wallpaper_id: return
@@ -168,6 +295,7 @@ class WallpaperSelectorApp(Gtk.Application):
         """Handle wallpaper selection"""
         print(f"Wallpaper clicked: {wallpaper_id}")
         self.selected_wallpaper_id = wallpaper_id
+        self.grid_manager.set_selected(wallpaper_id)
         
         self.sidebar.set_visible(True)
         current_width = self.win.get_allocated_width()
@@ -177,15 +305,6 @@ class WallpaperSelectorApp(Gtk.Application):
         self.populate_sidebar_values()
         self.apply_wallpaper()
 
-    def clear_flowbox(self):
-        """Clear all children from the flowbox"""
-        child = self.flowbox.get_first_child()
-        while child:
-            next_child = child.get_next_sibling()
-            self.flowbox.remove(child)
-            child = next_child
-        self.wallpaper_widgets.clear()
-
     def on_search_changed(self, search_entry):
         """Handle search text changes"""
         self.search_term = search_entry.get_text()
@@ -257,27 +376,28 @@ class WallpaperSelectorApp(Gtk.Application):
         wid_to_apply = wallpaper_id or self.selected_wallpaper_id
         monitor_to_apply = monitor or self.current_monitor
         if not wid_to_apply: return
-        props = self.wallpaper_properties.get(str(wid_to_apply), {})
-        audio = props.get('audio', False)
-        speed = props.get('speed', 1.0)
-        scale = props.get('scale', 'Cover').lower()
-        mpv_opts = [f"--speed={speed}"]
-        if not audio: mpv_opts.append("--no-audio")
-        if scale == 'cover': mpv_opts.append("--panscan=1.0")
-        elif scale == 'fill': mpv_opts.append("--video-aspect-method=stretch")
-        env = os.environ.copy()
-        env['MPV_EXTRA_OPTS'] = " ".join(mpv_opts)
-        try:
-            wp_data = self.data_manager.get_wallpaper_by_id(str(wid_to_apply))
-            if wp_data:
-                self.monitor_manager.apply_wallpaper(
-                    str(wid_to_apply), 
-                    monitor_to_apply, 
-                    props, 
-                    wp_data.type
-                )
-        except Exception as e:
-            print(f"Error launching wallpaper script: {e}")
+        props = dict(self.wallpaper_properties.get(str(wid_to_apply), {}))
+        wp_data = self.data_manager.get_wallpaper_by_id(str(wid_to_apply))
+        if not wp_data:
+            return
+
+        def worker():
+            try:
+                applied = self.monitor_manager.apply_wallpaper(str(wid_to_apply), monitor_to_apply, props, wp_data.type)
+            except Exception as e:
+                print(f"Error launching wallpaper script: {e}")
+                return
+            GLib.idle_add(self.on_wallpaper_applied, str(wid_to_apply), applied)
+
+        self.apply_executor.submit(worker)
+
+    def on_wallpaper_applied(self, wallpaper_id, monitors):
+        self.monitor_manager.set_current(wallpaper_id, monitors)
+        return False
+
+    def on_layout_restored(self, wallpapers):
+        self.monitor_manager.set_layout(wallpapers)
+        return False
 
 
     def on_save_setup_clicked(self, button):
@@ -294,37 +414,85 @@ class WallpaperSelectorApp(Gtk.Application):
         self.config_manager.save_properties(self.wallpaper_properties)
 
     def apply_config_from_file(self, config_path):
-        self.on_stop_clicked(None)
-        import time; time.sleep(0.5)
-        if not os.path.exists(config_path): return
+        if not os.path.exists(config_path):
+            self.monitor_manager.stop_all_wallpapers()
+            return
         config_data = {}
         try:
             with open(config_path, 'r') as f: config_data = yaml.safe_load(f) or {}
         except Exception as e:
             print(f"Error loading config for applying: {e}")
         wallpapers_to_apply = config_data.get("wallpapers", {})
-        # Update MonitorManager's current_wallpapers
-        self.monitor_manager.current_wallpapers = wallpapers_to_apply.copy()
-        for monitor, wid in wallpapers_to_apply.items():
-            if monitor in self.monitors:
-                self.apply_wallpaper(wallpaper_id=str(wid), monitor=monitor)
+        properties = {str(wid): self.wallpaper_properties.get(str(wid), {}) for wid in wallpapers_to_apply.values()}
+
+        # The restore waits for every monitor's first frame, so keep it off the main thread
+        def worker():
+            self.monitor_manager.detect_monitors()
+            GLib.idle_add(self.on_monitors_changed)
+            try:
+                report = self.monitor_manager.restore(wallpapers_to_apply, properties)
+            except Exception as e:
+                print(f"Error restoring {config_path}: {e}")
+                report = None
+            GLib.idle_add(self.on_layout_restored, wallpapers_to_apply)
+            if report:
+                print(report.summary())
+        # Same worker as single applies, so a click during startup cannot race the restore
+        self.apply_executor.submit(worker)
+
+    def on_monitors_changed(self):
+        self.monitors = self.monitor_manager.get_monitor_list()
+        if self.current_monitor not in self.monitors:
+            self.current_monitor = "All Monitors"
+        self.ui_builder.set_monitors(self.monitors)
+        return GLib.SOURCE_REMOVE
+
+    def on_monitor_added(self, name):
+        self.on_monitors_changed()
+        # With the daemon running it re-applies the wallpaper itself
+        wallpaper_id = self.monitor_manager.current_wallpapers.get(name)
+        if wallpaper_id is not None and not self.monitor_manager.daemon.is_running():
+            self.apply_wallpaper(wallpaper_id=str(wallpaper_id), monitor=name)
+        return GLib.SOURCE_REMOVE
 
     def on_monitor_changed(self, combo):
         self.current_monitor = combo.get_active_text()
         
     def on_refresh_clicked(self, button):
         """Handle refresh button click: reload wallpapers and update grid"""
+        if self.catalog_loading:
+            print("Wallpapers are still loading; refresh skipped.")
+            return
+        if self.catalog_refreshing:
+            print("A refresh is already running; refresh skipped.")
+            return
         print("Refreshing wallpapers...")
-        # Refresh the data
-        self.all_wallpapers = self.data_manager.refresh_wallpapers()
-        # Repopulate the grid with the new data
-        self.grid_manager.populate_grid(self.all_wallpapers, self.on_wallpaper_clicked)
-        # Re-apply the current filters to update the grid view
-        self.apply_filters()
+        self.catalog_refreshing = True
+        generation = self.catalog_generation
+        self.ui_builder.set_load_progress(0, None)
+
+        # Rescan in the background, then touch only the cells that changed
+        def worker():
+            wallpapers = None
+            try:
+                wallpapers = list(self.data_manager.iter_wallpaper_data())
+            except Exception as e:
+                print(f"Error refreshing wallpaper data: {e}")
+            GLib.idle_add(self.on_refresh_done, generation, wallpapers)
+
+        threading.Thread(target=worker, name="catalog-refresh", daemon=True).start()
+
+    def on_refresh_done(self, generation, wallpapers):
+        self.catalog_refreshing = False
+        self.ui_builder.finish_load_progress()
+        if wallpapers is not None:
+            # Diffed here, against the catalog as it is now, not as it was when the scan began
+            self.on_catalog_diff(generation, self.data_manager.diff_catalog(wallpapers))
         print("Wallpapers refreshed.")
+        return False
         
     def on_stop_clicked(self, button):
-        self.monitor_manager.stop_all_wallpapers()
+        self.monitor_manager.stop_wallpaper(self.current_monitor)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+from typing import Dict, List, Optional
+from config.constants import DAEMON_SOCKET, DAEMON_START_TIMEOUT, REPO_DIR
+
+class DaemonError(Exception):
+    pass
+
+class DaemonClient:
+    """Thin client for the wallpaper daemon's Unix socket API"""
+    def __init__(self, socket_path: str = DAEMON_SOCKET, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def request(self, cmd: str, **args) -> dict:
+        message = dict(args, cmd=cmd)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall((json.dumps(message) + "\n").encode('utf-8'))
+                with sock.makefile('rb') as reader:
+                    line = reader.readline()
+        except OSError as e:
+            raise DaemonError(f"Could not reach wallpaper daemon: {e}") from e
+        if not line:
+            raise DaemonError("Wallpaper daemon closed the connection")
+        response = json.loads(line)
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', 'Unknown daemon error'))
+        return response
+
+    def is_running(self) -> bool:
+        try:
+            self.request('status')
+            return True
+        except DaemonError:
+            return False
+
+    def ensure_running(self, timeout: float = DAEMON_START_TIMEOUT) -> bool:
+        """Start the daemon in the background if it is not already listening"""
+        if self.is_running():
+            return True
+        print("Starting wallpaper daemon...")
+        subprocess.Popen([sys.executable, "-m", "managers.wallpaper_daemon", "--socket", self.socket_path],
+                         cwd=REPO_DIR, start_new_session=True)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.path.exists(self.socket_path) and self.is_running():
+                return True
+            time.sleep(0.05)
+        print("Wallpaper daemon did not start in time")
+        return False
+
+    def apply(self, wallpaper_id: str, monitor: str, properties: Optional[dict] = None) -> dict:
+        return self.request('apply', id=str(wallpaper_id), monitor=monitor, properties=properties)
+
+    def stop(self, monitor: Optional[str] = None) -> dict:
+        return self.request('stop', monitor=monitor)
+
+    def restore(self, wallpapers: Dict[str, str], monitors: List[str], first_frame_timeout: float):
+        """Restore a whole layout at once; returns the daemon's RestoreReport"""
+        from managers.restore import RestoreReport
+        # The reply only comes once every monitor has drawn or timed out
+        client = DaemonClient(self.socket_path, self.timeout + first_frame_timeout)
+        response = client.request('restore', wallpapers=wallpapers, monitors=monitors,
+                                  timeout=first_frame_timeout)
+        return RestoreReport.from_dict(response['report'])
+
+    def status(self) -> dict:
+        return self.request('status')
+
+    def reload_properties(self) -> dict:
+        return self.request('reload-properties')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Control the HyprWpE wallpaper daemon.")
+    parser.add_argument('--socket', default=DAEMON_SOCKET, help='Daemon socket path.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    apply_parser = subparsers.add_parser('apply', help='Apply a wallpaper to a monitor.')
+    apply_parser.add_argument('id')
+    apply_parser.add_argument('monitor', nargs='?', default="All Monitors")
+    stop_parser = subparsers.add_parser('stop', help='Stop one monitor, or all of them.')
+    stop_parser.add_argument('monitor', nargs='?')
+    subparsers.add_parser('status', help='Show running renderers.')
+    subparsers.add_parser('reload-properties', help='Re-read properties.yaml.')
+    args = parser.parse_args()
+
+    client = DaemonClient(args.socket)
+    try:
+        if args.command == 'apply':
+            if not client.ensure_running():
+                sys.exit(1)
+            response = client.apply(args.id, args.monitor)
+        elif args.command == 'stop':
+            response = client.stop(args.monitor)
+        elif args.command == 'status':
+            response = client.status()
+        else:
+            response = client.reload_properties()
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(response, indent=2))
@@ -0,0 +1,127 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from config.constants import POWER_SUPPLY_DIR, THERMAL_DIR, GOVERNOR_INTERVAL_S
+
+# Used for any key missing from `fps_policy` in properties.yaml. A cap of 0 means uncapped:
+# on mains power nothing is capped unless the system is loaded or running hot.
+DEFAULT_FPS_POLICY = {
+    'ac': 0,
+    'battery': 30,
+    'low_battery': 15,
+    'low_battery_percent': 20,
+    'high_load': 30,
+    'high_load_threshold': 1.0,  # 1-minute load average per CPU
+    'high_temp': 30,
+    'high_temp_celsius': 85,  # Hottest thermal zone
+    'monitors': {},
+}
+
+@dataclass
+class PowerState:
+    on_battery: bool = False
+    battery_percent: Optional[int] = None
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def read_power_state(sysfs_root: str = POWER_SUPPLY_DIR) -> PowerState:
+    """On battery if no mains/USB supply is online and some battery is discharging"""
+    try:
+        supplies = sorted(os.listdir(sysfs_root))
+    except OSError:
+        return PowerState()
+    external_online, discharging, capacities = False, False, []
+    for name in supplies:
+        supply = os.path.join(sysfs_root, name)
+        kind = _read(os.path.join(supply, "type"))
+        if kind == "Battery":
+            # Peripherals (mice, headsets) also report batteries; only system batteries count
+            if _read(os.path.join(supply, "scope")) == "Device":
+                continue
+            if _read(os.path.join(supply, "status")) == "Discharging":
+                discharging = True
+            capacity = _read(os.path.join(supply, "capacity"))
+            if capacity and capacity.isdigit():
+                capacities.append(int(capacity))
+        elif _read(os.path.join(supply, "online")) == "1":
+            external_online = True
+    return PowerState(discharging and not external_online, min(capacities) if capacities else None)
+
+def read_max_temperature(sysfs_root: str = THERMAL_DIR) -> Optional[float]:
+    """Hottest thermal zone in degrees Celsius, or None if none can be read"""
+    try:
+        zones = [name for name in os.listdir(sysfs_root) if name.startswith("thermal_zone")]
+    except OSError:
+        return None
+    temperatures = []
+    for zone in zones:
+        millidegrees = _read(os.path.join(sysfs_root, zone, "temp"))
+        # Some zones (e.g. a powered-down Wi-Fi card) fail to read or report nonsense
+        if millidegrees and millidegrees.lstrip('-').isdigit() and int(millidegrees) > 0:
+            temperatures.append(int(millidegrees) / 1000)
+    return max(temperatures) if temperatures else None
+
+class FpsGovernor:
+    """Picks a target frame rate for each renderer.
+
+    The target is the lowest of the caps that apply: AC or battery (with a
+    lower cap once the battery runs low), high system load, high
+    temperature, the monitor's own cap from the policy, its refresh rate,
+    and the wallpaper's `max_fps` property. The power state, load and
+    temperature are sampled at most once per GOVERNOR_INTERVAL_S. Returns
+    None when nothing caps the rate.
+    """
+    def __init__(self, policy: Optional[dict] = None, sysfs_root: str = POWER_SUPPLY_DIR,
+                 loadavg: Callable[[], tuple] = os.getloadavg, cpu_count: int = os.cpu_count() or 1,
+                 interval: float = GOVERNOR_INTERVAL_S, thermal_root: str = THERMAL_DIR):
+        self.policy = dict(DEFAULT_FPS_POLICY, **(policy or {}))
+        self.sysfs_root = sysfs_root
+        self.thermal_root = thermal_root
+        self.loadavg = loadavg
+        self.cpu_count = cpu_count
+        self.interval = interval
+        self.sampled_at = None
+        self.power = PowerState()
+        self.load = 0.0
+        self.temperature: Optional[float] = None
+
+    def sample(self) -> None:
+        now = time.monotonic()
+        if self.sampled_at is not None and now - self.sampled_at < self.interval:
+            return
+        self.sampled_at = now
+        self.power = read_power_state(self.sysfs_root)
+        try:
+            self.load = self.loadavg()[0] / self.cpu_count
+        except OSError:
+            self.load = 0.0
+        self.temperature = read_max_temperature(self.thermal_root)
+
+    def target_fps(self, monitor: str, properties: Optional[dict] = None,
+                   refresh_rate: Optional[float] = None) -> Optional[int]:
+        self.sample()
+        policy = self.policy
+        caps = []
+        if self.power.on_battery:
+            caps.append(policy['battery'])
+            percent = self.power.battery_percent
+            if percent is not None and percent <= policy['low_battery_percent']:
+                caps.append(policy['low_battery'])
+        else:
+            caps.append(policy['ac'])
+        if self.load >= policy['high_load_threshold']:
+            caps.append(policy['high_load'])
+        if self.temperature is not None and self.temperature >= policy['high_temp_celsius']:
+            caps.append(policy['high_temp'])
+        caps.append((policy.get('monitors') or {}).get(monitor, 0))
+        caps.append(round(refresh_rate or 0))
+        caps.append((properties or {}).get('max_fps', 0))
+        caps = [int(cap) for cap in caps if cap and cap > 0]
+        return min(caps) if caps else None
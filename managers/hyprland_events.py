@@ -0,0 +1,74 @@
+import os
+import time
+import socket
+import threading
+from typing import Callable, Optional
+
+from config.constants import HOTPLUG_RECONNECT_DELAY
+
+def hyprland_event_socket() -> Optional[str]:
+    """Path of Hyprland's event socket (.socket2.sock), or None outside Hyprland"""
+    signature = os.environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+    if not signature:
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR", "")
+    path = os.path.join(runtime_dir, "hypr", signature, ".socket2.sock")
+    if runtime_dir and os.path.exists(path):
+        return path
+    # Hyprland before 0.40 kept its sockets under /tmp
+    return os.path.join("/tmp/hypr", signature, ".socket2.sock")
+
+class HyprlandEventListener:
+    """Follows Hyprland's event socket on a background thread.
+
+    Each `EVENT>>DATA` line is passed to `on_event(event, data)`, and
+    `on_connect()` runs after every (re)connect so callers can resync state
+    they may have missed. Both run on the listener thread.
+    """
+    def __init__(self, on_event: Callable[[str, str], None], on_connect: Optional[Callable[[], None]] = None,
+                 event_socket: Optional[str] = None, name: str = "hyprland-events"):
+        self.on_event = on_event
+        self.on_connect = on_connect
+        self.event_socket = event_socket or hyprland_event_socket()
+        self.name = name
+        self.running = False
+        self.connection = None
+        self.thread = None
+
+    def start(self) -> bool:
+        """Start listening; False if there is no event socket to follow"""
+        if not self.event_socket:
+            return False
+        self.running = True
+        self.thread = threading.Thread(target=self._listen, name=self.name, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self) -> None:
+        self.running = False
+        connection = self.connection
+        if connection:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _listen(self) -> None:
+        while self.running:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+                    connection.connect(self.event_socket)
+                    self.connection = connection
+                    if self.on_connect:
+                        self.on_connect()
+                    with connection.makefile('r', encoding='utf-8', errors='replace') as events:
+                        for line in events:
+                            event, _, data = line.rstrip("\n").partition(">>")
+                            self.on_event(event, data)
+            except OSError as e:
+                if self.running:
+                    print(f"Hyprland event socket unavailable: {e}")
+            finally:
+                self.connection = None
+            if self.running:
+                time.sleep(HOTPLUG_RECONNECT_DELAY)
@@ -1,44 +1,141 @@
 import subprocess
-import json
-import os
-from typing import List
-from config.constants import SCRIPT_PATH
+from typing import Callable, List
+from config.constants import SCRIPT_PATH, FIRST_FRAME_TIMEOUT
+from managers.daemon_client import DaemonClient, DaemonError
+from managers.monitor_topology import MonitorTopology, query_monitors
+from managers.process_registry import ProcessRegistry
+from managers.renderer_launcher import RendererLauncher, create_media_cache
+from managers.restore import RestorePipeline, RestoreReport
+
+def detect_monitors() -> List[str]:
+    try:
+        return [monitor.name for monitor in query_monitors()]
+    except Exception as e:
+        print(f"Could not detect monitors: {e}")
+        return []
 
 class MonitorManager:
-    def __init__(self):
-        self.monitors: List[str] = []
+    def __init__(self, wallpaper_dir: str, use_media_cache: bool = False):
+        # Start from the cached layout; detect_monitors() refreshes it from hyprctl
+        self.topology = MonitorTopology()
+        self.monitors: List[str] = self.topology.names()
         self.current_wallpapers: dict = {}
+        self.daemon = DaemonClient()
+        # Used when the daemon is unavailable; renderers are then owned by this process
+        # and, with no occlusion watcher running, keep drawing while hidden
+        self.use_media_cache = use_media_cache
+        self.launcher = RendererLauncher(wallpaper_dir)
+        self.update_media_cache()
+        self.processes = ProcessRegistry()
     
     def detect_monitors(self) -> List[str]:
+        self.monitors = self.topology.refresh()
+        self.update_media_cache()
+        return self.monitors
+
+    def update_media_cache(self) -> None:
+        """Size the downscaled-media cache for the largest attached monitor"""
+        self.launcher.media_cache = create_media_cache(self.use_media_cache, self.topology.largest_resolution())
+
+    def watch_hotplug(self, on_added: Callable[[str], None], on_removed: Callable[[str], None]) -> bool:
+        """Follow monitor hotplug events; callbacks run on a background thread"""
+        def added(name):
+            self.monitors = self.topology.names()
+            self.update_media_cache()
+            on_added(name)
+
+        def removed(name):
+            self.monitors = self.topology.names()
+            self.update_media_cache()
+            self.processes.stop(name)
+            on_removed(name)
+        return self.topology.watch(added, removed)
+
+    def stop_watching(self) -> None:
+        self.topology.stop()
+
+    def _targets(self, monitor: str) -> List[str]:
+        return list(self.monitors) if monitor == "All Monitors" else [monitor]
+
+    def apply_wallpaper(self, wallpaper_id: str, monitor: str, properties: dict, wallpaper_type: str) -> List[str]:
+        """Show a wallpaper on `monitor` and return the monitors now showing it.
+
+        Can block for seconds (starting the daemon, unpacking a .pkg,
+        stopping renderers), so call it off the main thread. The caller
+        records the result with set_current.
+        """
+        targets = self._targets(monitor)
+        # The daemon keeps renderers alive between clicks; launching directly is the fallback
         try:
-            result = subprocess.run(["hyprctl", "monitors", "-j"], capture_output=True, text=True, check=True)
-            self.monitors = [m['name'] for m in json.loads(result.stdout)]
-            return self.monitors
-        except Exception as e:
-            print(f"Could not detect monitors: {e}")
-            return []
-
-    def apply_wallpaper(self, wallpaper_id: str, monitor: str, properties: dict, wallpaper_type: str) -> None:
-        audio = properties.get('audio', False)
-        speed = properties.get('speed', 1.0)
-        scale = properties.get('scale', 'Cover').lower()
-        mpv_opts = [f"--speed={speed}"]
-        if not audio: mpv_opts.append("--no-audio")
-        if scale == 'cover': mpv_opts.append("--panscan=1.0")
-        elif scale == 'fill': mpv_opts.append("--video-aspect-method=stretch")
-        env = os.environ.copy()
-        env['MPV_EXTRA_OPTS'] = " ".join(mpv_opts)
+            if self.daemon.ensure_running():
+                print(f"Applying '{wallpaper_type}' wallpaper ID: {wallpaper_id} to monitor: {monitor}")
+                self.daemon.apply(wallpaper_id, monitor, properties)
+                return targets
+        except DaemonError as e:
+            print(f"{e}; launching renderers directly")
+        applied = []
         try:
-            targets = self.monitors if monitor == "All Monitors" else [monitor]
+            wp_type, path = self.launcher.resolve(wallpaper_id)
+            self.processes.stop_many(targets)
+            self.processes.stop_untracked(targets)
             for m in targets:
                 print(f"Applying '{wallpaper_type}' wallpaper ID: {wallpaper_id} to monitor: {m}")
-                subprocess.Popen([SCRIPT_PATH, str(wallpaper_id), m], env=env)
-                self.current_wallpapers[m] = int(wallpaper_id)
+                self.processes.add(m, self.launcher.launch(wp_type, path, m, properties))
+                applied.append(m)
         except Exception as e:
-            print(f"Error launching wallpaper script: {e}")
+            print(f"Error launching wallpaper: {e}")
+        return applied
+
+    def set_current(self, wallpaper_id: str, monitors: List[str]) -> None:
+        for m in monitors:
+            self.current_wallpapers[m] = int(wallpaper_id)
+
+    def set_layout(self, wallpapers: dict) -> None:
+        # Disconnected monitors keep their entry so saving the setup does not drop them
+        self.current_wallpapers = {m: int(wid) for m, wid in wallpapers.items()}
+
+    def restore(self, wallpapers: dict, properties: dict,
+                first_frame_timeout: float = FIRST_FRAME_TIMEOUT) -> RestoreReport:
+        """Apply a saved monitor -> wallpaper layout with all monitors launched in parallel.
+
+        Blocks until every monitor has drawn or timed out, so call it off the
+        main thread. The caller records the layout with set_layout.
+        """
+        wallpapers = {m: str(wid) for m, wid in wallpapers.items() if m in self.monitors}
+        try:
+            if self.daemon.ensure_running():
+                return self.daemon.restore(wallpapers, self.monitors, first_frame_timeout)
+        except DaemonError as e:
+            print(f"{e}; launching renderers directly")
+        pipeline = RestorePipeline(self.launcher, self.processes, first_frame_timeout)
+        return pipeline.restore(wallpapers, properties)
+
+    def stop_wallpaper(self, monitor: str) -> None:
+        """Stop the renderers on one monitor ("All Monitors" stops every one)"""
+        if monitor == "All Monitors":
+            self.stop_all_wallpapers()
+            return
+        print(f"Stopping wallpaper on {monitor}...")
+        if self.daemon.is_running():
+            try:
+                self.daemon.stop(monitor)
+            except DaemonError as e:
+                print(f"Error sending stop command to daemon: {e}")
+        self.processes.stop(monitor)
+        self.current_wallpapers.pop(monitor, None)
 
     def stop_all_wallpapers(self) -> None:
         print("Stopping all wallpapers...")
+        self.processes.stop_all()
+        if self.daemon.is_running():
+            try:
+                self.daemon.stop()
+                self.current_wallpapers.clear()
+                print("All renderers stopped by the daemon.")
+                return
+            except DaemonError as e:
+                print(f"Error sending stop command to daemon: {e}")
+        # Renderers started by HyprWpE.sh or an earlier session are not tracked
         try:
             subprocess.run([SCRIPT_PATH, "stop"], check=True, timeout=5, capture_output=True, text=True)
             self.current_wallpapers.clear()
@@ -47,5 +144,9 @@ class MonitorManager:
             if isinstance(e, subprocess.TimeoutExpired) or (hasattr(e, 'stderr') and e.stderr):
                  print(f"Error sending stop command: {e}")
 
+    def reap(self) -> None:
+        for monitor, returncode in self.processes.reap().items():
+            print(f"[{monitor}] Renderer exited with code {returncode}")
+
     def get_monitor_list(self) -> List[str]:
         return self.monitors
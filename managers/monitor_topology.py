@@ -0,0 +1,144 @@
+import os
+import json
+import threading
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Callable, List, Optional, Tuple
+
+from config.constants import MONITOR_CACHE_FILE
+from managers.hyprland_events import HyprlandEventListener
+
+@dataclass
+class MonitorInfo:
+    name: str
+    width: int = 0
+    height: int = 0
+    refresh_rate: float = 0.0
+    scale: float = 1.0
+
+def query_monitors() -> List[MonitorInfo]:
+    """Ask Hyprland for the current layout; raises if hyprctl fails"""
+    result = subprocess.run(["hyprctl", "monitors", "-j"], capture_output=True, text=True, check=True)
+    return [MonitorInfo(m['name'], m.get('width', 0), m.get('height', 0),
+                        m.get('refreshRate', 0.0), m.get('scale', 1.0))
+            for m in json.loads(result.stdout) if not m.get('disabled')]
+
+class MonitorTopology:
+    """Last known monitor layout, kept current from Hyprland's hotplug events.
+
+    The layout is cached on disk so callers can start from it without
+    waiting on hyprctl. `watch()` follows the event socket on a background
+    thread and calls `on_added(name)` / `on_removed(name)` from that thread.
+    `query` and `event_socket` can be replaced, e.g. with a fake server.
+    """
+    def __init__(self, cache_path: str = MONITOR_CACHE_FILE, event_socket: Optional[str] = None,
+                 query: Callable[[], List[MonitorInfo]] = query_monitors):
+        self.cache_path = cache_path
+        self.query = query
+        self.monitors: List[MonitorInfo] = self.load_cached()
+        self.lock = threading.Lock()
+        self.on_added: Optional[Callable[[str], None]] = None
+        self.on_removed: Optional[Callable[[str], None]] = None
+        # Anything may have changed while disconnected, so resync on every connect
+        self.listener = HyprlandEventListener(self.handle_event, self.resync, event_socket, "monitor-hotplug")
+
+    def names(self) -> List[str]:
+        return [monitor.name for monitor in self.monitors]
+
+    def largest_resolution(self) -> Optional[Tuple[int, int]]:
+        """Largest width and height across attached monitors, or None if unknown"""
+        sized = [monitor for monitor in self.monitors if monitor.width and monitor.height]
+        if not sized:
+            return None
+        return max(m.width for m in sized), max(m.height for m in sized)
+
+    def get(self, name: str) -> Optional[MonitorInfo]:
+        return next((monitor for monitor in self.monitors if monitor.name == name), None)
+
+    def load_cached(self) -> List[MonitorInfo]:
+        try:
+            with open(self.cache_path, 'r') as f:
+                return [MonitorInfo(**entry) for entry in json.load(f)]
+        except (OSError, TypeError, ValueError):
+            return []
+
+    def refresh(self) -> List[str]:
+        """Re-query the layout and update the cache; keeps the cached layout if hyprctl fails"""
+        try:
+            monitors = self.query()
+        except Exception as e:
+            print(f"Could not detect monitors: {e}")
+            return self.names()
+        with self.lock:
+            self.monitors = monitors
+            self._save()
+        return self.names()
+
+    def resync(self) -> None:
+        """Refresh after (re)connecting and report monitors plugged or unplugged in between"""
+        before = self.names()
+        after = self.refresh()
+        for name in before:
+            if name not in after:
+                print(f"Monitor disconnected: {name}")
+                if self.on_removed:
+                    self.on_removed(name)
+        for name in after:
+            if name not in before:
+                print(f"Monitor connected: {name}")
+                if self.on_added:
+                    self.on_added(name)
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            # Per process: the GUI and the daemon both keep this cache current
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump([asdict(monitor) for monitor in self.monitors], f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write monitor cache: {e}")
+
+    def watch(self, on_added: Callable[[str], None], on_removed: Callable[[str], None]) -> bool:
+        """Start following hotplug events; False if there is no event socket to follow"""
+        self.on_added = on_added
+        self.on_removed = on_removed
+        return self.listener.start()
+
+    def stop(self) -> None:
+        self.listener.stop()
+
+    def handle_event(self, event: str, data: str) -> None:
+        if event == "monitoradded":
+            self._monitor_added(data)
+        elif event == "monitoraddedv2":
+            # id,name,description
+            self._monitor_added(data.split(",", 2)[1] if data.count(",") >= 1 else data)
+        elif event == "monitorremoved":
+            self._monitor_removed(data)
+        elif event == "monitorremovedv2":
+            self._monitor_removed(data.split(",", 2)[1] if data.count(",") >= 1 else data)
+
+    def _monitor_added(self, name: str) -> None:
+        # Both v1 and v2 events arrive for one hotplug; only react once
+        if name in self.names():
+            return
+        self.refresh()
+        if name not in self.names():
+            with self.lock:
+                self.monitors.append(MonitorInfo(name))
+                self._save()
+        print(f"Monitor connected: {name}")
+        if self.on_added:
+            self.on_added(name)
+
+    def _monitor_removed(self, name: str) -> None:
+        if name not in self.names():
+            return
+        with self.lock:
+            self.monitors = [monitor for monitor in self.monitors if monitor.name != name]
+            self._save()
+        print(f"Monitor disconnected: {name}")
+        if self.on_removed:
+            self.on_removed(name)
@@ -0,0 +1,85 @@
+import os
+import json
+import time
+import socket
+import itertools
+from typing import Any
+
+FPS_FILTER_LABEL = "hyprwpefps"
+
+class MpvIpcError(Exception):
+    pass
+
+class MpvIpcClient:
+    """Minimal client for mpv's JSON IPC (--input-ipc-server).
+
+    Each call opens a short-lived connection, sends one command and waits
+    for the reply with the matching request_id, skipping any events mpv
+    sends in between.
+    """
+    def __init__(self, socket_path: str, timeout: float = 2.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.request_ids = itertools.count(1)
+
+    def command(self, *args) -> Any:
+        request_id = next(self.request_ids)
+        message = json.dumps({'command': list(args), 'request_id': request_id}) + "\n"
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(message.encode('utf-8'))
+                with sock.makefile('rb') as reader:
+                    for line in reader:
+                        reply = json.loads(line)
+                        if reply.get('request_id') != request_id:
+                            continue
+                        if reply.get('error') != 'success':
+                            raise MpvIpcError(f"mpv {args[0]} failed: {reply.get('error')}")
+                        return reply.get('data')
+        except (OSError, ValueError) as e:
+            raise MpvIpcError(f"mpv IPC at {self.socket_path} failed: {e}") from e
+        raise MpvIpcError("mpv closed the IPC connection")
+
+    def is_alive(self) -> bool:
+        try:
+            self.command('get_property', 'pid')
+            return True
+        except MpvIpcError:
+            return False
+
+    def wait_until_ready(self, timeout: float) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.path.exists(self.socket_path) and self.is_alive():
+                return True
+            time.sleep(0.05)
+        return False
+
+    def set_property(self, name: str, value: Any) -> None:
+        self.command('set_property', name, value)
+
+    def loadfile(self, path: str) -> None:
+        self.command('loadfile', path, 'replace')
+
+    def set_fps_cap(self, fps) -> None:
+        """Drop frames down to `fps` with a labelled fps filter; None or 0 removes the cap"""
+        source_fps = self.command('get_property', 'container-fps')
+        try:
+            self.command('vf', 'remove', f'@{FPS_FILTER_LABEL}')
+        except MpvIpcError:
+            pass  # No cap was set
+        # The fps filter duplicates frames when asked for more than the source has
+        if fps and source_fps and fps < source_fps:
+            self.command('vf', 'add', f'@{FPS_FILTER_LABEL}:fps=fps={fps}')
+
+    def apply_properties(self, properties: dict) -> None:
+        """Push per-wallpaper properties to the running player, matching build_mpv_options"""
+        audio = properties.get('audio', False)
+        scale = properties.get('scale', 'Cover').lower()
+        self.set_property('speed', float(properties.get('speed', 1.0)))
+        self.set_property('aid', 'auto' if audio else 'no')
+        self.set_property('mute', not audio)
+        self.set_property('panscan', 1.0 if scale == 'cover' else 0.0)
+        self.set_property('keepaspect', scale != 'fill')
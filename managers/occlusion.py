@@ -0,0 +1,184 @@
+import json
+import time
+import threading
+import subprocess
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from config.constants import OCCLUSION_DEBOUNCE_S
+from managers.hyprland_events import HyprlandEventListener
+
+# Events after which some monitor may have become covered or uncovered
+VISIBILITY_EVENTS = {
+    "fullscreen", "workspace", "workspacev2", "focusedmon", "focusedmonv2", "activespecial",
+    "openwindow", "closewindow", "movewindow", "movewindowv2", "changefloatingmode",
+    "monitoradded", "monitoraddedv2", "monitorremoved", "monitorremovedv2",
+}
+
+Rect = Tuple[float, float, float, float]
+
+def hyprctl_json(what: str) -> list:
+    result = subprocess.run(["hyprctl", what, "-j"], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+def covers(area: Rect, rects: List[Rect]) -> bool:
+    """True if the union of `rects` covers all of `area`"""
+    ax, ay, aw, ah = area
+    clipped = []
+    for x, y, w, h in rects:
+        x0, y0 = max(x, ax), max(y, ay)
+        x1, y1 = min(x + w, ax + aw), min(y + h, ay + ah)
+        if x1 > x0 and y1 > y0:
+            clipped.append((x0, y0, x1, y1))
+    if not clipped:
+        return False
+    # Coordinate compression: every cell of the grid must lie inside some rect
+    xs = sorted({ax, ax + aw, *(r[0] for r in clipped), *(r[2] for r in clipped)})
+    ys = sorted({ay, ay + ah, *(r[1] for r in clipped), *(r[3] for r in clipped)})
+    for cx0, cx1 in zip(xs, xs[1:]):
+        for cy0, cy1 in zip(ys, ys[1:]):
+            if not any(r[0] <= cx0 and cx1 <= r[2] and r[1] <= cy0 and cy1 <= r[3] for r in clipped):
+                return False
+    return True
+
+def occluded_monitors(monitors: list, clients: list) -> Set[str]:
+    """Names of monitors whose wallpaper is completely hidden.
+
+    Takes the output of `hyprctl monitors -j` and `hyprctl clients -j`. A
+    monitor counts as covered when its visible workspace has a fullscreen
+    window, or when that workspace's windows tile over the whole output (no
+    gaps). Window opacity is not known here, so translucent windows still
+    count as covering.
+    """
+    occluded = set()
+    for monitor in monitors:
+        workspaces = {monitor.get('activeWorkspace', {}).get('id'), monitor.get('specialWorkspace', {}).get('id')}
+        workspaces.discard(None)
+        workspaces.discard(0)
+        windows = [c for c in clients
+                   if c.get('mapped', True) and not c.get('hidden') and c.get('workspace', {}).get('id') in workspaces]
+        # Older Hyprland reports a bool, newer an enum where 2 and 3 mean real fullscreen
+        if any(c.get('fullscreen') is True or c.get('fullscreen') in (2, 3) for c in windows):
+            occluded.add(monitor['name'])
+            continue
+        scale = monitor.get('scale', 1.0) or 1.0
+        width, height = monitor.get('width', 0) / scale, monitor.get('height', 0) / scale
+        if monitor.get('transform', 0) % 2:
+            width, height = height, width
+        area = (monitor.get('x', 0), monitor.get('y', 0), width, height)
+        if width and height and covers(area, [(*c['at'], *c['size']) for c in windows]):
+            occluded.add(monitor['name'])
+    return occluded
+
+class OcclusionWatcher:
+    """Tracks which monitors are fully covered and reports changes.
+
+    Hyprland events only say that something moved, so each burst of events
+    is debounced and followed by one query of the monitor and client lists.
+    `on_change(monitor, visible)` runs on a background thread.
+    """
+    def __init__(self, on_change: Callable[[str, bool], None], event_socket: Optional[str] = None,
+                 query: Callable[[str], list] = hyprctl_json, debounce: float = OCCLUSION_DEBOUNCE_S):
+        self.on_change = on_change
+        self.query = query
+        self.debounce = debounce
+        self.occluded: Set[str] = set()
+        self.lock = threading.Lock()
+        self.timer = None
+        self.listener = HyprlandEventListener(self.handle_event, self.schedule, event_socket, "occlusion")
+
+    def start(self) -> bool:
+        return self.listener.start()
+
+    def stop(self) -> None:
+        self.listener.stop()
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+
+    def is_visible(self, monitor: str) -> bool:
+        return monitor not in self.occluded
+
+    def handle_event(self, event: str, data: str) -> None:
+        if event in VISIBILITY_EVENTS:
+            self.schedule()
+
+    def schedule(self) -> None:
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.debounce, self.update)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def update(self) -> None:
+        try:
+            occluded = occluded_monitors(self.query("monitors"), self.query("clients"))
+        except Exception as e:
+            print(f"Could not check window occlusion: {e}")
+            return
+        changed = occluded ^ self.occluded
+        self.occluded = occluded
+        for monitor in sorted(changed):
+            self.on_change(monitor, monitor not in occluded)
+
+@dataclass
+class PowerStats:
+    """CPU use of one renderer split by whether it was paused"""
+    visible_cpu: float = 0.0
+    visible_wall: float = 0.0
+    paused_cpu: float = 0.0
+    paused_wall: float = 0.0
+    since_cpu: float = 0.0
+    since_wall: float = 0.0
+    paused: bool = False
+
+    def close_period(self, cpu: float, wall: float) -> None:
+        cpu_used, wall_used = max(0.0, cpu - self.since_cpu), wall - self.since_wall
+        if self.paused:
+            self.paused_cpu += cpu_used
+            self.paused_wall += wall_used
+        else:
+            self.visible_cpu += cpu_used
+            self.visible_wall += wall_used
+        self.since_cpu, self.since_wall = cpu, wall
+
+    def saved_seconds(self) -> float:
+        """CPU the renderer would have used while paused, at its visible rate, minus what it did use"""
+        if self.visible_wall <= 0:
+            return 0.0
+        return max(0.0, self.visible_cpu / self.visible_wall * self.paused_wall - self.paused_cpu)
+
+class PowerAccountant:
+    """Estimates the CPU seconds saved by pausing hidden renderers"""
+    def __init__(self, cpu_seconds: Callable[[int], float]):
+        self.cpu_seconds = cpu_seconds
+        self.stats: Dict[str, PowerStats] = {}
+        # Savings of renderers that have since been stopped or replaced
+        self.retired_seconds = 0.0
+
+    def started(self, monitor: str, pgid: int) -> None:
+        self.stopped(monitor)
+        self.stats[monitor] = PowerStats(since_cpu=self.cpu_seconds(pgid), since_wall=time.monotonic())
+
+    def stopped(self, monitor: str) -> None:
+        stats = self.stats.pop(monitor, None)
+        if stats:
+            self.retired_seconds += stats.saved_seconds()
+
+    def set_paused(self, monitor: str, pgid: int, paused: bool) -> None:
+        stats = self.stats.get(monitor)
+        if not stats or stats.paused == paused:
+            return
+        stats.close_period(self.cpu_seconds(pgid), time.monotonic())
+        stats.paused = paused
+
+    def saved_seconds(self, pgids: Dict[str, int]) -> float:
+        """Total savings so far; `pgids` maps monitors to their renderer's process group"""
+        total = self.retired_seconds
+        now = time.monotonic()
+        for monitor, stats in self.stats.items():
+            if monitor in pgids:
+                stats.close_period(self.cpu_seconds(pgids[monitor]), now)
+            total += stats.saved_seconds()
+        return total
@@ -0,0 +1,204 @@
+import os
+import time
+import select
+import signal
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+# Programs HyprWpE.sh and the launcher start; their argv names the monitor they draw on
+RENDERER_PROGRAMS = ("mpvpaper", "web_viewer.py", "scene_viewer.py")
+
+def wait_for_exit(process: subprocess.Popen, timeout: float) -> bool:
+    """Block until `process` exits or `timeout` passes; True if it exited and was reaped.
+
+    Uses a pidfd where the kernel supports it, so the wait wakes up on the
+    actual exit instead of polling waitpid in a sleep loop.
+    """
+    if process.poll() is not None:
+        return True
+    pidfd = None
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pidfd = None
+    if pidfd is None:
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    try:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        if not poller.poll(timeout * 1000):
+            return False
+    finally:
+        os.close(pidfd)
+    # The pidfd only says the child exited; waitpid still has to reap it
+    process.wait()
+    return True
+
+def group_cpu_seconds(pgid: int) -> float:
+    """User + system CPU time of every live process in a process group"""
+    ticks = 0
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm may contain spaces and parentheses, so split after the last ')'
+        fields = stat[stat.rfind(b')') + 2:].split()
+        if int(fields[2]) == pgid:
+            ticks += int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+def find_renderers(monitors: Iterable[str]) -> Dict[int, str]:
+    """Running renderer processes drawing on any of `monitors`, as {pid: monitor}"""
+    monitors = set(monitors)
+    found = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit() or int(entry) == os.getpid():
+            continue
+        try:
+            with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                argv = f.read().decode('utf-8', 'replace').split('\0')
+        except OSError:
+            continue
+        if not any(os.path.basename(arg) in RENDERER_PROGRAMS for arg in argv[:2]):
+            continue
+        for arg in argv[1:]:
+            if arg in monitors:
+                found[int(entry)] = arg
+                break
+    return found
+
+class ProcessRegistry:
+    """Renderer processes keyed by monitor.
+
+    Every process is expected to lead its own session (start_new_session=True)
+    so stopping a monitor signals the whole process group, e.g. mpvpaper and
+    the mpv it spawns.
+    """
+    def __init__(self, stop_timeout: float = 2.0):
+        self.stop_timeout = stop_timeout
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self.lock = threading.RLock()
+
+    def add(self, monitor: str, process: subprocess.Popen) -> None:
+        """Track `process` for `monitor`, stopping whatever ran there before"""
+        with self.lock:
+            self.stop(monitor)
+            self.processes[monitor] = process
+
+    def get(self, monitor: str) -> Optional[subprocess.Popen]:
+        return self.processes.get(monitor)
+
+    def monitors(self) -> List[str]:
+        return list(self.processes)
+
+    def is_running(self, monitor: str) -> bool:
+        process = self.processes.get(monitor)
+        return process is not None and process.poll() is None
+
+    def stop(self, monitor: str) -> bool:
+        """Stop the renderer on `monitor`; returns False if nothing was running"""
+        with self.lock:
+            process = self.processes.pop(monitor, None)
+        if process is None or process.poll() is not None:
+            return False
+        print(f"[{monitor}] Stopping renderer (pid {process.pid})")
+        self._signal_group(process, signal.SIGTERM)
+        if not wait_for_exit(process, self.stop_timeout):
+            print(f"[{monitor}] Renderer ignored SIGTERM, killing it")
+            self._signal_group(process, signal.SIGKILL)
+            process.wait()
+        return True
+
+    def stop_many(self, monitors: List[str]) -> List[str]:
+        """Stop several monitors at once so their shutdown timeouts overlap"""
+        monitors = list(monitors)
+        if len(monitors) < 2:
+            return [monitor for monitor in monitors if self.stop(monitor)]
+        with ThreadPoolExecutor(max_workers=len(monitors)) as pool:
+            results = list(pool.map(self.stop, monitors))
+        return [monitor for monitor, stopped in zip(monitors, results) if stopped]
+
+    def stop_all(self) -> List[str]:
+        return self.stop_many(self.monitors())
+
+    def stop_untracked(self, monitors: Iterable[str]) -> List[str]:
+        """Stop renderers on `monitors` that this registry did not start.
+
+        They come from HyprWpE.sh, an earlier GUI session or a daemon that
+        died; nothing else would stop them, and they would keep drawing
+        under (or over) the new wallpaper.
+        """
+        with self.lock:
+            tracked = {process.pid for process in self.processes.values()}
+        pids = {pid: monitor for pid, monitor in find_renderers(monitors).items() if pid not in tracked}
+        for pid, monitor in pids.items():
+            print(f"[{monitor}] Stopping untracked renderer (pid {pid})")
+            self._signal_pid(pid, signal.SIGTERM)
+        alive = self._wait_pids(set(pids), self.stop_timeout)
+        for pid in alive:
+            print(f"[{pids[pid]}] Untracked renderer ignored SIGTERM, killing it")
+            self._signal_pid(pid, signal.SIGKILL)
+        self._wait_pids(alive, self.stop_timeout)
+        return sorted(set(pids.values()))
+
+    def reap(self) -> Dict[str, int]:
+        """Collect renderers that exited on their own; returns {monitor: returncode}"""
+        exited = {}
+        with self.lock:
+            for monitor, process in list(self.processes.items()):
+                returncode = process.poll()
+                if returncode is not None:
+                    del self.processes[monitor]
+                    exited[monitor] = returncode
+        return exited
+
+    @staticmethod
+    def _signal_pid(pid: int, sig: int) -> bool:
+        """Send `sig` to one process; False if it no longer exists"""
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return False # Someone else's process that happens to match
+        return True
+
+    @classmethod
+    def _wait_pids(cls, pids: set, timeout: float) -> set:
+        """Poll until every pid exited or `timeout` passes; returns the ones still running.
+
+        These are not our children, so there is nothing to waitpid on.
+        """
+        deadline = time.monotonic() + timeout
+        while pids and time.monotonic() < deadline:
+            time.sleep(0.02)
+            pids = {pid for pid in pids if cls._pid_running(pid)}
+        return pids
+
+    @staticmethod
+    def _pid_running(pid: int) -> bool:
+        """True until `pid` exits; a zombie waiting for its (not our) parent counts as exited"""
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+        except OSError:
+            return False
+        return stat[stat.rfind(b')') + 2:stat.rfind(b')') + 3] not in (b'Z', b'X')
+
+    @staticmethod
+    def _signal_group(process: subprocess.Popen, sig: int) -> None:
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            pass
@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import glob
+import subprocess
+from typing import List, Optional, Tuple
+from config.constants import SCRIPTS_DIR, UNPACK_DIR, LAYER_SHELL_PRELOAD, RUNTIME_DIR, MEDIA_CACHE_DIR, TEXTURE_CACHE_DIR
+from config.media_cache import MediaCache
+from config.renderer_control import CONTROL_SOCKET_ENV
+from config.renderer_ready import READY_FD_ENV
+from config.scene_textures import TEXTURE_CACHE_ENV
+from config.unpacker import unpack_pkg
+
+def build_mpv_options(properties: dict) -> List[str]:
+    """Translate per-wallpaper properties into mpv options"""
+    audio = properties.get('audio', False)
+    speed = properties.get('speed', 1.0)
+    scale = properties.get('scale', 'Cover').lower()
+    mpv_opts = [f"--speed={speed}"]
+    if not audio: mpv_opts.append("--no-audio")
+    if scale == 'cover': mpv_opts.append("--panscan=1.0")
+    elif scale == 'fill': mpv_opts.append("--no-keepaspect")
+    return mpv_opts
+
+def mpv_socket_path(monitor: str) -> str:
+    """IPC socket mpvpaper's player listens on for a given monitor"""
+    return os.path.join(RUNTIME_DIR, f"HyprWpE-mpv-{monitor}.sock")
+
+def create_media_cache(enabled: bool, resolution: Optional[Tuple[int, int]]) -> Optional[MediaCache]:
+    """MediaCache sized for the largest monitor (`media_cache` in wallpapers.yaml)"""
+    if not enabled or not resolution:
+        return None
+    return MediaCache(MEDIA_CACHE_DIR, *resolution)
+
+def control_socket_path(monitor: str) -> str:
+    """Control socket the web and scene viewers listen on for a given monitor"""
+    return os.path.join(RUNTIME_DIR, f"HyprWpE-ctl-{monitor}.sock")
+
+class RendererLauncher:
+    """Starts the renderer for a wallpaper directly, mirroring HyprWpE.sh's set_wallpaper"""
+    def __init__(self, wallpaper_dir: str, media_cache: Optional[MediaCache] = None,
+                 transcode_videos: bool = False):
+        self.wallpaper_dir = wallpaper_dir
+        self.media_cache = media_cache
+        # Only the daemon lives long enough to finish a transcode; a GUI fallback or the
+        # restore CLI exiting would kill ffmpeg halfway through
+        self.transcode_videos = transcode_videos
+
+    def media_path(self, wp_type: str, path: str) -> str:
+        """Swap a video for its downscaled copy, queueing a transcode if there is none yet"""
+        if wp_type != "video" or not self.media_cache:
+            return path
+        cached = self.media_cache.lookup(path)
+        if cached == path and self.transcode_videos:
+            self.media_cache.transcode_video_async(path)
+        return cached
+
+    def resolve(self, wallpaper_id: str) -> Tuple[str, str]:
+        """Return (type, path to hand to the renderer), unpacking .pkg archives if needed"""
+        wallpaper_path = os.path.join(self.wallpaper_dir, str(wallpaper_id))
+        project_json_path = os.path.join(wallpaper_path, "project.json")
+        if not os.path.isfile(project_json_path):
+            raise FileNotFoundError(f"project.json not found in {wallpaper_path}")
+        with open(project_json_path, 'r', encoding='utf-8') as f:
+            project = json.load(f)
+        wp_type = project.get('type', 'unknown').lower()
+        file_name = project.get('file', '')
+
+        if wp_type == "scene":
+            return wp_type, wallpaper_path
+
+        content_root = wallpaper_path
+        if not os.path.isfile(os.path.join(wallpaper_path, file_name)):
+            pkg_files = glob.glob(os.path.join(wallpaper_path, "**", "*.pkg"), recursive=True)
+            if not pkg_files:
+                raise FileNotFoundError(f".pkg not found in {wallpaper_path}")
+            content_root = os.path.join(UNPACK_DIR, str(wallpaper_id))
+            if unpack_pkg(pkg_files[0], content_root) is None:
+                raise RuntimeError(f"Unpack failed for {pkg_files[0]}")
+        return wp_type, os.path.join(content_root, file_name)
+
+    def build_command(self, wp_type: str, path: str, monitor: str, properties: dict) -> Tuple[List[str], dict]:
+        env = os.environ.copy()
+        path = self.media_path(wp_type, path)
+        if self.media_cache:
+            # The scene viewer downscales its textures into the same cache
+            env.update(self.media_cache.env())
+        if wp_type == "video":
+            # The IPC socket lets the daemon swap files and properties without a relaunch
+            base_opts = ["--loop-file=inf", f"--input-ipc-server={mpv_socket_path(monitor)}"]
+            mpv_opts = " ".join(base_opts + build_mpv_options(properties))
+            return ["mpvpaper", "-o", mpv_opts, monitor, path], env
+        env['LD_PRELOAD'] = LAYER_SHELL_PRELOAD
+        env[CONTROL_SOCKET_ENV] = control_socket_path(monitor)
+        if wp_type == "web":
+            return [sys.executable, os.path.join(SCRIPTS_DIR, "web_viewer.py"), path, monitor], env
+        if wp_type == "scene":
+            env[TEXTURE_CACHE_ENV] = TEXTURE_CACHE_DIR
+            return [sys.executable, os.path.join(SCRIPTS_DIR, "scene_viewer.py"), path, monitor], env
+        raise ValueError(f"Unsupported wallpaper type: {wp_type}")
+
+    def launch(self, wp_type: str, path: str, monitor: str, properties: dict,
+               ready_fd: Optional[int] = None) -> subprocess.Popen:
+        """Start the renderer for a resolved wallpaper on `monitor`.
+
+        `ready_fd` is the write end of a pipe the web and scene viewers
+        signal once their first frame is up (see config/renderer_ready.py).
+        """
+        command, env = self.build_command(wp_type, path, monitor, properties)
+        pass_fds = ()
+        if ready_fd is not None and wp_type != "video":
+            env[READY_FD_ENV] = str(ready_fd)
+            pass_fds = (ready_fd,)
+        print(f"[{monitor}] Launching {wp_type} renderer: {' '.join(command)}")
+        # Own session so the whole renderer tree can be signalled at once
+        return subprocess.Popen(command, env=env, start_new_session=True, pass_fds=pass_fds)
@@ -0,0 +1,240 @@
+import os
+import sys
+import time
+import select
+import argparse
+import subprocess
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import yaml
+
+from config.constants import YAML_FILE, FIRST_FRAME_TIMEOUT
+from config.config_manager import ConfigManager
+from managers.daemon_client import DaemonClient, DaemonError
+from managers.mpv_ipc import MpvIpcClient, MpvIpcError
+from managers.process_registry import ProcessRegistry
+from managers.renderer_launcher import RendererLauncher, mpv_socket_path
+
+PHASES = ("config parse", "monitor detect", "stop", "spawn", "first frame")
+
+@dataclass
+class MonitorTiming:
+    monitor: str
+    wallpaper_id: str
+    wallpaper_type: str = ""
+    spawn_s: float = 0.0
+    # Seconds from launch until the renderer reported its first frame; None if it never did
+    first_frame_s: Optional[float] = None
+    error: Optional[str] = None
+    process: Optional[subprocess.Popen] = field(default=None, repr=False, compare=False)
+
+@dataclass
+class RestoreReport:
+    phases: Dict[str, float] = field(default_factory=dict)
+    monitors: List[MonitorTiming] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        monitors = []
+        for timing in self.monitors:
+            entry = asdict(timing)
+            del entry['process']
+            monitors.append(entry)
+        return {'phases': self.phases, 'monitors': monitors}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RestoreReport':
+        return cls(dict(data.get('phases', {})), [MonitorTiming(**m) for m in data.get('monitors', [])])
+
+    def summary(self) -> str:
+        parts = []
+        for timing in self.monitors:
+            if timing.error:
+                parts.append(f"{timing.monitor}: failed ({timing.error})")
+            elif timing.first_frame_s is None:
+                parts.append(f"{timing.monitor}: no first frame")
+            else:
+                parts.append(f"{timing.monitor}: {timing.first_frame_s * 1000:.0f} ms")
+        return f"Restored {len(self.monitors)} monitor(s) in {sum(self.phases.values()) * 1000:.0f} ms ({', '.join(parts)})"
+
+    def format(self) -> str:
+        lines = ["Phase             Time"]
+        for phase in PHASES:
+            if phase in self.phases:
+                lines.append(f"{phase:<16} {self.phases[phase] * 1000:7.1f} ms")
+        lines.append(f"{'total':<16} {sum(self.phases.values()) * 1000:7.1f} ms")
+        lines.append("")
+        lines.append("Monitor      ID            Type    Spawn    First frame")
+        for t in self.monitors:
+            first_frame = t.error or ("-" if t.first_frame_s is None else f"{t.first_frame_s * 1000:.1f} ms")
+            lines.append(f"{t.monitor:<12} {t.wallpaper_id:<13} {t.wallpaper_type or '?':<7} "
+                         f"{t.spawn_s * 1000:6.1f} ms  {first_frame}")
+        return "\n".join(lines)
+
+def wait_for_ready_pipe(read_fd: int, timeout: float) -> bool:
+    """Wait for a viewer to write to its ready pipe; False on timeout or if it exits first"""
+    try:
+        poller = select.poll()
+        poller.register(read_fd, select.POLLIN | select.POLLHUP)
+        if not poller.poll(max(timeout, 0) * 1000):
+            return False
+        return os.read(read_fd, 1) == b"1"
+    finally:
+        os.close(read_fd)
+
+def wait_for_mpv_frame(monitor: str, process: subprocess.Popen, timeout: float) -> bool:
+    """Poll mpvpaper's IPC socket until mpv has configured its video output"""
+    client = MpvIpcClient(mpv_socket_path(monitor), timeout=0.5)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and process.poll() is None:
+        try:
+            if client.command('get_property', 'vo-configured'):
+                return True
+        except MpvIpcError:
+            pass  # Socket not created yet, or no video output so far
+        time.sleep(0.01)
+    return False
+
+class RestorePipeline:
+    """Restores a monitor -> wallpaper layout with every monitor handled in parallel.
+
+    All renderers are stopped together, started back to back, then awaited
+    together, so a multi-monitor restore costs roughly as much as its
+    slowest monitor instead of the sum of all of them.
+    """
+    def __init__(self, launcher: RendererLauncher, processes: ProcessRegistry,
+                 first_frame_timeout: float = FIRST_FRAME_TIMEOUT):
+        self.launcher = launcher
+        self.processes = processes
+        self.first_frame_timeout = first_frame_timeout
+
+    def restore(self, wallpapers: Dict[str, str], properties: dict,
+                report: Optional[RestoreReport] = None) -> RestoreReport:
+        report = report or RestoreReport()
+        timings = [MonitorTiming(monitor, str(wid)) for monitor, wid in wallpapers.items()]
+        report.monitors.extend(timings)
+
+        start = time.perf_counter()
+        self.processes.stop_many(set(self.processes.monitors()) | set(wallpapers))
+        # A fresh registry (e.g. the restore CLI) tracks nothing; renderers from HyprWpE.sh,
+        # an earlier GUI session or a dead daemon are found by their command line instead
+        self.processes.stop_untracked(wallpapers)
+        report.phases['stop'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        waiters = self._spawn(timings, properties)
+        report.phases['spawn'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if waiters:
+            with ThreadPoolExecutor(max_workers=len(waiters)) as pool:
+                list(pool.map(lambda waiter: waiter(), waiters))
+        report.phases['first frame'] = time.perf_counter() - start
+        return report
+
+    def _spawn(self, timings: List[MonitorTiming], properties: dict) -> list:
+        # Resolving can mean unpacking a .pkg, so do each distinct wallpaper once and in parallel
+        ids = sorted({timing.wallpaper_id for timing in timings})
+        with ThreadPoolExecutor(max_workers=max(1, len(ids))) as pool:
+            resolved = dict(zip(ids, pool.map(self._resolve, ids)))
+
+        waiters = []
+        for timing in timings:
+            result = resolved[timing.wallpaper_id]
+            if isinstance(result, Exception):
+                timing.error = str(result)
+                continue
+            wp_type, path = result
+            timing.wallpaper_type = wp_type
+            launched_at = time.perf_counter()
+            try:
+                timing.process, waiter = self._launch(timing.monitor, wp_type, path,
+                                                      properties.get(timing.wallpaper_id, {}))
+            except OSError as e:
+                timing.error = str(e)
+                continue
+            timing.spawn_s = time.perf_counter() - launched_at
+            self.processes.add(timing.monitor, timing.process)
+            waiters.append(self._first_frame_waiter(timing, waiter, launched_at))
+        return waiters
+
+    def _resolve(self, wallpaper_id: str):
+        try:
+            return self.launcher.resolve(wallpaper_id)
+        except Exception as e:
+            return e
+
+    def _launch(self, monitor: str, wp_type: str, path: str, properties: dict):
+        if wp_type == "video":
+            socket_path = mpv_socket_path(monitor)
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)  # A stale socket would look ready before mpv is
+            process = self.launcher.launch(wp_type, path, monitor, properties)
+            return process, lambda timeout: wait_for_mpv_frame(monitor, process, timeout)
+        read_fd, write_fd = os.pipe()
+        try:
+            process = self.launcher.launch(wp_type, path, monitor, properties, ready_fd=write_fd)
+        except OSError:
+            os.close(read_fd)
+            raise
+        finally:
+            os.close(write_fd)
+        return process, lambda timeout: wait_for_ready_pipe(read_fd, timeout)
+
+    def _first_frame_waiter(self, timing: MonitorTiming, waiter, launched_at: float):
+        def wait():
+            remaining = self.first_frame_timeout - (time.perf_counter() - launched_at)
+            if waiter(remaining):
+                timing.first_frame_s = time.perf_counter() - launched_at
+        return wait
+
+def load_setup(config_path: str) -> Dict[str, str]:
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    return {str(monitor): str(wid) for monitor, wid in (config.get('wallpapers') or {}).items()}
+
+if __name__ == "__main__":
+    from managers.monitor_topology import MonitorTopology
+    from managers.renderer_launcher import create_media_cache
+
+    parser = argparse.ArgumentParser(description="Restore a saved HyprWpE monitor layout.")
+    parser.add_argument('--config', default=YAML_FILE, help='Saved setup to restore.')
+    parser.add_argument('--measure', action='store_true', help='Print a timing breakdown of the restore.')
+    parser.add_argument('--timeout', type=float, default=FIRST_FRAME_TIMEOUT,
+                        help='Seconds to wait for each monitor\'s first frame.')
+    args = parser.parse_args()
+
+    report = RestoreReport()
+    start = time.perf_counter()
+    try:
+        wallpapers = load_setup(args.config)
+    except (OSError, yaml.YAMLError) as e:
+        print(f"Could not read {args.config}: {e}", file=sys.stderr)
+        sys.exit(1)
+    config_manager = ConfigManager()
+    properties = config_manager.load_properties()
+    report.phases['config parse'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    topology = MonitorTopology()
+    monitors = topology.refresh()
+    report.phases['monitor detect'] = time.perf_counter() - start
+    wallpapers = {monitor: wid for monitor, wid in wallpapers.items() if monitor in monitors}
+
+    client = DaemonClient()
+    if client.is_running():
+        try:
+            remote = client.restore(wallpapers, monitors, args.timeout)
+            report.phases.update(remote.phases)
+            report.monitors = remote.monitors
+        except DaemonError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        config = config_manager.load_config()
+        media_cache = create_media_cache(config.get('media_cache', False), topology.largest_resolution())
+        launcher = RendererLauncher(config['wallpaper_dir'], media_cache)
+        pipeline = RestorePipeline(launcher, ProcessRegistry(), args.timeout)
+        pipeline.restore(wallpapers, properties, report)
+
+    print(report.format() if args.measure else report.summary())
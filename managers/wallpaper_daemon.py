@@ -0,0 +1,414 @@
+import os
+import sys
+import json
+import signal
+import argparse
+import time
+import threading
+import socketserver
+from dataclasses import dataclass
+from typing import Dict, Optional
+import subprocess
+
+from config.constants import DAEMON_SOCKET, FIRST_FRAME_TIMEOUT, FPS_RETRY_MAX_S
+from config.config_manager import ConfigManager
+from config.renderer_control import RendererControlClient, RendererControlError
+from managers.monitor_topology import MonitorTopology
+from managers.fps_governor import FpsGovernor
+from managers.occlusion import OcclusionWatcher, PowerAccountant
+from managers.daemon_client import DaemonClient
+from managers.renderer_launcher import RendererLauncher, control_socket_path, create_media_cache, mpv_socket_path
+from managers.mpv_ipc import MpvIpcClient, MpvIpcError
+from managers.process_registry import ProcessRegistry, group_cpu_seconds
+from managers.restore import RestorePipeline
+
+ALL_MONITORS = "All Monitors"
+
+@dataclass
+class Renderer:
+    wallpaper_id: str
+    wallpaper_type: str
+    process: subprocess.Popen
+    ipc: Optional[MpvIpcClient] = None
+    control: Optional[RendererControlClient] = None
+    paused: bool = False
+    fps: Optional[int] = None
+    fps_synced: bool = False
+    # Failed set_fps attempts in a row, and when sync_fps may try again
+    fps_failures: int = 0
+    fps_retry_at: float = 0.0
+
+    def sockets(self) -> list:
+        return [client.socket_path for client in (self.ipc, self.control) if client]
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """One JSON object per line in, one JSON object per line out"""
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.wallpaper_daemon.handle(json.loads(line))
+            except Exception as e:
+                response = {'ok': False, 'error': str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode('utf-8'))
+            self.wfile.flush()
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def service_actions(self):
+        # Runs on every serve_forever poll, so crashed renderers never linger as zombies
+        # and renderers that were not ready for a pause yet get it on a later poll
+        self.wallpaper_daemon.reap()
+        self.wallpaper_daemon.sync_power()
+        self.wallpaper_daemon.sync_fps()
+
+class WallpaperDaemon:
+    """Long-running process that owns one renderer per monitor.
+
+    Clients (the GUI, HyprWpE.sh, daemon_client) talk to it over a Unix
+    socket with the commands apply, stop, status and reload-properties.
+    """
+    def __init__(self, socket_path: str = DAEMON_SOCKET):
+        self.socket_path = socket_path
+        self.config_manager = ConfigManager()
+        self.config_manager.ensure_config_dir()
+        self.config = self.config_manager.load_config()
+        self.properties = self.config_manager.load_properties()
+        self.properties_version = self.config_manager.properties_version()
+        self.launcher = RendererLauncher(self.config['wallpaper_dir'], transcode_videos=True)
+        self.topology = MonitorTopology()
+        self.monitors = self.topology.refresh()
+        self.update_media_cache()
+        self.renderers: Dict[str, Renderer] = {}
+        # Wallpapers of monitors that were unplugged, restored when they come back
+        self.detached: Dict[str, str] = {}
+        self.processes = ProcessRegistry()
+        self.pause_when_hidden = self.config.get('pause_when_hidden', True)
+        self.occlusion = OcclusionWatcher(self.on_visibility_changed)
+        self.power = PowerAccountant(group_cpu_seconds)
+        self.governor = FpsGovernor(self.properties.get('fps_policy'))
+        self.lock = threading.RLock()
+        self.server = None
+        self.commands = {
+            'apply': self.cmd_apply,
+            'restore': self.cmd_restore,
+            'stop': self.cmd_stop,
+            'status': self.cmd_status,
+            'reload-properties': self.cmd_reload_properties,
+        }
+
+    def handle(self, request: dict) -> dict:
+        command = self.commands.get(request.get('cmd'))
+        if not command:
+            return {'ok': False, 'error': f"Unknown command: {request.get('cmd')}"}
+        with self.lock:
+            return command(request)
+
+    def _targets(self, monitor: Optional[str]) -> list:
+        if not monitor or monitor == ALL_MONITORS:
+            return list(self.monitors)
+        return [monitor]
+
+    def _properties_for(self, wallpaper_id: str) -> dict:
+        return self.properties.get(str(wallpaper_id), {})
+
+    def _refresh_properties(self) -> None:
+        """Re-read properties.yaml if it changed since it was last loaded.
+
+        The GUI saves it on every edit and nothing else tells the daemon, so
+        anything that launches a renderer calls this first, and sync_fps
+        calls it on every poll (a stat) for max_fps and fps_policy edits.
+        """
+        version = self.config_manager.properties_version()
+        if version == self.properties_version:
+            return
+        old_policy = self.properties.get('fps_policy')
+        self.properties = self.config_manager.load_properties()
+        self.properties_version = self.config_manager.properties_version()
+        if self.properties.get('fps_policy') != old_policy:
+            self.governor = FpsGovernor(self.properties.get('fps_policy'))
+
+    def cmd_apply(self, request: dict) -> dict:
+        self._refresh_properties()
+        wallpaper_id = str(request['id'])
+        properties = request.get('properties') or self._properties_for(wallpaper_id)
+        wp_type, path = self.launcher.resolve(wallpaper_id)
+        targets = self._targets(request.get('monitor'))
+        swapped = [monitor for monitor in targets
+                   if wp_type == "video" and self._hot_swap(monitor, wallpaper_id, path, properties)]
+        relaunch = [monitor for monitor in targets if monitor not in swapped]
+        self._stop_monitors(relaunch)
+        for monitor in relaunch:
+            process = self.launcher.launch(wp_type, path, monitor, properties)
+            self._track(monitor, wallpaper_id, wp_type, process)
+        return {'ok': True, 'monitors': targets, 'hot_swapped': swapped}
+
+    def cmd_restore(self, request: dict) -> dict:
+        """Replace the whole layout, launching every monitor in parallel"""
+        self._refresh_properties()
+        if request.get('monitors'):
+            self.monitors = list(request['monitors'])
+        wallpapers = {monitor: str(wid) for monitor, wid in request.get('wallpapers', {}).items()}
+        for monitor in wallpapers:
+            self.detached.pop(monitor, None)
+        self._stop_monitors(list(self.renderers))
+        pipeline = RestorePipeline(self.launcher, self.processes,
+                                   request.get('timeout') or FIRST_FRAME_TIMEOUT)
+        report = pipeline.restore(wallpapers, self.properties)
+        for timing in report.monitors:
+            if timing.process:
+                self._track(timing.monitor, timing.wallpaper_id, timing.wallpaper_type, timing.process)
+        print(report.summary())
+        return {'ok': True, 'report': report.to_dict()}
+
+    def _track(self, monitor: str, wallpaper_id: str, wp_type: str, process: subprocess.Popen) -> None:
+        self.processes.add(monitor, process)
+        if wp_type == "video":
+            renderer = Renderer(wallpaper_id, wp_type, process, ipc=MpvIpcClient(mpv_socket_path(monitor)))
+        else:
+            renderer = Renderer(wallpaper_id, wp_type, process,
+                                control=RendererControlClient(control_socket_path(monitor)))
+        self.renderers[monitor] = renderer
+        self.power.started(monitor, process.pid)
+        self.sync_power()
+        self.sync_fps()
+
+    def _hot_swap(self, monitor: str, wallpaper_id: str, path: str, properties: dict) -> bool:
+        """Load a video into the monitor's running mpv instead of restarting mpvpaper.
+
+        Re-applying the video that is already playing only pushes its
+        properties, so changing speed, audio or scale does not restart it.
+        """
+        renderer = self.renderers.get(monitor)
+        if not renderer or not renderer.ipc or renderer.process.poll() is not None:
+            return False
+        same_video = renderer.wallpaper_id == wallpaper_id
+        try:
+            if not same_video:
+                renderer.ipc.loadfile(self.launcher.media_path("video", path))
+            renderer.ipc.apply_properties(properties)
+        except MpvIpcError as e:
+            print(f"[{monitor}] Hot swap failed, relaunching: {e}")
+            return False
+        if same_video:
+            print(f"[{monitor}] Updated properties of {wallpaper_id}")
+            return True
+        print(f"[{monitor}] Hot-swapped video to {wallpaper_id}")
+        renderer.wallpaper_id = wallpaper_id
+        renderer.fps_synced = False  # The new file may have a different frame rate
+        return True
+
+    def cmd_stop(self, request: dict) -> dict:
+        monitor = request.get('monitor')
+        targets = list(self.renderers) if not monitor or monitor == ALL_MONITORS else [monitor]
+        return {'ok': True, 'monitors': self._stop_monitors(targets)}
+
+    def cmd_status(self, request: dict) -> dict:
+        status = {}
+        for monitor, renderer in self.renderers.items():
+            status[monitor] = {
+                'id': renderer.wallpaper_id,
+                'type': renderer.wallpaper_type,
+                'pid': renderer.process.pid,
+                'running': renderer.process.poll() is None,
+                'paused': renderer.paused,
+                'fps': renderer.fps,
+            }
+            if renderer.wallpaper_type == "scene" and renderer.process.poll() is None:
+                try:
+                    stats = renderer.control.command('stats')
+                    status[monitor]['frames_rendered'] = stats['frames_rendered']
+                    status[monitor]['frames_skipped'] = stats['frames_skipped']
+                except (RendererControlError, KeyError):
+                    pass
+        pgids = {monitor: renderer.process.pid for monitor, renderer in self.renderers.items()}
+        return {'ok': True, 'monitors': self.monitors, 'renderers': status,
+                'cpu_seconds_saved': round(self.power.saved_seconds(pgids), 2)}
+
+    def cmd_reload_properties(self, request: dict) -> dict:
+        """Re-read properties.yaml and update renderers whose properties changed.
+
+        Video renderers get the new values pushed over IPC and scene viewers
+        re-read the file themselves; everything else is relaunched.
+        """
+        old_properties = self.properties
+        self.properties = self.config_manager.load_properties()
+        self.properties_version = self.config_manager.properties_version()
+        self.governor = FpsGovernor(self.properties.get('fps_policy'))
+        for renderer in self.renderers.values():
+            renderer.fps_synced = False
+        margins_changed = old_properties.get('panel_margins') != self.properties.get('panel_margins')
+        reloaded = []
+        for monitor, renderer in list(self.renderers.items()):
+            wallpaper_id = renderer.wallpaper_id
+            # Scene viewers apply panel margins live; other renderers only pick them up on relaunch
+            margins_apply = margins_changed and renderer.wallpaper_type == "scene"
+            if old_properties.get(wallpaper_id) == self.properties.get(wallpaper_id) and not margins_apply:
+                continue
+            if not self._push_properties(monitor, renderer):
+                self.cmd_apply({'id': wallpaper_id, 'monitor': monitor})
+            reloaded.append(monitor)
+        return {'ok': True, 'monitors': reloaded}
+
+    def _push_properties(self, monitor: str, renderer: Renderer) -> bool:
+        if renderer.process.poll() is not None:
+            return False
+        try:
+            if renderer.ipc:
+                renderer.ipc.apply_properties(self._properties_for(renderer.wallpaper_id))
+            elif renderer.wallpaper_type == "scene":
+                renderer.control.command('reload_properties')
+            else:
+                return False
+        except (MpvIpcError, RendererControlError) as e:
+            print(f"[{monitor}] Could not update properties live: {e}")
+            return False
+        return True
+
+    def _stop_monitors(self, monitors: list) -> list:
+        if not monitors:
+            return [] # e.g. every target was hot-swapped; skip the /proc scan for untracked renderers
+        renderers = [self.renderers.pop(monitor, None) for monitor in monitors]
+        for monitor in monitors:
+            self.power.stopped(monitor)
+        stopped = self.processes.stop_many(monitors)
+        # Renderers from HyprWpE.sh or a previous daemon would otherwise keep drawing underneath
+        stopped += [monitor for monitor in self.processes.stop_untracked(monitors) if monitor not in stopped]
+        for renderer in renderers:
+            for socket_path in renderer.sockets() if renderer else []:
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+        return stopped
+
+    def reap(self) -> None:
+        with self.lock:
+            for monitor, returncode in self.processes.reap().items():
+                renderer = self.renderers.pop(monitor, None)
+                self.power.stopped(monitor)
+                kind = renderer.wallpaper_type if renderer else "unknown"
+                print(f"[{monitor}] {kind} renderer exited with code {returncode}")
+
+    def on_visibility_changed(self, monitor: str, visible: bool) -> None:
+        print(f"[{monitor}] Wallpaper {'visible' if visible else 'covered'}")
+        self.sync_power()
+
+    def sync_power(self) -> None:
+        """Pause renderers on covered monitors and resume the rest"""
+        with self.lock:
+            for monitor, renderer in self.renderers.items():
+                paused = self.pause_when_hidden and not self.occlusion.is_visible(monitor)
+                if renderer.paused != paused and renderer.process.poll() is None:
+                    self._set_paused(monitor, renderer, paused)
+
+    def _set_paused(self, monitor: str, renderer: Renderer, paused: bool) -> None:
+        try:
+            if renderer.ipc:
+                renderer.ipc.set_property('pause', paused)
+            else:
+                renderer.control.command('pause' if paused else 'resume')
+        except (MpvIpcError, RendererControlError):
+            return  # Not listening yet; sync_power retries on the next poll
+        renderer.paused = paused
+        self.power.set_paused(monitor, renderer.process.pid, paused)
+        print(f"[{monitor}] {'Paused' if paused else 'Resumed'} {renderer.wallpaper_type} renderer")
+
+    def sync_fps(self) -> None:
+        """Push the governor's frame-rate target to every renderer that is not at it yet"""
+        with self.lock:
+            self._refresh_properties() # A wallpaper's max_fps or the fps_policy may have been edited
+            now = time.monotonic()
+            for monitor, renderer in self.renderers.items():
+                if renderer.process.poll() is not None or now < renderer.fps_retry_at:
+                    continue
+                info = self.topology.get(monitor)
+                target = self.governor.target_fps(monitor, self._properties_for(renderer.wallpaper_id),
+                                                  info.refresh_rate if info else None)
+                if not renderer.fps_synced or renderer.fps != target:
+                    self._set_fps(monitor, renderer, target)
+
+    def _set_fps(self, monitor: str, renderer: Renderer, fps: Optional[int]) -> None:
+        try:
+            if renderer.ipc:
+                renderer.ipc.set_fps_cap(fps)
+            else:
+                renderer.control.command('set_fps', fps=fps or 0)
+        except (MpvIpcError, RendererControlError) as e:
+            # Usually the renderer is not listening yet; back off so one that never will
+            # (e.g. a viewer without a control socket) is not retried on every poll
+            if not renderer.fps_failures:
+                print(f"[{monitor}] Could not set the frame rate yet, retrying with backoff: {e}")
+            renderer.fps_failures += 1
+            renderer.fps_retry_at = time.monotonic() + min(FPS_RETRY_MAX_S, 0.25 * 2 ** renderer.fps_failures)
+            return
+        renderer.fps, renderer.fps_synced = fps, True
+        renderer.fps_failures, renderer.fps_retry_at = 0, 0.0
+        print(f"[{monitor}] Frame rate {'capped at ' + str(fps) if fps else 'uncapped'}")
+
+    def update_media_cache(self) -> None:
+        self.launcher.media_cache = create_media_cache(self.config.get('media_cache', False),
+                                                       self.topology.largest_resolution())
+
+    def on_monitor_added(self, monitor: str) -> None:
+        with self.lock:
+            self.monitors = self.topology.names()
+            self.update_media_cache()
+            wallpaper_id = self.detached.pop(monitor, None)
+            if wallpaper_id is None:
+                wallpaper_id = self.config_manager.load_config()['wallpapers'].get(monitor)
+            if wallpaper_id is None:
+                return
+            print(f"[{monitor}] Reconnected, re-applying wallpaper {wallpaper_id}")
+            try:
+                self.cmd_apply({'id': str(wallpaper_id), 'monitor': monitor})
+            except Exception as e:
+                print(f"[{monitor}] Could not re-apply wallpaper: {e}")
+
+    def on_monitor_removed(self, monitor: str) -> None:
+        with self.lock:
+            self.monitors = self.topology.names()
+            self.update_media_cache()
+            renderer = self.renderers.get(monitor)
+            if renderer:
+                self.detached[monitor] = renderer.wallpaper_id
+                self._stop_monitors([monitor])
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            # Only a stale socket may be removed; a live one belongs to another daemon
+            if DaemonClient(self.socket_path, timeout=1.0).is_running():
+                sys.exit(f"A wallpaper daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        self.server = DaemonServer(self.socket_path, DaemonRequestHandler)
+        self.server.wallpaper_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        print(f"Wallpaper daemon listening on {self.socket_path}")
+        self.topology.watch(self.on_monitor_added, self.on_monitor_removed)
+        if self.pause_when_hidden:
+            self.occlusion.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def shutdown(self, *args) -> None:
+        print("Shutting down wallpaper daemon...")
+        self.topology.stop()
+        self.occlusion.stop()
+        with self.lock:
+            self.cmd_stop({})
+        # serve_forever must be stopped from another thread
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HyprWpE wallpaper daemon.")
+    parser.add_argument('--socket', default=DAEMON_SOCKET, help='Unix socket to listen on.')
+    args = parser.parse_args()
+    daemon = WallpaperDaemon(args.socket)
+    signal.signal(signal.SIGINT, daemon.shutdown)
+    signal.signal(signal.SIGTERM, daemon.shutdown)
+    daemon.serve_forever()
+    sys.exit(0)
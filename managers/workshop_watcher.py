@@ -0,0 +1,119 @@
+import os
+from typing import Callable, Dict, Iterable, Set
+import gi
+from gi.repository import Gio, GLib
+from config.constants import WATCH_DEBOUNCE_MS, WATCH_SETUP_BATCH
+
+class WorkshopWatcher:
+    """Watches the workshop directory (via inotify) for added, removed or changed items.
+
+    The top-level directory monitor catches items being added or removed;
+    one monitor per item directory catches in-place updates. Events are
+    collected per wallpaper id and handed to `on_changes` in batches once
+    things have been quiet for `debounce_ms`.
+    """
+    def __init__(self, wallpaper_dir: str, on_changes: Callable[[Set[str]], None],
+                 debounce_ms: int = WATCH_DEBOUNCE_MS):
+        self.wallpaper_dir = wallpaper_dir
+        self.on_changes = on_changes
+        self.debounce_ms = debounce_ms
+        self.root_monitor = None
+        self.item_monitors: Dict[str, Gio.FileMonitor] = {}
+        self.pending_ids: Set[str] = set()
+        self.flush_source_id = 0
+        self.setup_queue = []
+        self.setup_source_id = 0
+
+    def start(self) -> None:
+        if self.root_monitor or not os.path.isdir(self.wallpaper_dir):
+            return
+        try:
+            root = Gio.File.new_for_path(self.wallpaper_dir)
+            self.root_monitor = root.monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            self.root_monitor.connect("changed", self._on_root_changed)
+            print(f"Watching {self.wallpaper_dir} for changes")
+        except GLib.Error as e:
+            print(f"Could not watch wallpaper directory: {e}")
+
+    def stop(self) -> None:
+        for source_id in (self.flush_source_id, self.setup_source_id):
+            if source_id:
+                GLib.source_remove(source_id)
+        self.flush_source_id = self.setup_source_id = 0
+        if self.root_monitor:
+            self.root_monitor.cancel()
+            self.root_monitor = None
+        for monitor in self.item_monitors.values():
+            monitor.cancel()
+        self.item_monitors.clear()
+        self.setup_queue.clear()
+        self.pending_ids.clear()
+
+    def watch_items(self, wallpaper_ids: Iterable[str]) -> None:
+        """Add per-item monitors a chunk at a time so large libraries do not stall the UI"""
+        self.setup_queue.extend(wallpaper_ids)
+        if self.root_monitor and not self.setup_source_id:
+            self.setup_source_id = GLib.idle_add(self._setup_item_monitors)
+
+    def _setup_item_monitors(self) -> bool:
+        batch = self.setup_queue[:WATCH_SETUP_BATCH]
+        del self.setup_queue[:WATCH_SETUP_BATCH]
+        for wallpaper_id in batch:
+            self._watch_item(wallpaper_id)
+        if self.setup_queue:
+            return True
+        self.setup_source_id = 0
+        return False
+
+    def _watch_item(self, wallpaper_id: str) -> None:
+        if wallpaper_id in self.item_monitors:
+            return
+        item_path = os.path.join(self.wallpaper_dir, wallpaper_id)
+        if not os.path.isdir(item_path):
+            return
+        try:
+            monitor = Gio.File.new_for_path(item_path).monitor_directory(Gio.FileMonitorFlags.NONE, None)
+        except GLib.Error as e:
+            print(f"Could not watch {item_path}: {e}")
+            return
+        monitor.connect("changed", self._on_item_changed, wallpaper_id)
+        self.item_monitors[wallpaper_id] = monitor
+
+    def _unwatch_item(self, wallpaper_id: str) -> None:
+        monitor = self.item_monitors.pop(wallpaper_id, None)
+        if monitor:
+            monitor.cancel()
+
+    def _on_root_changed(self, monitor, file, other_file, event_type) -> None:
+        if event_type in (Gio.FileMonitorEvent.CREATED, Gio.FileMonitorEvent.MOVED_IN):
+            self._watch_item(file.get_basename())
+        elif event_type in (Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_OUT):
+            self._unwatch_item(file.get_basename())
+        elif event_type == Gio.FileMonitorEvent.RENAMED:
+            self._unwatch_item(file.get_basename())
+            if other_file:
+                self._watch_item(other_file.get_basename())
+                self._queue(other_file.get_basename())
+        else:
+            return
+        self._queue(file.get_basename())
+
+    def _on_item_changed(self, monitor, file, other_file, event_type, wallpaper_id) -> None:
+        if event_type in (Gio.FileMonitorEvent.CHANGES_DONE_HINT, Gio.FileMonitorEvent.CREATED,
+                          Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_IN,
+                          Gio.FileMonitorEvent.MOVED_OUT, Gio.FileMonitorEvent.RENAMED):
+            self._queue(wallpaper_id)
+
+    def _queue(self, wallpaper_id: str) -> None:
+        self.pending_ids.add(wallpaper_id)
+        # Restart the quiet period on every event so a whole download lands in one batch
+        if self.flush_source_id:
+            GLib.source_remove(self.flush_source_id)
+        self.flush_source_id = GLib.timeout_add(self.debounce_ms, self._flush)
+
+    def _flush(self) -> bool:
+        self.flush_source_id = 0
+        wallpaper_ids, self.pending_ids = self.pending_ids, set()
+        if wallpaper_ids:
+            self.on_changes(wallpaper_ids)
+        return False
@@ -0,0 +1,190 @@
+import os
+import threading
+
+import pytest
+
+import managers.wallpaper_daemon as wallpaper_daemon
+from managers.fps_governor import FpsGovernor, PowerState, read_max_temperature, read_power_state
+from managers.mpv_ipc import MpvIpcError
+from managers.monitor_topology import MonitorInfo
+
+def write_supply(root, name, **attributes):
+    supply = root / name
+    supply.mkdir(parents=True)
+    for attribute, value in attributes.items():
+        (supply / attribute).write_text(f"{value}\n")
+
+def write_zone(root, index, millidegrees):
+    zone = root / f"thermal_zone{index}"
+    zone.mkdir(parents=True)
+    (zone / "temp").write_text(f"{millidegrees}\n")
+
+@pytest.fixture
+def sysfs(tmp_path):
+    (tmp_path / "power_supply").mkdir()
+    (tmp_path / "thermal").mkdir()
+    return tmp_path
+
+def governor(sysfs, policy=None, load=0.0, cpu_count=4):
+    return FpsGovernor(policy, str(sysfs / "power_supply"), lambda: (load * cpu_count, 0.0, 0.0), cpu_count,
+                       interval=0.0, thermal_root=str(sysfs / "thermal"))
+
+def on_ac(sysfs):
+    write_supply(sysfs / "power_supply", "AC", type="Mains", online=1)
+    write_supply(sysfs / "power_supply", "BAT0", type="Battery", status="Charging", capacity=80)
+
+def on_battery(sysfs, capacity=80):
+    write_supply(sysfs / "power_supply", "AC", type="Mains", online=0)
+    write_supply(sysfs / "power_supply", "BAT0", type="Battery", status="Discharging", capacity=capacity)
+
+# --- sysfs parsing ---
+
+def test_power_state_on_ac(sysfs):
+    on_ac(sysfs)
+    assert read_power_state(str(sysfs / "power_supply")) == PowerState(False, 80)
+
+def test_power_state_on_battery(sysfs):
+    on_battery(sysfs, capacity=42)
+    assert read_power_state(str(sysfs / "power_supply")) == PowerState(True, 42)
+
+def test_peripheral_batteries_are_ignored(sysfs):
+    write_supply(sysfs / "power_supply", "hidpp_battery_0", type="Battery", scope="Device",
+                 status="Discharging", capacity=5)
+    assert read_power_state(str(sysfs / "power_supply")) == PowerState(False, None)
+
+def test_usb_power_counts_as_external(sysfs):
+    write_supply(sysfs / "power_supply", "ucsi-source-psy-USBC000:001", type="USB", online=1)
+    write_supply(sysfs / "power_supply", "BAT0", type="Battery", status="Discharging", capacity=50)
+    assert not read_power_state(str(sysfs / "power_supply")).on_battery
+
+def test_missing_sysfs_means_desktop(tmp_path):
+    assert read_power_state(str(tmp_path / "missing")) == PowerState()
+    assert read_max_temperature(str(tmp_path / "missing")) is None
+
+def test_max_temperature_skips_unreadable_zones(sysfs):
+    write_zone(sysfs / "thermal", 0, 45000)
+    write_zone(sysfs / "thermal", 1, 91500)
+    write_zone(sysfs / "thermal", 2, -274000)
+    (sysfs / "thermal" / "thermal_zone3").mkdir()
+    (sysfs / "thermal" / "cooling_device0").mkdir()
+    assert read_max_temperature(str(sysfs / "thermal")) == 91.5
+
+# --- Policy ---
+
+def test_ac_is_uncapped_by_default(sysfs):
+    on_ac(sysfs)
+    assert governor(sysfs).target_fps("DP-1") is None
+
+def test_refresh_rate_still_applies_on_ac(sysfs):
+    on_ac(sysfs)
+    assert governor(sysfs).target_fps("DP-1", refresh_rate=59.95) == 60
+
+def test_battery_caps(sysfs):
+    on_battery(sysfs)
+    assert governor(sysfs).target_fps("eDP-1", refresh_rate=120) == 30
+
+def test_low_battery_caps_lower(sysfs):
+    on_battery(sysfs, capacity=15)
+    assert governor(sysfs).target_fps("eDP-1") == 15
+
+def test_high_load_caps(sysfs):
+    on_ac(sysfs)
+    assert governor(sysfs, load=0.5).target_fps("DP-1") is None
+    assert governor(sysfs, load=1.5).target_fps("DP-1") == 30
+
+def test_high_temperature_caps(sysfs):
+    on_ac(sysfs)
+    write_zone(sysfs / "thermal", 0, 70000)
+    assert governor(sysfs).target_fps("DP-1") is None
+    write_zone(sysfs / "thermal", 1, 90000)
+    assert governor(sysfs).target_fps("DP-1") == 30
+
+def test_policy_overrides_monitor_and_wallpaper_caps(sysfs):
+    on_ac(sysfs)
+    policy = {'ac': 144, 'monitors': {'HDMI-A-1': 50}}
+    gov = governor(sysfs, policy)
+    assert gov.target_fps("DP-1") == 144
+    assert gov.target_fps("HDMI-A-1") == 50
+    assert gov.target_fps("DP-1", {'max_fps': 24}) == 24
+    assert gov.target_fps("DP-1", {'max_fps': 0}) == 144
+
+def test_samples_are_reused_within_the_interval(sysfs):
+    on_ac(sysfs)
+    calls = []
+
+    def loadavg():
+        calls.append(1)
+        return (0.0, 0.0, 0.0)
+    gov = FpsGovernor(None, str(sysfs / "power_supply"), loadavg, 1, interval=60.0,
+                      thermal_root=str(sysfs / "thermal"))
+    gov.target_fps("DP-1")
+    gov.target_fps("DP-2")
+    assert len(calls) == 1
+
+# --- Daemon sync ---
+
+class RefusingIpc:
+    def __init__(self):
+        self.calls = 0
+
+    def set_fps_cap(self, fps):
+        self.calls += 1
+        raise MpvIpcError("connection refused")
+
+class RunningProcess:
+    pid = os.getpid()
+
+    def poll(self):
+        return None
+
+def make_daemon(sysfs, renderer):
+    daemon = wallpaper_daemon.WallpaperDaemon.__new__(wallpaper_daemon.WallpaperDaemon)
+    daemon.lock = threading.RLock()
+    daemon.renderers = {"DP-1": renderer}
+    daemon.properties = {}
+    daemon.topology = type("Topology", (), {'get': lambda self, name: MonitorInfo(name, refresh_rate=60.0)})()
+    daemon.governor = governor(sysfs)
+    daemon.config_manager = type("Config", (), {'properties_version': lambda self: None})()
+    daemon.properties_version = None
+    return daemon
+
+def test_sync_fps_backs_off_and_logs_once(sysfs, monkeypatch, capsys):
+    on_battery(sysfs)
+    clock = [1000.0]
+    monkeypatch.setattr(wallpaper_daemon.time, 'monotonic', lambda: clock[0])
+    ipc = RefusingIpc()
+    renderer = wallpaper_daemon.Renderer("123", "video", RunningProcess(), ipc=ipc)
+    daemon = make_daemon(sysfs, renderer)
+
+    for _ in range(10):
+        daemon.sync_fps()
+    assert ipc.calls == 1
+
+    retries = []
+    for _ in range(200):  # 100 s of 0.5 s polls
+        clock[0] += 0.5
+        before = ipc.calls
+        daemon.sync_fps()
+        if ipc.calls != before:
+            retries.append(clock[0])
+    gaps = [b - a for a, b in zip(retries, retries[1:])]
+    assert gaps == sorted(gaps) and max(gaps) <= wallpaper_daemon.FPS_RETRY_MAX_S + 0.5
+    assert len(retries) < 15
+    assert capsys.readouterr().out.count("Could not set the frame rate") == 1
+
+def test_sync_fps_resets_backoff_once_the_renderer_listens(sysfs, monkeypatch):
+    on_battery(sysfs)
+    clock = [1000.0]
+    monkeypatch.setattr(wallpaper_daemon.time, 'monotonic', lambda: clock[0])
+    ipc = RefusingIpc()
+    renderer = wallpaper_daemon.Renderer("123", "video", RunningProcess(), ipc=ipc)
+    daemon = make_daemon(sysfs, renderer)
+    daemon.sync_fps()
+    assert renderer.fps_failures == 1
+
+    applied = []
+    ipc.set_fps_cap = applied.append
+    clock[0] += wallpaper_daemon.FPS_RETRY_MAX_S
+    daemon.sync_fps()
+    assert applied == [30]
+    assert (renderer.fps, renderer.fps_synced, renderer.fps_failures) == (30, True, 0)
@@ -0,0 +1,176 @@
+import os
+import queue
+import socket
+import threading
+
+import pytest
+
+import managers.hyprland_events as hyprland_events
+from managers.monitor_topology import MonitorInfo, MonitorTopology
+
+class FakeHyprland:
+    """Hyprland's .socket2 event socket: each connection gets the lines queued for it"""
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.connections = queue.Queue()
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(socket_path)
+        self.server.listen()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections.put(conn)
+
+    def next_connection(self, timeout=2.0):
+        return self.connections.get(timeout=timeout)
+
+    def close(self):
+        self.server.close()
+
+class Layout:
+    """Stands in for hyprctl; tests change `names` to plug and unplug monitors"""
+    def __init__(self, *names):
+        self.names = list(names)
+        self.fail = False
+
+    def __call__(self):
+        if self.fail:
+            raise RuntimeError("hyprctl failed")
+        return [MonitorInfo(name, 1920, 1080, 60.0) for name in self.names]
+
+class Recorder:
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def added(self, name):
+        self.events.put(('added', name))
+
+    def removed(self, name):
+        self.events.put(('removed', name))
+
+    def expect(self, *events, timeout=2.0):
+        got = [self.events.get(timeout=timeout) for _ in events]
+        assert sorted(got) == sorted(events)
+
+    def assert_quiet(self, timeout=0.1):
+        with pytest.raises(queue.Empty):
+            self.events.get(timeout=timeout)
+
+@pytest.fixture
+def hyprland(tmp_path, monkeypatch):
+    monkeypatch.setattr(hyprland_events, 'HOTPLUG_RECONNECT_DELAY', 0.01)
+    server = FakeHyprland(str(tmp_path / "socket2.sock"))
+    yield server
+    server.close()
+
+def make_topology(tmp_path, layout, event_socket=None):
+    topology = MonitorTopology(str(tmp_path / "cache" / "monitors.json"), event_socket, layout)
+    topology.refresh()
+    return topology
+
+@pytest.mark.parametrize("event, data", [
+    ("monitoradded", "HDMI-A-1"),
+    ("monitoraddedv2", "2,HDMI-A-1,Dell Inc. U2720Q"),
+])
+def test_added_events(tmp_path, event, data):
+    layout = Layout("DP-1")
+    topology = make_topology(tmp_path, layout)
+    recorder = Recorder()
+    topology.on_added, topology.on_removed = recorder.added, recorder.removed
+    layout.names.append("HDMI-A-1")
+    topology.handle_event(event, data)
+    recorder.expect(('added', 'HDMI-A-1'))
+    assert topology.names() == ["DP-1", "HDMI-A-1"]
+    assert topology.get("HDMI-A-1").width == 1920
+
+@pytest.mark.parametrize("event, data", [
+    ("monitorremoved", "DP-1"),
+    ("monitorremovedv2", "1,DP-1,LG Electronics, 27GL850"),
+])
+def test_removed_events(tmp_path, event, data):
+    topology = make_topology(tmp_path, Layout("DP-1", "eDP-1"))
+    recorder = Recorder()
+    topology.on_added, topology.on_removed = recorder.added, recorder.removed
+    topology.handle_event(event, data)
+    recorder.expect(('removed', 'DP-1'))
+    assert topology.names() == ["eDP-1"]
+
+def test_v1_and_v2_events_for_one_hotplug_fire_once(tmp_path):
+    layout = Layout("DP-1")
+    topology = make_topology(tmp_path, layout)
+    recorder = Recorder()
+    topology.on_added, topology.on_removed = recorder.added, recorder.removed
+    layout.names.append("HDMI-A-1")
+    topology.handle_event("monitoradded", "HDMI-A-1")
+    topology.handle_event("monitoraddedv2", "2,HDMI-A-1,desc")
+    layout.names.remove("HDMI-A-1")
+    topology.handle_event("monitorremoved", "HDMI-A-1")
+    topology.handle_event("monitorremovedv2", "2,HDMI-A-1,desc")
+    recorder.expect(('added', 'HDMI-A-1'), ('removed', 'HDMI-A-1'))
+    recorder.assert_quiet()
+
+def test_unrelated_events_are_ignored(tmp_path):
+    topology = make_topology(tmp_path, Layout("DP-1"))
+    recorder = Recorder()
+    topology.on_added, topology.on_removed = recorder.added, recorder.removed
+    topology.handle_event("workspace", "2")
+    topology.handle_event("activewindow", "kitty,~")
+    recorder.assert_quiet()
+    assert topology.names() == ["DP-1"]
+
+def test_added_monitor_is_kept_when_hyprctl_fails(tmp_path):
+    layout = Layout("DP-1")
+    topology = make_topology(tmp_path, layout)
+    layout.fail = True
+    topology.handle_event("monitoradded", "HDMI-A-1")
+    assert topology.names() == ["DP-1", "HDMI-A-1"]
+
+def test_cache_round_trip_leaves_no_temp_files(tmp_path):
+    topology = make_topology(tmp_path, Layout("DP-1", "HDMI-A-1"))
+    cached = MonitorTopology(topology.cache_path, query=Layout())
+    assert cached.names() == ["DP-1", "HDMI-A-1"]
+    assert cached.largest_resolution() == (1920, 1080)
+    assert os.listdir(os.path.dirname(topology.cache_path)) == ["monitors.json"]
+
+def test_events_from_the_socket(tmp_path, hyprland):
+    layout = Layout("DP-1")
+    topology = make_topology(tmp_path, layout, hyprland.socket_path)
+    recorder = Recorder()
+    assert topology.watch(recorder.added, recorder.removed)
+    try:
+        connection = hyprland.next_connection()
+        layout.names.append("HDMI-A-1")
+        connection.sendall(b"workspace>>1\nmonitoraddedv2>>2,HDMI-A-1,desc\nmonitoradded>>HDMI-A-1\n")
+        recorder.expect(('added', 'HDMI-A-1'))
+        layout.names.remove("DP-1")
+        connection.sendall(b"monitorremoved>>DP-1\n")
+        recorder.expect(('removed', 'DP-1'))
+        recorder.assert_quiet()
+    finally:
+        topology.stop()
+
+def test_reconnect_reports_changes_missed_while_disconnected(tmp_path, hyprland):
+    layout = Layout("DP-1", "HDMI-A-1")
+    topology = make_topology(tmp_path, layout, hyprland.socket_path)
+    recorder = Recorder()
+    topology.watch(recorder.added, recorder.removed)
+    try:
+        connection = hyprland.next_connection()
+        recorder.assert_quiet()  # Nothing changed before the first connect
+        layout.names = ["DP-1", "DP-2"]
+        connection.close()  # e.g. Hyprland restarted
+        hyprland.next_connection()
+        recorder.expect(('removed', 'HDMI-A-1'), ('added', 'DP-2'))
+        assert topology.names() == ["DP-1", "DP-2"]
+    finally:
+        topology.stop()
+
+def test_watch_without_socket(tmp_path):
+    topology = MonitorTopology(str(tmp_path / "monitors.json"), query=Layout())
+    topology.listener.event_socket = None
+    assert not topology.watch(lambda name: None, lambda name: None)
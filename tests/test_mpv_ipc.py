@@ -0,0 +1,146 @@
+import json
+import socket
+import threading
+
+import pytest
+
+from managers.mpv_ipc import FPS_FILTER_LABEL, MpvIpcClient, MpvIpcError
+from managers.renderer_launcher import build_mpv_options
+
+class FakeMpv:
+    """Unix socket server speaking just enough of mpv's JSON IPC.
+
+    `handler(command)` returns the reply data, or raises MpvIpcError to send
+    an error reply. Every command received is kept in `commands`.
+    """
+    def __init__(self, socket_path, handler=None, events=(), reply=True):
+        self.socket_path = socket_path
+        self.handler = handler or (lambda command: None)
+        self.events = events
+        self.reply = reply
+        self.commands = []
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(socket_path)
+        self.server.listen()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            with conn, conn.makefile('rb') as reader:
+                line = reader.readline()
+                if not line:
+                    continue
+                request = json.loads(line)
+                self.commands.append(request['command'])
+                if not self.reply:
+                    continue
+                for event in self.events:
+                    conn.sendall((json.dumps(event) + "\n").encode())
+                # A reply to someone else's request must be skipped too
+                conn.sendall(json.dumps({'request_id': request['request_id'] + 1000, 'error': 'success',
+                                         'data': 'not yours'}).encode() + b"\n")
+                try:
+                    response = {'error': 'success', 'data': self.handler(request['command'])}
+                except MpvIpcError as e:
+                    response = {'error': str(e)}
+                response['request_id'] = request['request_id']
+                conn.sendall((json.dumps(response) + "\n").encode())
+
+    def close(self):
+        self.server.close()
+
+@pytest.fixture
+def fake_mpv(tmp_path):
+    servers = []
+
+    def start(**kwargs):
+        server = FakeMpv(str(tmp_path / "mpv.sock"), **kwargs)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.close()
+
+def test_command_returns_matching_reply_and_skips_events(fake_mpv):
+    server = fake_mpv(handler=lambda command: 12345, events=[{'event': 'playback-restart'}])
+    client = MpvIpcClient(server.socket_path)
+    assert client.command('get_property', 'pid') == 12345
+    assert server.commands == [['get_property', 'pid']]
+
+def test_error_reply_raises(fake_mpv):
+    def handler(command):
+        raise MpvIpcError("property unavailable")
+    server = fake_mpv(handler=handler)
+    with pytest.raises(MpvIpcError, match="property unavailable"):
+        MpvIpcClient(server.socket_path).command('get_property', 'container-fps')
+
+def test_missing_socket_raises(tmp_path):
+    client = MpvIpcClient(str(tmp_path / "missing.sock"), timeout=0.5)
+    with pytest.raises(MpvIpcError):
+        client.command('get_property', 'pid')
+    assert not client.is_alive()
+
+def test_connection_closed_without_reply_raises(fake_mpv):
+    server = fake_mpv(reply=False)
+    with pytest.raises(MpvIpcError, match="closed"):
+        MpvIpcClient(server.socket_path, timeout=1.0).command('get_property', 'pid')
+
+def test_wait_until_ready(fake_mpv, tmp_path):
+    assert not MpvIpcClient(str(tmp_path / "mpv.sock")).wait_until_ready(0.1)
+    server = fake_mpv(handler=lambda command: 1)
+    assert MpvIpcClient(server.socket_path).wait_until_ready(1.0)
+
+def test_loadfile_replaces_current_file(fake_mpv):
+    server = fake_mpv()
+    MpvIpcClient(server.socket_path).loadfile("/videos/new.mp4")
+    assert server.commands == [['loadfile', '/videos/new.mp4', 'replace']]
+
+def fps_handler(source_fps):
+    def handler(command):
+        if command == ['get_property', 'container-fps']:
+            return source_fps
+        if command == ['vf', 'remove', f'@{FPS_FILTER_LABEL}']:
+            raise MpvIpcError("no such filter")
+        return None
+    return handler
+
+def test_fps_cap_below_source_adds_filter(fake_mpv):
+    server = fake_mpv(handler=fps_handler(60.0))
+    MpvIpcClient(server.socket_path).set_fps_cap(30)
+    assert server.commands[-1] == ['vf', 'add', f'@{FPS_FILTER_LABEL}:fps=fps=30']
+
+@pytest.mark.parametrize("fps", [None, 0, 60, 120])
+def test_fps_cap_at_or_above_source_only_removes_filter(fake_mpv, fps):
+    server = fake_mpv(handler=fps_handler(60.0))
+    MpvIpcClient(server.socket_path).set_fps_cap(fps)
+    assert not any(command[:2] == ['vf', 'add'] for command in server.commands)
+    assert ['vf', 'remove', f'@{FPS_FILTER_LABEL}'] in server.commands
+
+@pytest.mark.parametrize("scale, panscan, keepaspect, option", [
+    ("Cover", 1.0, True, "--panscan=1.0"),
+    ("Fill", 0.0, False, "--no-keepaspect"),
+    ("Contain", 0.0, True, None),
+])
+def test_apply_properties_matches_launch_options(fake_mpv, scale, panscan, keepaspect, option):
+    server = fake_mpv()
+    properties = {'audio': False, 'speed': 1.5, 'scale': scale}
+    MpvIpcClient(server.socket_path).apply_properties(properties)
+    sent = {command[1]: command[2] for command in server.commands}
+    assert sent == {'speed': 1.5, 'aid': 'no', 'mute': True, 'panscan': panscan, 'keepaspect': keepaspect}
+
+    options = build_mpv_options(properties)
+    assert "--no-audio" in options and "--speed=1.5" in options
+    if option:
+        assert option in options
+    assert not any("panscan" in o or "keepaspect" in o for o in options if o != option)
+
+def test_apply_properties_with_audio(fake_mpv):
+    server = fake_mpv()
+    MpvIpcClient(server.socket_path).apply_properties({'audio': True})
+    sent = {command[1]: command[2] for command in server.commands}
+    assert sent['aid'] == 'auto' and sent['mute'] is False
@@ -0,0 +1,84 @@
+import pytest
+
+from managers.occlusion import covers, occluded_monitors
+
+def monitor(name="DP-1", x=0, y=0, width=1920, height=1080, scale=1.0, transform=0, workspace=1, special=0):
+    return {'name': name, 'x': x, 'y': y, 'width': width, 'height': height, 'scale': scale,
+            'transform': transform, 'activeWorkspace': {'id': workspace}, 'specialWorkspace': {'id': special}}
+
+def window(x, y, width, height, workspace=1, fullscreen=0, **state):
+    return dict({'at': [x, y], 'size': [width, height], 'workspace': {'id': workspace}, 'fullscreen': fullscreen}, **state)
+
+def test_covers_needs_the_whole_area():
+    area = (0, 0, 100, 100)
+    assert covers(area, [(0, 0, 50, 100), (50, 0, 50, 100)])
+    assert covers(area, [(-10, -10, 200, 200)])
+    assert not covers(area, [(0, 0, 50, 100), (51, 0, 49, 100)]) # A one pixel gap
+    assert not covers(area, [(0, 0, 100, 99)])
+    assert not covers(area, [(100, 0, 100, 100)]) # Touching the edge only
+    assert not covers(area, [])
+
+def test_tiled_windows_that_fill_the_output():
+    windows = [window(0, 0, 960, 1080), window(960, 0, 960, 540), window(960, 540, 960, 540)]
+    assert occluded_monitors([monitor()], windows) == {"DP-1"}
+
+def test_gaps_between_tiled_windows_leave_it_visible():
+    windows = [window(5, 5, 950, 1070), window(965, 5, 950, 1070)]
+    assert occluded_monitors([monitor()], windows) == set()
+
+def test_a_window_covering_part_of_the_output():
+    assert occluded_monitors([monitor()], [window(0, 0, 1920, 1000)]) == set()
+
+def test_windows_are_placed_in_layout_coordinates():
+    second = monitor("HDMI-A-1", x=1920)
+    assert occluded_monitors([monitor(), second], [window(1920, 0, 1920, 1080)]) == {"HDMI-A-1"}
+
+@pytest.mark.parametrize("fullscreen, occluded", [
+    (True, True),
+    (2, True), # Fullscreen
+    (3, True), # Fullscreen and maximized
+    (1, False), # Maximized keeps bars and gaps, so only its geometry counts
+    (0, False),
+])
+def test_fullscreen_states(fullscreen, occluded):
+    windows = [window(0, 40, 1920, 1040, fullscreen=fullscreen)]
+    assert (occluded_monitors([monitor()], windows) == {"DP-1"}) == occluded
+
+def test_maximized_window_covering_the_output():
+    assert occluded_monitors([monitor()], [window(0, 0, 1920, 1080, fullscreen=1)]) == {"DP-1"}
+
+def test_scaled_monitor_is_measured_in_logical_pixels():
+    scaled = monitor(width=3840, height=2160, scale=2.0)
+    assert occluded_monitors([scaled], [window(0, 0, 1920, 1080)]) == {"DP-1"}
+    assert occluded_monitors([scaled], [window(0, 0, 1920, 1079)]) == set()
+    fractional = monitor(width=2560, height=1440, scale=1.25)
+    assert occluded_monitors([fractional], [window(0, 0, 2048, 1152)]) == {"DP-1"}
+
+@pytest.mark.parametrize("transform", [1, 3, 5, 7])
+def test_rotated_monitor_swaps_width_and_height(transform):
+    rotated = monitor(transform=transform)
+    assert occluded_monitors([rotated], [window(0, 0, 1080, 1920)]) == {"DP-1"}
+    assert occluded_monitors([rotated], [window(0, 0, 1920, 1080)]) == set()
+
+@pytest.mark.parametrize("transform", [0, 2, 4, 6])
+def test_flipped_or_upside_down_monitor_keeps_its_size(transform):
+    assert occluded_monitors([monitor(transform=transform)], [window(0, 0, 1920, 1080)]) == {"DP-1"}
+
+def test_rotated_and_scaled_monitor():
+    # hyprctl reports the mode before rotation
+    portrait = monitor(width=3840, height=2160, scale=2.0, transform=1)
+    assert occluded_monitors([portrait], [window(0, 0, 1080, 1920)]) == {"DP-1"}
+    assert occluded_monitors([portrait], [window(0, 0, 1920, 1080)]) == set()
+
+def test_windows_on_other_workspaces_do_not_count():
+    windows = [window(0, 0, 1920, 1080, workspace=2), window(0, 0, 1920, 1080, workspace=3, fullscreen=2)]
+    assert occluded_monitors([monitor()], windows) == set()
+
+def test_open_special_workspace_counts():
+    assert occluded_monitors([monitor(special=-98)], [window(0, 0, 1920, 1080, workspace=-98)]) == {"DP-1"}
+    # A special workspace that is not shown on the monitor does not
+    assert occluded_monitors([monitor()], [window(0, 0, 1920, 1080, workspace=-98)]) == set()
+
+def test_hidden_and_unmapped_windows_do_not_count():
+    windows = [window(0, 0, 1920, 1080, hidden=True), window(0, 0, 1920, 1080, fullscreen=2, mapped=False)]
+    assert occluded_monitors([monitor()], windows) == set()
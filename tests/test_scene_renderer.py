@@ -0,0 +1,99 @@
+import math
+import sys
+
+import pytest
+
+from config.constants import SCRIPTS_DIR
+
+# The viewer modules import their siblings directly, as they do when run as scripts
+sys.path.insert(0, SCRIPTS_DIR)
+try:
+    import scene_renderer # Switches pyglet to headless mode first
+except Exception as e: # pyglet, or the EGL library it loads, is missing
+    pytest.skip(f"scene_renderer needs pyglet: {e}", allow_module_level=True)
+from scene_renderer import ImageLayer, compile_render_list, layer_instances
+
+WIDTH, HEIGHT = 256, 256
+
+def test_compile_keeps_image_layers_in_scene_order():
+    layers = compile_render_list([
+        {"type": "imagelayer", "asset": "back"},
+        {"type": "sound", "asset": "music"},
+        {"type": "imagelayer", "name": "no asset"},
+        {"type": "imagelayer", "asset": "front", "pos": "10 -20 0", "scale": "2 0.5 1", "angle": 90},
+    ])
+    assert layers == (
+        ImageLayer("back", 0.0, 0.0, 1.0, 1.0, 0.0),
+        ImageLayer("front", 10.0, -20.0, 2.0, 0.5, math.pi / 2),
+    )
+
+def test_compile_skips_malformed_layers(capsys):
+    layers = compile_render_list([
+        {"type": "imagelayer", "asset": "bad pos", "pos": "left"},
+        {"type": "imagelayer", "asset": "short scale", "scale": "2"},
+        {"type": "imagelayer", "asset": "bad angle", "angle": "steep"},
+        {"type": "imagelayer", "asset": "good"},
+    ])
+    assert [layer.asset for layer in layers] == ["good"]
+    assert capsys.readouterr().out.count("Skipping layer") == 3
+
+def test_instances_are_centred_and_merged_only_when_consecutive():
+    layers = compile_render_list([
+        {"type": "imagelayer", "asset": "a", "pos": "10 20 0"},
+        {"type": "imagelayer", "asset": "a", "scale": "2 3 1"},
+        {"type": "imagelayer", "asset": "b"},
+        {"type": "imagelayer", "asset": "missing"},
+        {"type": "imagelayer", "asset": "a", "angle": 180},
+    ])
+    runs = layer_instances(layers, {"a": (16, 8), "b": (4, 4)}, 100, 50)
+    assert [asset for asset, _ in runs] == ["a", "b", "a"]
+    # x, y (Y flipped), half width, half height, angle per instance
+    assert list(runs[0][1]) == [60.0, 5.0, 8.0, 4.0, 0.0, 50.0, 25.0, 16.0, 12.0, 0.0]
+    assert list(runs[1][1]) == [50.0, 25.0, 2.0, 2.0, 0.0]
+    assert runs[2][1][4] == pytest.approx(math.pi)
+
+@pytest.fixture(scope="module")
+def gl_window():
+    """Hidden window on a headless OpenGL 3.3 context, e.g. Mesa llvmpipe with LIBGL_ALWAYS_SOFTWARE=1"""
+    import pyglet
+    try:
+        config = pyglet.gl.Config(major_version=3, minor_version=3, forward_compatible=True)
+        window = pyglet.window.Window(WIDTH, HEIGHT, visible=False, config=config)
+    except Exception as e:
+        pytest.skip(f"No headless OpenGL 3.3 context: {e}")
+    window.switch_to()
+    yield window
+    window.close()
+
+def solid_texture(colour):
+    import pyglet.image
+    return scene_renderer.upload_texture(pyglet.image.SolidColorImagePattern(colour + (255,)).create_image(16, 16))
+
+def read_pixel(x, y):
+    pixel = (scene_renderer.GLubyte * 4)()
+    scene_renderer.glReadPixels(x, y, 1, 1, scene_renderer.GL_RGBA, scene_renderer.GL_UNSIGNED_BYTE, pixel)
+    return tuple(pixel)[:3]
+
+def test_render_list_draws_back_to_front(gl_window):
+    textures = {"red": solid_texture((255, 0, 0)), "green": solid_texture((0, 255, 0)),
+                "blue": solid_texture((0, 0, 255))}
+    layers = compile_render_list([
+        # 64x64 turned into a diamond reaching 45px from the centre
+        {"type": "imagelayer", "asset": "red", "scale": "4 4 1", "angle": 45},
+        {"type": "imagelayer", "asset": "blue"},
+        {"type": "imagelayer", "asset": "green", "pos": "80 0 0"},
+    ])
+    renderer = scene_renderer.SceneRenderer(layers, textures, {name: (16, 16) for name in textures})
+    scene_renderer.glClearColor(0, 0, 0, 1)
+    scene_renderer.glClear(scene_renderer.GL_COLOR_BUFFER_BIT)
+    renderer.draw(WIDTH, HEIGHT)
+    scene_renderer.glFinish()
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    try:
+        assert read_pixel(cx, cy) == (0, 0, 255) # Later layers cover earlier ones
+        assert read_pixel(cx + 24, cy) == (255, 0, 0)
+        assert read_pixel(cx + 28, cy + 28) == (0, 0, 0) # Inside the square, outside the rotated diamond
+        assert read_pixel(cx + 80, cy) == (0, 255, 0)
+        assert read_pixel(2, 2) == (0, 0, 0)
+    finally:
+        renderer.delete()
@@ -0,0 +1,157 @@
+import os
+import threading
+
+import pytest
+import yaml
+
+import config.config_manager as config_manager
+import managers.wallpaper_daemon as wallpaper_daemon
+from managers.fps_governor import FpsGovernor
+from managers.restore import RestoreReport
+from managers.wallpaper_daemon import Renderer, WallpaperDaemon
+
+class FakeIpc:
+    def __init__(self):
+        self.commands = []
+
+    def loadfile(self, path):
+        self.commands.append(('loadfile', path))
+
+    def apply_properties(self, properties):
+        self.commands.append(('apply_properties', properties))
+
+class FakeLauncher:
+    def __init__(self):
+        self.launched = []
+
+    def resolve(self, wallpaper_id):
+        return "video", f"/workshop/{wallpaper_id}/video.mp4"
+
+    def media_path(self, wp_type, path):
+        return path
+
+    def launch(self, wp_type, path, monitor, properties, ready_fd=None):
+        self.launched.append((monitor, path, properties))
+        raise AssertionError("a hot swap must not relaunch the renderer")
+
+class RunningProcess:
+    pid = os.getpid()
+
+    def poll(self):
+        return None
+
+class UnchangedConfig:
+    """A config manager whose properties.yaml never changes"""
+
+    def properties_version(self):
+        return None
+
+def bare_daemon(**renderers):
+    """A daemon with only the state cmd_apply touches, and no sockets or config files"""
+    daemon = WallpaperDaemon.__new__(WallpaperDaemon)
+    daemon.lock = threading.RLock()
+    daemon.properties = {}
+    daemon.monitors = list(renderers)
+    daemon.renderers = dict(renderers)
+    daemon.launcher = FakeLauncher()
+    daemon.config_manager = UnchangedConfig()
+    daemon.properties_version = None
+    return daemon
+
+def video_renderer(wallpaper_id):
+    renderer = Renderer(wallpaper_id, "video", RunningProcess(), ipc=FakeIpc())
+    renderer.fps, renderer.fps_synced = 30, True
+    return renderer
+
+def test_reapplying_the_playing_video_only_pushes_properties():
+    renderer = video_renderer("111")
+    daemon = bare_daemon(**{"DP-1": renderer})
+    properties = {'speed': 0.5, 'audio': True, 'scale': 'Fill'}
+    response = daemon.cmd_apply({'id': "111", 'monitor': "DP-1", 'properties': properties})
+    assert response['hot_swapped'] == ["DP-1"]
+    assert renderer.ipc.commands == [('apply_properties', properties)]
+    assert renderer.fps_synced  # Same file, same frame rate
+
+def test_applying_another_video_loads_it():
+    renderer = video_renderer("111")
+    daemon = bare_daemon(**{"DP-1": renderer})
+    daemon.cmd_apply({'id': "222", 'monitor': "DP-1", 'properties': {'speed': 1.0}})
+    assert renderer.ipc.commands == [('loadfile', "/workshop/222/video.mp4"),
+                                     ('apply_properties', {'speed': 1.0})]
+    assert renderer.wallpaper_id == "222"
+    assert not renderer.fps_synced
+
+class RecordingPipeline:
+    """Stands in for RestorePipeline; records the properties each restore was given"""
+    restores = []
+
+    def __init__(self, launcher, processes, first_frame_timeout):
+        pass
+
+    def restore(self, wallpapers, properties):
+        RecordingPipeline.restores.append((wallpapers, properties))
+        return RestoreReport()
+
+@pytest.fixture
+def properties_file(tmp_path, monkeypatch):
+    path = tmp_path / "properties.yaml"
+    monkeypatch.setattr(config_manager, 'PROPERTIES_FILE', str(path))
+
+    edits = [0]
+
+    def write(properties):
+        path.write_text(yaml.dump(properties))
+        # Step the mtime so each edit is visible even with coarse timestamps
+        edits[0] += 1
+        os.utime(path, ns=(0, edits[0] * 10 ** 9))
+    return write
+
+def daemon_reading(properties_file, **renderers):
+    daemon = bare_daemon(**renderers)
+    daemon.config_manager = config_manager.ConfigManager()
+    daemon.properties = daemon.config_manager.load_properties()
+    daemon.properties_version = daemon.config_manager.properties_version()
+    daemon.governor = FpsGovernor(daemon.properties.get('fps_policy'))
+    daemon.detached = {}
+    daemon.processes = None
+    return daemon
+
+def test_restore_uses_properties_edited_after_startup(properties_file, monkeypatch):
+    monkeypatch.setattr(wallpaper_daemon, 'RestorePipeline', RecordingPipeline)
+    RecordingPipeline.restores.clear()
+    properties_file({'111': {'speed': 1.0, 'max_fps': 0}})
+    daemon = daemon_reading(properties_file)
+
+    properties_file({'111': {'speed': 2.0, 'max_fps': 24}})
+    daemon.cmd_restore({'wallpapers': {'DP-1': 111}, 'monitors': ['DP-1']})
+    wallpapers, properties = RecordingPipeline.restores[-1]
+    assert wallpapers == {'DP-1': '111'}
+    assert properties['111'] == {'speed': 2.0, 'max_fps': 24}
+
+def test_apply_uses_properties_edited_after_startup(properties_file):
+    properties_file({'111': {'speed': 1.0}})
+    renderer = video_renderer("111")
+    daemon = daemon_reading(properties_file, **{"DP-1": renderer})
+
+    properties_file({'111': {'speed': 0.25}, 'fps_policy': {'ac': 48}})
+    daemon.cmd_apply({'id': "111", 'monitor': "DP-1"})
+    assert renderer.ipc.commands == [('apply_properties', {'speed': 0.25})]
+    assert daemon.governor.policy['ac'] == 48
+
+def test_second_daemon_leaves_a_live_socket_alone(tmp_path):
+    socket_path = str(tmp_path / "daemon.sock")
+    running = bare_daemon()
+    running.commands = {'status': lambda request: {'ok': True}}
+    server = wallpaper_daemon.DaemonServer(socket_path, wallpaper_daemon.DaemonRequestHandler)
+    server.wallpaper_daemon = running
+    answering = threading.Thread(target=server.handle_request)
+    answering.start()
+    try:
+        second = bare_daemon()
+        second.socket_path = socket_path
+        with pytest.raises(SystemExit):
+            second.serve_forever()
+        assert os.path.exists(socket_path)
+    finally:
+        answering.join(timeout=5)
+        server.server_close()
@@ -1,13 +1,20 @@
 import gi
-import os
-gi.require_version('GdkPixbuf', '2.0')
-from gi.repository import Gtk, Gdk, GdkPixbuf
+from gi.repository import Gtk, GObject
 from config.constants import WALLPAPER_WIDGET_WIDTH, WALLPAPER_WIDGET_HEIGHT, IMAGE_FRAME_WIDTH, IMAGE_FRAME_HEIGHT
 
+class WallpaperItem(GObject.Object):
+    """List model item wrapping a Wallpaper so it can live in a Gio.ListStore"""
+    __gtype_name__ = "HyprWpEWallpaperItem"
+
+    def __init__(self, wallpaper):
+        super().__init__()
+        self.wallpaper = wallpaper
+
+
 class WallpaperWidget:
     @staticmethod
-    def create(wallpaper, on_click_callback):
-        """Create a properly sized wallpaper widget for horizontal flow"""
+    def create_cell() -> Gtk.Box:
+        """Create an empty, recyclable grid cell; bind() fills it for a wallpaper"""
         # Main container with consistent sizing
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
         main_box.set_size_request(WALLPAPER_WIDGET_WIDTH, WALLPAPER_WIDGET_HEIGHT)
@@ -24,62 +31,11 @@ class WallpaperWidget:
         image.set_pixel_size(120)
         image.set_halign(Gtk.Align.CENTER)
         image.set_valign(Gtk.Align.CENTER)
-        
-        if os.path.exists(wallpaper.preview_path):
-            try:
-                # Check if file is a GIF and handle it as animation
-                if wallpaper.preview_path.lower().endswith('.gif'):
-                    try:
-                        pixbuf_animation = GdkPixbuf.PixbufAnimation.new_from_file(wallpaper.preview_path)
-                        # Try different methods for different GTK versions
-                        if hasattr(image, 'set_from_animation'):
-                            image.set_from_animation(pixbuf_animation)
-                        elif hasattr(image, 'set_pixbuf_animation'):
-                            image.set_pixbuf_animation(pixbuf_animation)
-                        else:
-                            # Fallback: get first frame as static pixbuf
-                            pixbuf = pixbuf_animation.get_static_image()
-                            image.set_from_pixbuf(pixbuf)
-                    except Exception:
-                        # Fallback to static image
-                        image.set_from_file(wallpaper.preview_path)
-                else:
-                    image.set_from_file(wallpaper.preview_path)
-            except Exception:
-                WallpaperWidget._set_missing_image(image)
-        else:
-            # Check for preview.gif as fallback for scene wallpapers
-            preview_gif_path = os.path.join(os.path.dirname(wallpaper.preview_path), "preview.gif")
-            if wallpaper.type.lower() == "scene" and os.path.exists(preview_gif_path):
-                try:
-                    # Handle preview.gif as animation
-                    if preview_gif_path.lower().endswith('.gif'):
-                        try:
-                            pixbuf_animation = GdkPixbuf.PixbufAnimation.new_from_file(preview_gif_path)
-                            # Try different methods for different GTK versions
-                            if hasattr(image, 'set_from_animation'):
-                                image.set_from_animation(pixbuf_animation)
-                            elif hasattr(image, 'set_pixbuf_animation'):
-                                image.set_pixbuf_animation(pixbuf_animation)
-                            else:
-                                # Fallback: get first frame as static pixbuf
-                                pixbuf = pixbuf_animation.get_static_image()
-                                image.set_from_pixbuf(pixbuf)
-                        except Exception:
-                            # Fallback to static image
-                            image.set_from_file(preview_gif_path)
-                    else:
-                        image.set_from_file(preview_gif_path)
-                except Exception:
-                    WallpaperWidget._set_missing_image(image)
-            else:
-                WallpaperWidget._set_missing_image(image)
-        
         image_frame.set_child(image)
         main_box.append(image_frame)
         
         # Title with proper wrapping
-        title_label = Gtk.Label(label=wallpaper.title)
+        title_label = Gtk.Label()
         title_label.set_wrap(False)
         title_label.set_justify(Gtk.Justification.CENTER)
         title_label.set_max_width_chars(18)
@@ -91,38 +47,55 @@ class WallpaperWidget:
         
         # Type badge
         type_label = Gtk.Label()
-        type_color = WallpaperWidget._get_type_color(wallpaper.type)
-        type_label.set_markup(f"<span size='x-small' color='{type_color}'><b>{wallpaper.type.upper()}</b></span>")
         type_label.set_halign(Gtk.Align.CENTER)
         main_box.append(type_label)
         
-        # Button wrapper
-        button = Gtk.Button()
-        button.set_child(main_box)
-        button.add_css_class("highlight")
-        
-        # Let the button size naturally based on content
-        button.set_hexpand(False)
-        button.set_vexpand(False)
-        button.set_halign(Gtk.Align.START)
-        
-        button.connect('clicked', on_click_callback, wallpaper.id)
-        
-        return button
+        main_box.add_css_class("highlight")
+        main_box.wallpaper_id = None
+        main_box.preview_request = None
+        main_box.static_texture = None
+        main_box.image = image
+        main_box.title_label = title_label
+        main_box.type_label = type_label
+        return main_box
+
+    @staticmethod
+    def bind(cell: Gtk.Box, wallpaper, previews) -> None:
+        """Show `wallpaper` in a recycled cell"""
+        cell.wallpaper_id = wallpaper.id
+        cell.title_label.set_label(wallpaper.title)
+        type_color = WallpaperWidget._get_type_color(wallpaper.type)
+        cell.type_label.set_markup(f"<span size='x-small' color='{type_color}'><b>{wallpaper.type.upper()}</b></span>")
+        WallpaperWidget.load_preview(cell, wallpaper, previews)
+
+    @staticmethod
+    def unbind(cell: Gtk.Box) -> None:
+        """Cancel any pending decode and drop the cell's reference to its preview"""
+        if cell.preview_request:
+            cell.preview_request.cancel()
+            cell.preview_request = None
+        cell.wallpaper_id = None
+        cell.static_texture = None
+        cell.image.clear()
+
+    @staticmethod
+    def load_preview(cell: Gtk.Box, wallpaper, previews) -> None:
+        """Show the static preview texture, decoding it in the background if it is not cached"""
+        def on_preview_ready(texture):
+            cell.preview_request = None
+            cell.static_texture = texture
+            if texture:
+                cell.image.set_from_paintable(texture)
+            else:
+                WallpaperWidget._set_missing_image(cell.image)
+
+        cell.image.set_from_icon_name("image-loading-symbolic")
+        cell.preview_request = previews.load(wallpaper, on_preview_ready)
 
     @staticmethod
     def _set_missing_image(image: Gtk.Image):
         """Helper method to set missing image icon using Gtk.Image"""
-        icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
-        # Lookup the icon as a Gdk.Paintable
-        icon = icon_theme.lookup_icon(
-            "image-missing", 100,  # size in pixels
-            0  # flags
-        )
-        if icon:
-            image.set_from_paintable(icon.load_icon())  # convert GIcon/Gdk.Paintable to set_from_paintable
-        else:
-            image.set_from_icon_name("image-missing", Gtk.IconSize.DIALOG)
+        image.set_from_icon_name("image-missing")
 
     @staticmethod
     def _get_type_color(wallpaper_type):
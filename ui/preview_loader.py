@@ -0,0 +1,113 @@
+import gi
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+gi.require_version('Gdk', '4.0')
+from gi.repository import Gdk, GLib
+
+from config.constants import PREVIEW_WORKERS, DEFAULT_PREVIEW_CACHE_MB
+from data.thumbnail_cache import ThumbnailCache
+
+class TextureLRU:
+    """In-memory LRU of decoded preview textures bounded by a byte budget"""
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Gdk.Texture]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def discard(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.used_bytes -= entry[1]
+
+    def put(self, key: str, texture: Gdk.Texture) -> None:
+        if key in self.entries:
+            self.used_bytes -= self.entries.pop(key)[1]
+        size = texture.get_width() * texture.get_height() * 4
+        self.entries[key] = (texture, size)
+        self.used_bytes += size
+        # Evict least recently used textures; cells showing them keep their own reference
+        while self.used_bytes > self.budget_bytes and len(self.entries) > 1:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.used_bytes -= evicted_size
+
+class PreviewRequest:
+    """Handle for a pending decode; cancel() drops it if the cell scrolls away"""
+    def __init__(self, callback: Callable[[Optional[Gdk.Texture]], None]):
+        self.callback = callback
+        self.cancelled = False
+        self.future = None
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        if self.future:
+            self.future.cancel()
+
+class PreviewLoader:
+    """Decodes grid previews on demand, on a background worker.
+
+    Cells ask for a preview when they are bound (i.e. scrolled into view)
+    and cancel the request when unbound. Decoded textures are kept in a
+    TextureLRU so scrolling back does not hit the disk again.
+    """
+    def __init__(self, thumbnails: Optional[ThumbnailCache] = None,
+                 budget_bytes: int = DEFAULT_PREVIEW_CACHE_MB * 1024 * 1024,
+                 workers: int = PREVIEW_WORKERS):
+        self.thumbnails = thumbnails or ThumbnailCache()
+        self.textures = TextureLRU(budget_bytes)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preview")
+
+    def load(self, wallpaper, callback: Callable[[Optional[Gdk.Texture]], None]) -> Optional[PreviewRequest]:
+        """Deliver the preview texture to `callback` on the main loop.
+
+        Returns a PreviewRequest while the decode is pending, or None if the
+        callback already ran (memory cache hit).
+        """
+        # Memory cache key only; the disk checks (exists, stat) happen on the worker
+        key = self._memory_key(wallpaper)
+        texture = self.textures.get(key)
+        if texture:
+            callback(texture)
+            return None
+        request = PreviewRequest(callback)
+        request.future = self.executor.submit(self._decode, wallpaper, key, request)
+        return request
+
+    def forget(self, wallpaper) -> None:
+        """Drop a wallpaper's texture from memory, e.g. after a rescan found it changed.
+
+        The memory key does not see a preview replaced at the same path, so
+        the next load goes back to the thumbnail cache, which does.
+        """
+        self.textures.discard(self._memory_key(wallpaper))
+
+    @staticmethod
+    def _memory_key(wallpaper) -> str:
+        return f"{wallpaper.id}|{wallpaper.preview_path}"
+
+    def _decode(self, wallpaper, key: str, request: PreviewRequest) -> None:
+        if request.cancelled:
+            return
+        texture = None
+        source_path = self.thumbnails.resolve_preview_path(wallpaper)
+        thumbnail_path = source_path and self.thumbnails.generate(source_path)
+        if thumbnail_path and not request.cancelled:
+            try:
+                texture = Gdk.Texture.new_from_filename(thumbnail_path)
+            except Exception as e:
+                print(f"Could not load thumbnail {thumbnail_path}: {e}")
+        GLib.idle_add(self._deliver, key, texture, request)
+
+    def _deliver(self, key: str, texture: Optional[Gdk.Texture], request: PreviewRequest) -> bool:
+        if texture:
+            self.textures.put(key, texture)
+        if not request.cancelled:
+            request.callback(texture)
+        return False
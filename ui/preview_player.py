@@ -0,0 +1,110 @@
+import gi
+from collections import OrderedDict
+from typing import Optional
+gi.require_version('Gdk', '4.0')
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import Gdk, GdkPixbuf, GLib
+
+from config.constants import MAX_ANIMATED_PREVIEWS, IMAGE_FRAME_WIDTH, IMAGE_FRAME_HEIGHT
+
+class Playback:
+    def __init__(self, cell, pinned: bool):
+        self.cell = cell
+        self.pinned = pinned
+        self.animation = None
+        self.iter = None
+        self.source_id = 0
+        self.stopped = False
+
+class AnimatedPreviewPlayer:
+    """Plays GIF previews only for hovered or selected cells.
+
+    Cells show their static thumbnail by default. At most `max_playing`
+    animations run at once; starting another stops the oldest unpinned one.
+    Stopping a playback drops the animation so its frames can be freed.
+    """
+    def __init__(self, executor, max_playing: int = MAX_ANIMATED_PREVIEWS):
+        self.executor = executor
+        self.max_playing = max_playing
+        self.playing = OrderedDict()
+
+    def start(self, cell, source_path: Optional[str], pinned: bool = False) -> None:
+        if not source_path or not source_path.lower().endswith('.gif'):
+            return
+        playback = self.playing.get(cell)
+        if playback:
+            playback.pinned = playback.pinned or pinned
+            self.playing.move_to_end(cell)
+            return
+        if len(self.playing) >= self.max_playing and not self._stop_oldest_unpinned():
+            return
+        playback = Playback(cell, pinned)
+        self.playing[cell] = playback
+        self.executor.submit(self._load, source_path, playback)
+
+    def stop(self, cell) -> None:
+        playback = self.playing.pop(cell, None)
+        if not playback:
+            return
+        playback.stopped = True
+        if playback.source_id:
+            GLib.source_remove(playback.source_id)
+        playback.animation = None
+        playback.iter = None
+        if cell.static_texture:
+            cell.image.set_from_paintable(cell.static_texture)
+
+    def _stop_oldest_unpinned(self) -> bool:
+        for cell, playback in self.playing.items():
+            if not playback.pinned:
+                self.stop(cell)
+                return True
+        return False
+
+    def _load(self, source_path: str, playback: Playback) -> None:
+        if playback.stopped:
+            return
+        try:
+            animation = GdkPixbuf.PixbufAnimation.new_from_file(source_path)
+        except Exception as e:
+            print(f"Could not load animated preview {source_path}: {e}")
+            GLib.idle_add(self._release, playback)
+            return
+        GLib.idle_add(self._begin, playback, animation)
+
+    def _release(self, playback: Playback) -> bool:
+        """Free the slot of a playback that never got to animate"""
+        if self.playing.get(playback.cell) is playback:
+            del self.playing[playback.cell]
+        playback.stopped = True
+        return False
+
+    def _begin(self, playback: Playback, animation) -> bool:
+        if playback.stopped:
+            return False
+        if animation.is_static_image():
+            return self._release(playback)
+        playback.animation = animation
+        playback.iter = animation.get_iter(None)
+        self._show_frame(playback)
+        return False
+
+    def _advance(self, playback: Playback) -> bool:
+        playback.source_id = 0
+        if playback.stopped:
+            return False
+        playback.iter.advance(None)
+        self._show_frame(playback)
+        return False
+
+    def _show_frame(self, playback: Playback) -> None:
+        frame = playback.iter.get_pixbuf()
+        scale = min(IMAGE_FRAME_WIDTH / frame.get_width(), IMAGE_FRAME_HEIGHT / frame.get_height(), 1.0)
+        if scale < 1.0:
+            frame = frame.scale_simple(max(1, int(frame.get_width() * scale)),
+                                       max(1, int(frame.get_height() * scale)),
+                                       GdkPixbuf.InterpType.BILINEAR)
+        playback.cell.image.set_from_paintable(Gdk.Texture.new_for_pixbuf(frame))
+        delay = playback.iter.get_delay_time()
+        if delay >= 0:
+            playback.source_id = GLib.timeout_add(max(delay, 20), self._advance, playback)
@@ -1,7 +1,8 @@
 import gi
-from gi.repository import Gtk, Gdk
+from typing import Optional
+from gi.repository import Gtk, Gdk, Gio
 
-from config.constants import WALLPAPER_WIDGET_WIDTH, WALLPAPER_WIDGET_HEIGHT
+from config.constants import SEARCH_DEBOUNCE_MS, DEFAULT_PREVIEW_CACHE_MB
 
 class UIBuilder:
     def __init__(self, app_window: Gtk.ApplicationWindow, callbacks: dict, monitors: list):
@@ -59,7 +60,12 @@ class UIBuilder:
         refresh_button.connect('clicked', self.callbacks['on_refresh_clicked'])
         titlebar.append(refresh_button)
 
+        self.load_progress = Gtk.ProgressBar(show_text=True, valign=Gtk.Align.CENTER, visible=False)
+        titlebar.append(self.load_progress)
+
         search_entry = Gtk.SearchEntry(placeholder_text="Search wallpapers...")
+        # Debounce: search-changed only fires once typing pauses
+        search_entry.set_search_delay(SEARCH_DEBOUNCE_MS)
         search_entry.connect("search-changed", self.callbacks['on_search_changed'])
         titlebar.append(search_entry)
 
@@ -70,9 +76,20 @@ class UIBuilder:
         monitor_combo.set_active(0)
         monitor_combo.connect("changed", self.callbacks['on_monitor_changed'])
         titlebar.append(monitor_combo)
+        self.monitor_combo = monitor_combo
 
         return titlebar
 
+    def set_monitors(self, monitors: list) -> None:
+        """Repopulate the monitor dropdown, keeping the current choice if it still exists"""
+        active = self.monitor_combo.get_active_text()
+        self.monitors = monitors
+        self.monitor_combo.remove_all()
+        self.monitor_combo.append_text("All Monitors")
+        for m in monitors:
+            self.monitor_combo.append_text(m)
+        self.monitor_combo.set_active(monitors.index(active) + 1 if active in monitors else 0)
+
     def build_filter_sidebar(self) -> Gtk.Box:
         from ui.components import FilterComponents
         
@@ -98,42 +115,30 @@ class UIBuilder:
         return filter_sidebar
 
     def build_wallpaper_grid(self) -> Gtk.ScrolledWindow:
-        """Build the wallpaper grid section with proper horizontal layout"""
+        """Build the wallpaper grid section as a recycling Gtk.GridView"""
         # Create scrolled window
         scrolled_window = Gtk.ScrolledWindow()
         scrolled_window.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scrolled_window.set_vexpand(True)
         scrolled_window.set_hexpand(True)
 
-        # Create FlowBox with proper settings for horizontal flow
-        self.flowbox = Gtk.FlowBox()
-        self.flowbox.add_css_class("highlight")
-        
-        # Orientation and selection settings
-        self.flowbox.set_orientation(Gtk.Orientation.HORIZONTAL)
-        self.flowbox.set_selection_mode(Gtk.SelectionMode.NONE)
+        # The GridView only creates widgets for the rows on screen;
+        # GridManager attaches the model and the item factory.
+        self.grid_view = Gtk.GridView()
+        self.grid_view.add_css_class("highlight")
+        self.grid_view.set_single_click_activate(True)
         
-        # Layout settings
-        self.flowbox.set_homogeneous(True)  # Change to True for consistent sizing
-        self.flowbox.set_halign(Gtk.Align.START)  # Align to start instead of FILL
-        self.flowbox.set_hexpand(True)
-        self.flowbox.set_valign(Gtk.Align.START)
-        
-        # Spacing settings - reduce if needed
-        self.flowbox.set_column_spacing(10)  # Reduced from 15
-        self.flowbox.set_row_spacing(10)     # Reduced from 15
-        
-        # Set min/max children per line to control wrapping behavior
-        self.flowbox.set_min_children_per_line(1)
-        self.flowbox.set_max_children_per_line(30)  # Allow many items per line
+        # Set min/max columns to control wrapping behavior
+        self.grid_view.set_min_columns(1)
+        self.grid_view.set_max_columns(30)  # Allow many items per line
         
         # Set margins
-        self.flowbox.set_margin_top(15)
-        self.flowbox.set_margin_bottom(15)
-        self.flowbox.set_margin_start(15)
-        self.flowbox.set_margin_end(15)
+        self.grid_view.set_margin_top(15)
+        self.grid_view.set_margin_bottom(15)
+        self.grid_view.set_margin_start(15)
+        self.grid_view.set_margin_end(15)
 
-        scrolled_window.set_child(self.flowbox)
+        scrolled_window.set_child(self.grid_view)
         
         return scrolled_window
 
@@ -211,6 +216,19 @@ class UIBuilder:
             'web': self.filter_widgets['web'].get_active()
         }
 
+    def set_load_progress(self, loaded: int, total: Optional[int]) -> None:
+        """Show catalog loading progress; an unknown total pulses the bar"""
+        self.load_progress.set_visible(True)
+        if not total:
+            self.load_progress.set_text("Loading wallpapers...")
+            self.load_progress.pulse()
+            return
+        self.load_progress.set_text(f"Loading {loaded}/{total}")
+        self.load_progress.set_fraction(min(1.0, loaded / total))
+
+    def finish_load_progress(self) -> None:
+        self.load_progress.set_visible(False)
+
     def set_sidebar_visible(self, visible: bool) -> None:
         """Set the visibility of the properties sidebar"""
         if hasattr(self, 'sidebar'):
@@ -232,70 +250,213 @@ class UIBuilder:
         }
 
 class GridManager:
-    def __init__(self, flowbox: Gtk.FlowBox):
-        self.flowbox = flowbox
-        self.wallpaper_widgets = {}
+    def __init__(self, grid_view: Gtk.GridView, preview_cache_bytes: int = DEFAULT_PREVIEW_CACHE_MB * 1024 * 1024):
+        from ui.components import WallpaperItem
+        from ui.preview_loader import PreviewLoader
+        from ui.preview_player import AnimatedPreviewPlayer
+        
+        self.grid_view = grid_view
+        # Previews are decoded lazily as cells are bound, i.e. scrolled into view
+        self.previews = PreviewLoader(budget_bytes=preview_cache_bytes)
+        # GIF previews only animate while hovered or selected
+        self.player = AnimatedPreviewPlayer(self.previews.executor)
+        self.bound_cells = {}
+        self.selected_id = None
+        self.wallpaper_items = {}
+        self.visible_ids = set()
+        self.on_wallpaper_clicked = None
+        
+        # Items are plain objects; widgets only exist for visible cells.
+        # The store always holds the whole catalog and the filter model hides
+        # non-matching items, so searching never rebuilds the store.
+        self.store = Gio.ListStore(item_type=WallpaperItem)
+        self.filter = Gtk.CustomFilter.new(self._filter_item)
+        self.filter_model = Gtk.FilterListModel(model=self.store, filter=self.filter)
+        # Search results are shown in rank order; without a sorter the
+        # sort model passes the catalog order straight through
+        self.ranks = {}
+        self.sorter = Gtk.CustomSorter.new(self._compare_ranks)
+        self.sort_model = Gtk.SortListModel(model=self.filter_model)
+        self.grid_view.set_model(Gtk.NoSelection(model=self.sort_model))
+        
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_factory_setup)
+        factory.connect("bind", self._on_factory_bind)
+        factory.connect("unbind", self._on_factory_unbind)
+        self.grid_view.set_factory(factory)
+        self.grid_view.connect("activate", self._on_activate)
+
+    def _on_factory_setup(self, factory, list_item) -> None:
+        from ui.components import WallpaperWidget
+        cell = WallpaperWidget.create_cell()
+        motion = Gtk.EventControllerMotion()
+        motion.connect("enter", self._on_cell_enter, cell)
+        motion.connect("leave", self._on_cell_leave, cell)
+        cell.add_controller(motion)
+        list_item.set_child(cell)
+
+    def _on_factory_bind(self, factory, list_item) -> None:
+        from ui.components import WallpaperWidget
+        cell = list_item.get_child()
+        wallpaper = list_item.get_item().wallpaper
+        WallpaperWidget.bind(cell, wallpaper, self.previews)
+        self.bound_cells[wallpaper.id] = cell
+        if wallpaper.id == self.selected_id:
+            self._play(cell, pinned=True)
+
+    def _on_factory_unbind(self, factory, list_item) -> None:
+        from ui.components import WallpaperWidget
+        cell = list_item.get_child()
+        self.player.stop(cell)
+        if self.bound_cells.get(cell.wallpaper_id) is cell:
+            del self.bound_cells[cell.wallpaper_id]
+        WallpaperWidget.unbind(cell)
+
+    def _play(self, cell, pinned: bool = False) -> None:
+        item = self.wallpaper_items.get(cell.wallpaper_id)
+        if item:
+            self.player.start(cell, self.previews.thumbnails.resolve_preview_path(item.wallpaper), pinned)
+
+    def _on_cell_enter(self, controller, x, y, cell) -> None:
+        self._play(cell)
+
+    def _on_cell_leave(self, controller, cell) -> None:
+        if cell.wallpaper_id != self.selected_id:
+            self.player.stop(cell)
+
+    def set_selected(self, wallpaper_id) -> None:
+        """Keep the selected wallpaper's preview animating"""
+        previous = self.bound_cells.get(self.selected_id)
+        self.selected_id = wallpaper_id
+        if previous and previous.wallpaper_id != wallpaper_id:
+            self.player.stop(previous)
+        cell = self.bound_cells.get(wallpaper_id)
+        if cell:
+            self._play(cell, pinned=True)
+
+    def _filter_item(self, item) -> bool:
+        return item.wallpaper.id in self.visible_ids
+
+    def _compare_ranks(self, item_a, item_b, *args) -> Gtk.Ordering:
+        rank_a = self.ranks.get(item_a.wallpaper.id, len(self.ranks))
+        rank_b = self.ranks.get(item_b.wallpaper.id, len(self.ranks))
+        if rank_a < rank_b:
+            return Gtk.Ordering.SMALLER
+        if rank_a > rank_b:
+            return Gtk.Ordering.LARGER
+        return Gtk.Ordering.EQUAL
+
+    def _on_activate(self, grid_view, position) -> None:
+        item = grid_view.get_model().get_item(position)
+        if item and self.on_wallpaper_clicked:
+            self.on_wallpaper_clicked(grid_view, item.wallpaper.id)
 
     def populate_grid(self, wallpapers, on_wallpaper_clicked_callback) -> None:
-        """Populate the flowbox with wallpaper widgets"""
-        from ui.components import WallpaperWidget
-        
+        """Populate the grid model with wallpapers"""
         print(f"Populating grid with {len(wallpapers)} wallpapers...")
         
-        # Clear existing widgets
+        # Clear existing items
         self.clear_grid()
+        self.append_wallpapers(wallpapers, on_wallpaper_clicked_callback)
+        
+        print(f"Added {len(self.wallpaper_items)} wallpaper items")
+
+    def append_wallpapers(self, wallpapers, on_wallpaper_clicked_callback, is_visible=None) -> None:
+        """Add a batch of wallpapers, showing only those that pass `is_visible`"""
+        from ui.components import WallpaperItem
         
-        # Create widgets for all wallpapers
+        self.on_wallpaper_clicked = on_wallpaper_clicked_callback
+        new_items = []
         for wp_data in wallpapers:
-            widget = WallpaperWidget.create(wp_data, on_wallpaper_clicked_callback)
-            
-            # Store in our dictionary
-            self.wallpaper_widgets[wp_data.id] = widget
-            
-            # Add to flowbox
-            self.flowbox.append(widget)
-            flowbox_child = widget.get_parent()
-            if flowbox_child:
-                flowbox_child.set_size_request(WALLPAPER_WIDGET_WIDTH, WALLPAPER_WIDGET_HEIGHT)
-                flowbox_child.set_halign(Gtk.Align.START)
+            item = WallpaperItem(wp_data)
+            self.wallpaper_items[wp_data.id] = item
+            if not is_visible or is_visible(wp_data):
+                self.visible_ids.add(wp_data.id)
+            new_items.append(item)
+        self.store.splice(self.store.get_n_items(), 0, new_items)
+
+    def apply_diff(self, diff, is_visible=None) -> None:
+        """Add, remove and replace only the items a CatalogDiff touches"""
+        from ui.components import WallpaperItem
+        
+        for wallpaper_id in diff.removed:
+            item = self.wallpaper_items.pop(wallpaper_id, None)
+            self.visible_ids.discard(wallpaper_id)
+            if item:
+                found, position = self.store.find(item)
+                if found:
+                    self.store.remove(position)
         
-        print(f"Created {len(self.wallpaper_widgets)} wallpaper widgets")
+        # An added id that is already in the grid (e.g. two overlapping rescans) is a replacement
+        for wp_data in diff.changed + diff.added:
+            old_item = self.wallpaper_items.get(wp_data.id)
+            if old_item:
+                # Its preview may have been replaced in place, so the rebound cell must not reuse it
+                self.previews.forget(old_item.wallpaper)
+                self.previews.forget(wp_data)
+            new_item = WallpaperItem(wp_data)
+            self.wallpaper_items[wp_data.id] = new_item
+            self._update_visibility(wp_data, is_visible)
+            found, position = self.store.find(old_item) if old_item else (False, 0)
+            if found:
+                # Replacing the item makes the view rebind just that cell
+                self.store.splice(position, 1, [new_item])
+            else:
+                self.store.insert_sorted(new_item, self._compare_ids)
+        
+        print(f"Grid updated: {diff.unchanged} cells reused, {len(diff.added)} added, "
+              f"{len(diff.changed)} replaced, {len(diff.removed)} removed")
+
+    def _update_visibility(self, wp_data, is_visible) -> None:
+        if not is_visible or is_visible(wp_data):
+            self.visible_ids.add(wp_data.id)
+        else:
+            self.visible_ids.discard(wp_data.id)
+
+    @staticmethod
+    def _compare_ids(item_a, item_b, *args) -> int:
+        return (item_a.wallpaper.id > item_b.wallpaper.id) - (item_a.wallpaper.id < item_b.wallpaper.id)
 
     def clear_grid(self) -> None:
-        """Remove all wallpaper widgets from the flowbox"""
+        """Remove all wallpapers from the grid"""
         print("Clearing wallpaper grid...")
+        self.store.remove_all()
+        self.wallpaper_items.clear()
+        self.visible_ids.clear()
+
+    def apply_filters(self, filtered_wallpapers, ranked: bool = False) -> None:
+        """Apply filters to show only relevant wallpapers, in rank order if `ranked`"""
+        self._apply_ranking(filtered_wallpapers if ranked else None)
         
-        # Remove all children from flowbox
-        child = self.flowbox.get_first_child()
-        while child is not None:
-            next_child = child.get_next_sibling()
-            self.flowbox.remove(child)
-            child = next_child
-        
-        # Clear our tracking dictionary
-        self.wallpaper_widgets.clear()
-
-    def apply_filters(self, filtered_wallpapers) -> None:
-        """Apply filters to show only relevant wallpapers"""
-        # Remove all widgets from flowbox first
-        child = self.flowbox.get_first_child()
-        while child is not None:
-            next_child = child.get_next_sibling()
-            self.flowbox.remove(child)
-            child = next_child
+        new_visible_ids = {wp_data.id for wp_data in filtered_wallpapers}
+        old_visible_ids = self.visible_ids
+        if new_visible_ids == old_visible_ids:
+            return
         
-        # Re-add only the widgets that should be visible
-        for wp_data in filtered_wallpapers:
-            widget = self.wallpaper_widgets.get(wp_data.id)
-            if not widget:
-                continue
-            
-            self.flowbox.append(widget)
-            
-            # Set size on the FlowBoxChild after re-adding
-            flowbox_child = widget.get_parent()
-            if flowbox_child:
-                flowbox_child.set_size_request(WALLPAPER_WIDGET_WIDTH, -1)
-                flowbox_child.set_halign(Gtk.Align.START)
+        # Telling the filter model how the match set changed lets it re-check
+        # only the affected side (e.g. current matches when a search narrows)
+        if new_visible_ids <= old_visible_ids:
+            change = Gtk.FilterChange.MORE_STRICT
+        elif new_visible_ids >= old_visible_ids:
+            change = Gtk.FilterChange.LESS_STRICT
+        else:
+            change = Gtk.FilterChange.DIFFERENT
+        self.visible_ids = new_visible_ids
+        self.filter.changed(change)
         
-        print(f"Showing {len(filtered_wallpapers)} wallpapers")
+        print(f"Showing {self.filter_model.get_n_items()} wallpapers")
+
+    def _apply_ranking(self, ranked_wallpapers) -> None:
+        if ranked_wallpapers is None:
+            self.ranks = {}
+            if self.sort_model.get_sorter() is not None:
+                self.sort_model.set_sorter(None)
+            return
+        ranks = {wp_data.id: rank for rank, wp_data in enumerate(ranked_wallpapers)}
+        if ranks == self.ranks and self.sort_model.get_sorter() is not None:
+            return
+        self.ranks = ranks
+        if self.sort_model.get_sorter() is None:
+            self.sort_model.set_sorter(self.sorter)
+        else:
+            self.sorter.changed(Gtk.SorterChange.DIFFERENT)